@@ -3,53 +3,107 @@ AI Service for Job Matching System
 Provides CV validation, information extraction, and job matching capabilities
 """
 
+import asyncio
+import logging
 import os
 import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from datetime import datetime
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from typing import List, Optional
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 # Add current directory to Python path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config.config import Config
 from services.cv_service import CVService
+from services.job_matching_service import JobMatchingService
 from models.schemas import (
     CVValidationResponse, 
+    CVBatchValidationResponse, 
     CVExtractionResponse, 
+    AsyncJobSubmitResponse, 
+    AsyncJobStatusResponse, 
     JobMatchRequest, 
     JobMatchResponse, 
+    JobPostingsUpsertRequest, 
+    JobRankRequest, 
+    JobRankResponse, 
+    CVProfilesUpsertRequest, 
+    SkillIndexQuery, 
+    SkillIndexQueryResponse, 
     ErrorResponse, 
     HealthResponse
 )
-from utils.gemini_client import get_gemini_client
+from utils.gemini_client import get_gemini_client, AIResponseError
+from utils.extraction_pool import get_extraction_pool, ExtractionQueueFull
+from utils.rate_limiter import RateLimitExceeded
+from utils.health_monitor import get_health_monitor
+from utils.upload_reader import get_upload_reader, UploadRejected, UploadCapacityExceeded
+from utils.job_queue import get_job_queue, JobQueueFull, InvalidCallbackUrl
+from utils.metrics import REGISTRY, REQUEST_SECONDS, MetricsRegistry
+from utils.log import setup_logging, bind_request, reset_request, current_request
+from utils.result_cache import ResultCache
+
+setup_logging()
+logger = logging.getLogger("ai_service")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
-    print("Starting AI Service...")
+    logger.info("Starting AI Service...")
+    
+    # Gemini calls run on I/O threads; size the pool for many concurrent requests
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=Config.GEMINI_MAX_CONNECTIONS, thread_name_prefix="gemini-io")
+    )
     
     # Validate configuration
     if not Config.validate_config():
-        print("WARNING: Configuration validation failed!")
+        logger.warning("Configuration validation failed!")
     
-    # Test Gemini connection (optional - skip if quota exceeded)
+    # Probe Gemini in the background (metadata lookup, no quota) for /health
     try:
-        print("ℹ️ Skipping Gemini connection test to avoid quota usage")
-        print("✅ AI Service ready (Gemini will be tested on first API call)")
+        get_health_monitor().start()
+        logger.info("AI Service ready (Gemini availability probed every %gs in the background)",
+                    Config.HEALTH_PROBE_INTERVAL_SECONDS)
     except Exception as e:
-        print(f"⚠️ Gemini AI setup error: {e}")
+        logger.warning("Gemini AI setup error: %s", e)
+    
+    # Attach the SQLite tier of the result caches (here rather than at import, off the event loop)
+    for cache in result_caches():
+        await asyncio.to_thread(cache.open)
+    
+    # Restore pushed jobs / CV profiles (ranking and skill index) so the main API does not have to re-push them
+    await job_matching_service.restore_indexes()
+    job_matching_service.start_snapshots()
+    
+    # Resume queued async jobs (and jobs interrupted by the last shutdown)
+    job_queue = get_job_queue()
+    job_queue.register(
+        "validate_cv", run_validate_cv_job, retryable=(ExtractionQueueFull, RateLimitExceeded, UploadCapacityExceeded)
+    )
+    await job_queue.start()
     
-    print("AI Service startup complete")
+    logger.info("AI Service startup complete")
     
     yield  # App runs here
     
     # Shutdown
-    print("Shutting down AI Service...")
+    logger.info("Shutting down AI Service...")
+    await get_job_queue().stop()
+    await get_health_monitor().stop()
+    await job_matching_service.stop_snapshots()
+    for cache in result_caches():
+        await cache.close()
+    get_extraction_pool().shutdown()
 
 
 # Initialize FastAPI app with lifespan
@@ -62,6 +116,152 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Status code used (as in nginx) when the caller went away before we answered
+CLIENT_CLOSED_REQUEST = 499
+
+
+class RequestBodyTooLarge(HTTPException):
+    """Raised from receive() once a request body has passed the upload size limit"""
+    
+    def __init__(self):
+        super().__init__(
+            status_code=413,
+            detail=f"Request body too large (limit {Config.PDF_MAX_SIZE_MB}MB per file)"
+        )
+
+
+class UploadSizeLimitMiddleware:
+    """Refuse oversized uploads: by Content-Length up front, else by counting the body as it arrives"""
+    
+    # Multipart framing allowance on top of the file bytes themselves
+    OVERHEAD_BYTES = 64 * 1024
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length", b"")
+        max_files = Config.BATCH_MAX_FILES if scope["path"].endswith("/batch") else 1
+        limit = max_files * (Config.PDF_MAX_SIZE_MB * 1024 * 1024 + self.OVERHEAD_BYTES)
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope, receive, send)
+            return
+        
+        # Chunked bodies (and understated Content-Length) are cut off once they pass the limit
+        received = 0
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise RequestBodyTooLarge()
+            return message
+        
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            # Normally answered by the HTTPException handler; this covers bodies read outside a route
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+    
+    @staticmethod
+    async def _reject(scope, receive, send):
+        error = RequestBodyTooLarge()
+        response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+        await response(scope, receive, send)
+
+
+class RequestTelemetryMiddleware:
+    """Assign a request id, record request time per endpoint and log one completion record per request"""
+    
+    REQUEST_ID_HEADER = b"x-request-id"
+    # Probes and scrapes would drown the log at INFO
+    QUIET_HANDLERS = {"liveness", "readiness", "get_metrics"}
+    
+    def __init__(self, app):
+        self.app = app
+    
+    @classmethod
+    def _request_id(cls, scope) -> str:
+        """Caller-supplied X-Request-ID (so ids line up with the main API) or a fresh one"""
+        for name, value in scope["headers"]:
+            if name == cls.REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1").strip()[:64]
+                if request_id.isprintable() and request_id:
+                    return request_id
+        return uuid.uuid4().hex
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = self._request_id(scope)
+        status = [CLIENT_CLOSED_REQUEST]
+        
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (self.REQUEST_ID_HEADER, request_id.encode("latin-1"))
+                ]
+            await send(message)
+        
+        token = bind_request(request_id)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status[0] = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            # The router stores the matched endpoint in the shared scope
+            endpoint = scope.get("endpoint")
+            handler = getattr(endpoint, "__name__", "unmatched")
+            REQUEST_SECONDS.observe(elapsed, handler, f"{status[0] // 100}xx")
+            
+            level = logging.DEBUG if handler in self.QUIET_HANDLERS else logging.INFO
+            if logger.isEnabledFor(level):
+                context = current_request()
+                logger.log(level, "%s %s -> %d", scope["method"], scope["path"], status[0], extra={
+                    "handler": handler,
+                    "status": status[0],
+                    "outcome": self._outcome(status[0]),
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "stages_ms": {stage: round(ms, 2) for stage, ms in context.stages_ms.items()},
+                    **context.fields
+                })
+            reset_request(token)
+    
+    @staticmethod
+    def _outcome(status: int) -> str:
+        if status == CLIENT_CLOSED_REQUEST:
+            return "client_closed"
+        if status >= 500:
+            return "server_error"
+        return "client_error" if status >= 400 else "success"
+
+
+app.add_middleware(UploadSizeLimitMiddleware)
+# Outermost, so rejected uploads (413) are counted and logged too
+app.add_middleware(RequestTelemetryMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -73,16 +273,41 @@ app.add_middleware(
 
 # Initialize services
 cv_service = CVService()
+job_matching_service = JobMatchingService()
+
+
+def result_caches() -> List[ResultCache]:
+    """The enabled AI result caches"""
+    caches = [cv_service.validation_cache, cv_service.extraction_cache, job_matching_service.match_cache]
+    return [cache for cache in caches if cache is not None]
+
+
+async def run_until_disconnected(request: Request, coro):
+    """Run a handler coroutine, cancelling it if the HTTP client disconnects"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=Config.DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                logger.info("Client disconnected, request cancelled")
+                return Response(status_code=CLIENT_CLOSED_REQUEST)
+    finally:
+        if not task.done():
+            task.cancel()
 
 
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Health check endpoint"""
+    snapshot = get_health_monitor().get_snapshot()
     return HealthResponse(
         status="healthy",
         version="1.0.0",
         services={
-            "gemini_ai": "ready",
+            "gemini_ai": "ready" if snapshot["gemini_ai"] == "connected" else snapshot["gemini_ai"],
             "document_processor": "available"
         },
         timestamp=datetime.utcnow().isoformat()
@@ -91,23 +316,38 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Detailed health check"""
-    gemini_client = get_gemini_client()
+    """Detailed health check (answered from the background probe snapshot)"""
+    snapshot = get_health_monitor().get_snapshot()
     
     return HealthResponse(
         status="healthy",
         version="1.0.0",
         services={
-            "gemini_ai": "connected" if gemini_client.check_connection() else "disconnected",
-            "pdf_processor": "available",
-            "current_model": gemini_client.current_model,
-            "available_models": len([m for m in gemini_client.fallback_models if m not in gemini_client.failed_models]),
-            "total_models": len(gemini_client.fallback_models)
+            **snapshot,
+            "pdf_processor": "available"
         },
         timestamp=datetime.utcnow().isoformat()
     )
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process and event loop are responsive"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: Gemini reachable and at least one model in rotation"""
+    monitor = get_health_monitor()
+    if not monitor.is_ready():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "not_ready", "services": monitor.get_snapshot()}
+        )
+    return {"status": "ready"}
+
+
 @app.get("/model-status")
 async def get_model_status():
     """Get detailed model status information"""
@@ -115,12 +355,29 @@ async def get_model_status():
         raise HTTPException(status_code=404, detail="Endpoint not available in production")
     
     gemini_client = get_gemini_client()
+    jobs = await asyncio.to_thread(get_job_queue().get_status_info)
     return {
         "model_status": gemini_client.get_status_info(),
+        "cache": cv_service.validation_cache.get_stats() if cv_service.validation_cache else None,
+        "extraction_cache": cv_service.extraction_cache.get_stats() if cv_service.extraction_cache else None,
+        "match_cache": job_matching_service.match_cache.get_stats() if job_matching_service.match_cache else None,
+        "job_index": job_matching_service.job_index.get_status_info(),
+        "skill_index": job_matching_service.skill_index.get_status_info(),
+        "extraction_pool": get_extraction_pool().get_status_info(),
+        "uploads": get_upload_reader().get_status_info(),
+        "jobs": jobs,
+        "validate_coalescing": cv_service.validation_flights.get_status_info(),
+        "fast_path": cv_service.pre_classifier.get_status_info() if cv_service.pre_classifier else None,
         "config": Config.get_settings_info()
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Per-stage latency histograms and counters in the Prometheus text format"""
+    return Response(REGISTRY.render(), headers={"Content-Type": MetricsRegistry.CONTENT_TYPE})
+
+
 @app.get("/config")
 async def get_config():
     """Get current configuration info (for debugging)"""
@@ -131,7 +388,7 @@ async def get_config():
 
 
 @app.post("/validate_cv", response_model=CVValidationResponse)
-async def validate_cv(file: UploadFile = File(...)):
+async def validate_cv(request: Request, file: UploadFile = File(...)):
     """
     Validate if uploaded file is a CV
     
@@ -149,19 +406,182 @@ async def validate_cv(file: UploadFile = File(...)):
                 file_info={"filename": file.filename, "error": "Invalid file type"}
             )
         
-        result = await cv_service.validate_cv_file(file)
+        result = await run_until_disconnected(request, cv_service.validate_cv_file(file))
         return result
         
+    except (ExtractionQueueFull, UploadCapacityExceeded) as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error validating CV: {str(e)}")
 
 
+async def run_validate_cv_job(content: bytes, filename: str) -> dict:
+    """Job queue handler for "validate_cv" jobs"""
+    return (await cv_service.validate_cv_content(content, filename)).model_dump()
+
+
+@app.post("/jobs/validate_cv", response_model=AsyncJobSubmitResponse, status_code=202)
+async def submit_validate_cv_job(
+    response: Response,
+    file: UploadFile = File(...),
+    callback_url: Optional[str] = Form(None)
+):
+    """
+    Queue a CV validation and return immediately
+    
+    - **file**: PDF or Word document file (DOCX, DOC) to validate
+    - **callback_url**: optional; the finished job (same body as GET /jobs/{job_id}) is POSTed there
+    - Returns: job id; poll GET /jobs/{job_id} for the result
+    """
+    job_queue = get_job_queue()
+    try:
+        callback_url = await asyncio.to_thread(job_queue.check_callback_url, callback_url)
+        async with get_upload_reader().read(file) as content:
+            job = await asyncio.to_thread(job_queue.submit, "validate_cv", content, file.filename, callback_url)
+    except (UploadRejected, InvalidCallbackUrl) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (JobQueueFull, UploadCapacityExceeded) as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    
+    status_url = f"/jobs/{job['job_id']}"
+    response.headers["Location"] = status_url
+    return AsyncJobSubmitResponse(**job, status_url=status_url)
+
+
+@app.get("/jobs/{job_id}", response_model=AsyncJobStatusResponse)
+async def get_job(job_id: str):
+    """Status of an async job, with its result once finished"""
+    job = await asyncio.to_thread(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found (unknown or expired)")
+    return job
+
+
+@app.post("/validate_cv/batch", response_model=CVBatchValidationResponse)
+async def validate_cv_batch(request: Request, files: List[UploadFile] = File(...)):
+    """
+    Validate many files in one call (nightly imports, bulk re-validation)
+    
+    - **files**: PDF or Word documents; several are packed into each Gemini prompt
+    - Returns: one result or error per file, in upload order
+    """
+    if len(files) > Config.BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files ({len(files)}); maximum per batch is {Config.BATCH_MAX_FILES}"
+        )
+    
+    try:
+        return await run_until_disconnected(request, cv_service.validate_cv_batch(files))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error validating CV batch: {str(e)}")
+
+
+@app.post("/extract_cv_info", response_model=CVExtractionResponse)
+async def extract_cv_info(request: Request, file: UploadFile = File(...)):
+    """
+    Extract structured information from a CV
+    
+    - **file**: PDF or Word document CV
+    - Returns: name, contacts, skills, experience, education, certifications, languages
+    """
+    try:
+        return await run_until_disconnected(request, cv_service.extract_cv_info(file))
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AIResponseError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except (ExtractionQueueFull, UploadCapacityExceeded) as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error extracting CV information: {str(e)}")
+
+
+@app.post("/match_cv_job", response_model=JobMatchResponse)
+async def match_cv_job(request: Request, match_request: JobMatchRequest):
+    """
+    Match a CV against a job description
+    
+    - **cv_text** / **job_description**: plain text
+    - Returns: match score, matching / missing skills and an assessment
+      (Gemini is only asked when the local prefilter score reaches MATCH_LLM_THRESHOLD)
+    """
+    try:
+        return await run_until_disconnected(request, job_matching_service.match_cv_job(match_request))
+    except AIResponseError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error matching CV: {str(e)}")
+
+
+@app.put("/job_postings")
+async def upsert_job_postings(upsert_request: JobPostingsUpsertRequest):
+    """Add or replace job postings used by /rank_jobs"""
+    total = await job_matching_service.upsert_jobs(upsert_request.jobs)
+    return {"upserted": len(upsert_request.jobs), "total_jobs": total}
+
+
+@app.delete("/job_postings/{job_id}")
+async def delete_job_posting(job_id: str):
+    """Remove a job posting from the ranking index"""
+    if not job_matching_service.delete_job(job_id):
+        raise HTTPException(status_code=404, detail=f"Job posting {job_id} is not indexed")
+    return {"deleted": job_id}
+
+
+@app.post("/job_postings/search", response_model=SkillIndexQueryResponse)
+async def search_job_postings(query: SkillIndexQuery):
+    """Candidate jobs sharing skills/keywords with a CV (text and/or skills)"""
+    return job_matching_service.find_candidates("job", query)
+
+
+@app.put("/cv_profiles")
+async def upsert_cv_profiles(upsert_request: CVProfilesUpsertRequest):
+    """Add or replace CV profiles used by /cv_profiles/search"""
+    total = await job_matching_service.upsert_cv_profiles(upsert_request.profiles)
+    return {"upserted": len(upsert_request.profiles), "total_cvs": total}
+
+
+@app.delete("/cv_profiles/{cv_id}")
+async def delete_cv_profile(cv_id: str):
+    """Remove a CV profile from the skill index"""
+    if not job_matching_service.delete_cv_profile(cv_id):
+        raise HTTPException(status_code=404, detail=f"CV profile {cv_id} is not indexed")
+    return {"deleted": cv_id}
+
+
+@app.post("/cv_profiles/search", response_model=SkillIndexQueryResponse)
+async def search_cv_profiles(query: SkillIndexQuery):
+    """Candidate CVs sharing skills/keywords with a job description (text and/or skills)"""
+    return job_matching_service.find_candidates("cv", query)
+
+
+@app.post("/rank_jobs", response_model=JobRankResponse)
+async def rank_jobs(request: Request, rank_request: JobRankRequest):
+    """
+    Rank indexed job postings for a CV
+    
+    - **cv_text**: CV plain text
+    - **top_k**: number of jobs to return (vector similarity over all postings)
+    - **rerank_top**: re-assess the best few with Gemini (ordered by match score)
+    """
+    try:
+        return await run_until_disconnected(request, job_matching_service.rank_jobs(rank_request))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error ranking jobs: {str(e)}")
+
+
 # Error handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
-    if Config.DEBUG_MODE:
-        print(f"Global error: {exc}")
+    logger.error("Unhandled error: %s", exc, exc_info=exc)
     
     return JSONResponse(
         status_code=500,
@@ -180,5 +600,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=Config.DEBUG_MODE,
-        log_level="debug" if Config.DEBUG_MODE else "info"
+        log_level="debug" if Config.DEBUG_MODE else "info",
+        access_log=False  # RequestTelemetryMiddleware logs every request
     )
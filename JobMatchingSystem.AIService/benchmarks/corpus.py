@@ -0,0 +1,389 @@
+"""
+Synthetic CV / non-CV corpus for benchmarks: PDF and DOCX, Vietnamese and
+English, 1-50 pages, with tables. Generation is deterministic for a seed.
+"""
+
+import io
+import os
+import random
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+from docx import Document
+
+
+@dataclass
+class SyntheticDocument:
+    """One generated file plus the ground truth the benchmarks check against"""
+    filename: str
+    content: bytes
+    is_cv: bool
+    kind: str  # "cv", "job_description", "invoice", "meeting_minutes", "report"
+    language: str  # "vi" or "en"
+    pages: int
+    file_type: str  # "pdf" or "docx"
+
+
+_TEXT = {
+    "vi": {
+        "names": ["Nguyễn Văn An", "Trần Thị Bích", "Lê Hoàng Nam", "Phạm Thu Hương", "Đặng Quốc Việt"],
+        "cv_headings": ["THÔNG TIN CÁ NHÂN", "MỤC TIÊU NGHỀ NGHIỆP", "KINH NGHIỆM LÀM VIỆC", "KỸ NĂNG",
+                        "DỰ ÁN", "HỌC VẤN", "CHỨNG CHỈ"],
+        "contact": "Email: {email} | Điện thoại: 09{phone} | Địa chỉ: Quận {district}, TP. Hồ Chí Minh",
+        "objective": "Mong muốn phát triển sự nghiệp lập trình viên, đóng góp vào các dự án phần mềm quy mô lớn.",
+        "job": "{start}-{end}: Lập trình viên tại Công ty {company}. Phát triển và bảo trì hệ thống {system}, "
+               "làm việc với nhóm {size} người, tối ưu hiệu năng truy vấn cơ sở dữ liệu.",
+        "project": "Dự án {system}: thiết kế API, viết kiểm thử tự động, triển khai trên {cloud}. "
+                   "Công nghệ sử dụng: {skills}.",
+        "education": "Đại học Bách Khoa TP.HCM - Kỹ sư Công nghệ Thông tin ({end}), GPA 3.{gpa}/4.0",
+        "certificate": "Chứng chỉ {cert} ({end})",
+        "skills_table": [("Kỹ năng", "Mức độ"), ("Python", "Thành thạo"), ("SQL", "Khá"), ("Docker", "Cơ bản")],
+        "paragraph": "Nội dung phần {index}: tổng hợp thông tin chi tiết, số liệu và ghi chú liên quan "
+                     "đến hoạt động của đơn vị trong kỳ báo cáo.",
+        "non_cv": {
+            "job_description": ("MÔ TẢ CÔNG VIỆC - TUYỂN DỤNG LẬP TRÌNH VIÊN",
+                                "Yêu cầu: tối thiểu 2 năm kinh nghiệm, thành thạo {skills}. Quyền lợi: lương "
+                                "cạnh tranh, bảo hiểm đầy đủ. Ứng viên gửi hồ sơ về phòng nhân sự."),
+            "invoice": ("HÓA ĐƠN GIÁ TRỊ GIA TĂNG",
+                        "Đơn vị bán hàng: Công ty {company}. Mã số thuế: 0312{phone}. Tổng tiền thanh toán "
+                        "đã bao gồm thuế VAT 10%."),
+            "meeting_minutes": ("BIÊN BẢN HỌP",
+                                "Thời gian: 9 giờ ngày {day}/05. Thành phần tham dự: ban giám đốc và các trưởng "
+                                "phòng. Nội dung: đánh giá tiến độ quý và phân công nhiệm vụ."),
+            "report": ("BÁO CÁO NGHIÊN CỨU",
+                       "Tóm tắt: nghiên cứu phân tích dữ liệu thị trường lao động. Phương pháp: khảo sát "
+                       "{size}00 doanh nghiệp. Kết luận và kiến nghị được trình bày ở cuối báo cáo."),
+        },
+        "invoice_table": [("STT", "Hàng hóa", "Số lượng", "Thành tiền"), ("1", "Máy tính", "2", "30.000.000"),
+                          ("2", "Màn hình", "4", "16.000.000")],
+    },
+    "en": {
+        "names": ["John Smith", "Emily Johnson", "Michael Brown", "Sarah Davis", "David Wilson"],
+        "cv_headings": ["PERSONAL INFORMATION", "CAREER OBJECTIVE", "WORK EXPERIENCE", "SKILLS",
+                        "PROJECTS", "EDUCATION", "CERTIFICATES"],
+        "contact": "Email: {email} | Phone: +84 9{phone} | Address: District {district}, Ho Chi Minh City",
+        "objective": "Software engineer looking to grow into a technical lead role on large-scale products.",
+        "job": "{start}-{end}: Software Engineer at {company}. Built and maintained the {system} platform "
+               "in a team of {size}, improved database query performance.",
+        "project": "{system} project: designed REST APIs, wrote automated tests, deployed on {cloud}. "
+                   "Technologies: {skills}.",
+        "education": "Bachelor of Computer Science, University of Technology ({end}), GPA 3.{gpa}/4.0",
+        "certificate": "{cert} certification ({end})",
+        "skills_table": [("Skill", "Level"), ("Python", "Advanced"), ("SQL", "Intermediate"), ("Docker", "Basic")],
+        "paragraph": "Section {index}: detailed figures, notes and follow-up items for the reporting period.",
+        "non_cv": {
+            "job_description": ("JOB DESCRIPTION - SOFTWARE ENGINEER",
+                                "Requirements: at least 2 years of experience with {skills}. Benefits: "
+                                "competitive salary, health insurance. Apply via the HR department."),
+            "invoice": ("INVOICE",
+                        "Seller: {company}. Tax code: 0312{phone}. Total amount due includes 10% VAT."),
+            "meeting_minutes": ("MEETING MINUTES",
+                                "Time: 9 AM, May {day}. Attendees: board of directors and department heads. "
+                                "Agenda: quarterly progress review and task assignment."),
+            "report": ("RESEARCH REPORT",
+                       "Abstract: an analysis of labour market data. Method: survey of {size}00 companies. "
+                       "Conclusions and recommendations are given at the end of the report."),
+        },
+        "invoice_table": [("No.", "Item", "Quantity", "Amount"), ("1", "Laptop", "2", "1,200.00"),
+                          ("2", "Monitor", "4", "640.00")],
+    },
+}
+
+_COMPANIES = ["FPT Software", "VNG", "Tiki", "MoMo", "KMS Technology", "NashTech"]
+_SYSTEMS = ["thương mại điện tử", "e-commerce", "ERP", "CRM", "payment gateway", "HRM"]
+_SKILLS = ["Python, FastAPI, PostgreSQL", "C#, .NET, SQL Server", "Java, Spring Boot, Kafka", "React, TypeScript, Node.js"]
+_CLOUDS = ["AWS", "Azure", "Google Cloud"]
+_CERTS = ["AWS Solutions Architect", "IELTS 7.0", "Scrum Master", "Azure Developer"]
+
+NON_CV_KINDS = ("job_description", "invoice", "meeting_minutes", "report")
+
+# Lines that fit on one A4 page at the PDF writer's font size and leading
+_LINES_PER_PAGE = 48
+
+
+def _fill(template: str, rng: random.Random, index: int = 0) -> str:
+    end = rng.randint(2015, 2024)
+    return template.format(
+        email=f"user{rng.randint(100, 999)}@gmail.com",
+        phone=f"{rng.randint(10000000, 99999999)}",
+        district=rng.randint(1, 12),
+        start=end - rng.randint(1, 4),
+        end=end,
+        company=rng.choice(_COMPANIES),
+        system=rng.choice(_SYSTEMS),
+        size=rng.randint(3, 15),
+        cloud=rng.choice(_CLOUDS),
+        skills=rng.choice(_SKILLS),
+        gpa=rng.randint(0, 9),
+        cert=rng.choice(_CERTS),
+        day=rng.randint(1, 28),
+        index=index,
+    )
+
+
+def _line_count(blocks: Sequence[Tuple[str, object]]) -> int:
+    """Lines the PDF writer uses for the blocks (each block is followed by a blank line)"""
+    return sum((len(value) if block_type == "table" else len(_wrap(value))) + 1 for block_type, value in blocks)
+
+
+def _pad(head: List[Tuple[str, object]], tail: List[Tuple[str, object]], pages: int, filler) -> List[Tuple[str, object]]:
+    """head + as many filler blocks as fit in `pages` pages + tail (at least one filler block)"""
+    budget = pages * _LINES_PER_PAGE - _line_count(head) - _line_count(tail)
+    body: List[Tuple[str, object]] = []
+    while True:
+        block = ("text", filler(len(body)))
+        cost = _line_count([block])
+        if body and cost > budget:
+            break
+        body.append(block)
+        budget -= cost
+    return head + body + tail
+
+
+def _cv_blocks(language: str, pages: int, rng: random.Random) -> List[Tuple[str, object]]:
+    """("heading" | "text", str) and ("table", rows) blocks filling `pages` pages"""
+    t = _TEXT[language]
+    headings = t["cv_headings"]
+    head: List[Tuple[str, object]] = [
+        ("heading", rng.choice(t["names"])),
+        ("heading", headings[0]),
+        ("text", _fill(t["contact"], rng)),
+        ("heading", headings[1]),
+        ("text", t["objective"]),
+        ("heading", headings[2]),
+    ]
+    # Experience and projects grow with the page count; the rest stays fixed
+    tail: List[Tuple[str, object]] = [
+        ("heading", headings[3]),
+        ("table", t["skills_table"]),
+        ("heading", headings[4]),
+        ("text", _fill(t["project"], rng)),
+        ("heading", headings[5]),
+        ("text", _fill(t["education"], rng)),
+        ("heading", headings[6]),
+        ("text", _fill(t["certificate"], rng)),
+    ]
+    return _pad(head, tail, pages, lambda index: _fill(t["job"] if index % 2 == 0 else t["project"], rng, index))
+
+
+def _non_cv_blocks(kind: str, language: str, pages: int, rng: random.Random) -> List[Tuple[str, object]]:
+    t = _TEXT[language]
+    title, body = t["non_cv"][kind]
+    head: List[Tuple[str, object]] = [("heading", title), ("text", _fill(body, rng))]
+    if kind == "invoice":
+        head.append(("table", t["invoice_table"]))
+    return _pad(head, [], pages, lambda index: _fill(t["paragraph"], rng, index + 1))
+
+
+def _wrap(text: str, width: int = 95) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    return lines + ([line] if line else [])
+
+
+def build_docx(blocks: Sequence[Tuple[str, object]], title: str = "") -> bytes:
+    """Render blocks as a Word document (headings, paragraphs, real tables)"""
+    document = Document()
+    document.core_properties.title = title
+    for block_type, value in blocks:
+        if block_type == "heading":
+            document.add_heading(value, level=2)
+        elif block_type == "text":
+            document.add_paragraph(value)
+        else:
+            rows = value
+            table = document.add_table(rows=len(rows), cols=len(rows[0]))
+            table.style = "Table Grid"
+            for row, cells in zip(table.rows, rows):
+                for cell, text in zip(row.cells, cells):
+                    cell.text = text
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class _PdfWriter:
+    """Minimal text-only PDF writer (Helvetica, one content stream per page).
+
+    Non-ASCII characters (Vietnamese diacritics) are given single-byte codes
+    from 128 upwards with a ToUnicode CMap, so text extraction returns the
+    original Unicode text; nothing is embedded, which keeps files small and
+    generation free of extra dependencies.
+    """
+
+    PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+    MARGIN, FONT_SIZE, LEADING = 50, 10, 15
+
+    def __init__(self):
+        self._codes = {}
+
+    def _encode(self, text: str) -> bytes:
+        out = bytearray()
+        for char in text:
+            code = ord(char)
+            if 32 <= code < 127:
+                if char in "()\\":
+                    out += b"\\"
+                out.append(code)
+                continue
+            if char not in self._codes:
+                if len(self._codes) >= 128:
+                    out += b"?"
+                    continue
+                self._codes[char] = 128 + len(self._codes)
+            out.append(self._codes[char])
+        return bytes(out)
+
+    def _page_stream(self, lines: List[Tuple[str, object]]) -> bytes:
+        ops = [b"BT", b"/F1 %d Tf" % self.FONT_SIZE, b"%d TL" % self.LEADING,
+               b"%d %d Td" % (self.MARGIN, self.PAGE_HEIGHT - self.MARGIN)]
+        graphics = []
+        y = self.PAGE_HEIGHT - self.MARGIN
+        for line_type, value in lines:
+            if line_type == "row":
+                # Table row: cells at fixed column offsets plus a rule under the row
+                cells = value
+                column = (self.PAGE_WIDTH - 2 * self.MARGIN) // len(cells)
+                for index, cell in enumerate(cells):
+                    if index:
+                        ops.append(b"%d 0 Td" % column)
+                    ops.append(b"(%s) Tj" % self._encode(cell))
+                if len(cells) > 1:
+                    ops.append(b"%d 0 Td" % (-column * (len(cells) - 1)))
+                graphics.append(b"%d %d m %d %d l S" % (self.MARGIN, y - 4, self.PAGE_WIDTH - self.MARGIN, y - 4))
+            else:
+                ops.append(b"(%s) Tj" % self._encode(value))
+            ops.append(b"T*")
+            y -= self.LEADING
+        ops.append(b"ET")
+        return b"\n".join(graphics + ops)
+
+    def _to_unicode(self) -> bytes:
+        entries = b"\n".join(b"<%02X> <%04X>" % (code, ord(char)) for char, code in self._codes.items())
+        return (
+            b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+            b"/CMapName /Synthetic-UCS def /CMapType 2 def\n"
+            b"1 begincodespacerange <00> <FF> endcodespacerange\n"
+            b"1 beginbfrange <20> <7E> <0020> endbfrange\n"
+            + b"%d beginbfchar\n" % len(self._codes) + entries + b"\nendbfchar\n"
+            b"endcmap CMapName currentdict /CMap defineresource pop end end"
+        )
+
+    def render(self, pages: List[List[Tuple[str, object]]], title: str = "") -> bytes:
+        streams = [self._page_stream(page) for page in pages]
+        objects: List[bytes] = []
+
+        def add(body: bytes) -> int:
+            objects.append(body)
+            return len(objects)
+
+        def stream(data: bytes) -> bytes:
+            packed = zlib.compress(data)
+            return b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(packed) + packed + b"\nendstream"
+
+        catalog = add(b"")
+        pages_ref = add(b"")
+        to_unicode = add(stream(self._to_unicode()) if self._codes else stream(b""))
+        font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /ToUnicode %d 0 R >>" % to_unicode)
+        page_refs = []
+        for data in streams:
+            content = add(stream(data))
+            page_refs.append(add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> "
+                b"/Contents %d 0 R >>" % (pages_ref, self.PAGE_WIDTH, self.PAGE_HEIGHT, font, content)
+            ))
+        info = add(b"<< /Title (%s) /Creator (benchmarks.corpus) >>" % self._encode(title))
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_ref
+        objects[pages_ref - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % ref for ref in page_refs), len(page_refs)
+        )
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objects) + 1, catalog, info, xref
+        )
+        return bytes(out)
+
+
+def build_pdf(blocks: Sequence[Tuple[str, object]], title: str = "") -> bytes:
+    """Render blocks as a text PDF, wrapping lines and breaking pages"""
+    lines: List[Tuple[str, object]] = []
+    for block_type, value in blocks:
+        if block_type == "table":
+            lines += [("row", row) for row in value]
+        else:
+            lines += [("text", line) for line in _wrap(value)]
+        lines.append(("text", ""))
+    pages = [lines[i:i + _LINES_PER_PAGE] for i in range(0, len(lines), _LINES_PER_PAGE)] or [[]]
+    return _PdfWriter().render(pages, title)
+
+
+def generate_document(kind: str, language: str, pages: int, file_type: str, seed: int) -> SyntheticDocument:
+    """Generate one document of the given kind ("cv" or one of NON_CV_KINDS)"""
+    rng = random.Random(f"{kind}-{language}-{pages}-{file_type}-{seed}")
+    if kind == "cv":
+        blocks = _cv_blocks(language, pages, rng)
+    else:
+        blocks = _non_cv_blocks(kind, language, pages, rng)
+    title = str(blocks[0][1])
+    content = build_pdf(blocks, title) if file_type == "pdf" else build_docx(blocks, title)
+    return SyntheticDocument(
+        filename=f"{kind}_{language}_{pages}p_{seed}.{file_type}",
+        content=content,
+        is_cv=kind == "cv",
+        kind=kind,
+        language=language,
+        pages=pages,
+        file_type=file_type,
+    )
+
+
+def generate_corpus(
+    seed: int = 0,
+    page_counts: Sequence[int] = (1, 2, 5, 20, 50),
+    languages: Sequence[str] = ("vi", "en"),
+    file_types: Sequence[str] = ("pdf", "docx"),
+    non_cv_kinds: Optional[Sequence[str]] = None,
+) -> List[SyntheticDocument]:
+    """Every combination of page count, language and file type, for CVs and each non-CV kind"""
+    kinds = ("cv",) + tuple(NON_CV_KINDS if non_cv_kinds is None else non_cv_kinds)
+    return [
+        generate_document(kind, language, pages, file_type, seed)
+        for kind in kinds
+        for pages in page_counts
+        for language in languages
+        for file_type in file_types
+    ]
+
+
+def write_corpus(documents: Sequence[SyntheticDocument], directory: str) -> None:
+    """Write the files to disk (for manual testing with curl or the .NET client)"""
+    os.makedirs(directory, exist_ok=True)
+    for document in documents:
+        with open(os.path.join(directory, document.filename), "wb") as f:
+            f.write(document.content)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write the synthetic benchmark corpus to a directory")
+    parser.add_argument("directory")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    corpus = generate_corpus(args.seed)
+    write_corpus(corpus, args.directory)
+    print(f"Wrote {len(corpus)} documents to {args.directory}")
@@ -0,0 +1,196 @@
+"""
+Deterministic in-process stand-in for the google-genai client.
+
+It replaces `GeminiClient.client` (the SDK object), so benchmarks still run
+the service's own fallback cascade, circuit breakers, rate limiter, context
+cache and JSON handling - only the network round trip is simulated.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Any
+import requests
+from google.genai import errors as genai_errors
+from utils.cv_classifier import CVFeatures
+from utils.gemini_client import GeminiClient
+
+# Error kinds a model profile can inject, mapped to what the real API answers
+ERROR_KINDS = ("quota", "not_found", "server", "hang")
+
+
+@dataclass
+class ModelProfile:
+    """Simulated behaviour of one model"""
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0  # Uniform +/- around latency_ms
+    error_rate: float = 0.0  # Fraction of calls that fail with `error_kind`
+    error_kind: str = "quota"  # One of ERROR_KINDS; "hang" never answers (the client's timeout fires)
+
+
+@dataclass
+class FakeUsageMetadata:
+    prompt_token_count: int
+    candidates_token_count: int
+    cached_content_token_count: int = 0
+    total_token_count: int = 0
+
+
+@dataclass
+class FakeResponse:
+    text: str
+    usage_metadata: FakeUsageMetadata
+
+
+@dataclass
+class FakeCachedContent:
+    name: str
+
+
+def _api_error(cls, code: int, status: str, message: str):
+    response = requests.Response()
+    response.status_code = code
+    response._content = json.dumps({"error": {"code": code, "status": status, "message": message}}).encode()
+    return cls(code, response)
+
+
+_CONTENT_MARKERS = re.compile(r"===== (?:NỘI DUNG FILE|NỘI DUNG CV|TÀI LIỆU \d+) =====\n(.*?)\n==========================", re.S)
+
+
+class FakeGenAI:
+    """The subset of `genai.Client` the service uses: models.generate_content (sync and aio),
+    aio.caches.create and models.get, with per-model latency and error injection.
+
+    Answers are a pure function of the prompt (validation verdicts use the same
+    keyword heuristic as the fast path), so runs are reproducible for a seed.
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, ModelProfile]] = None,
+                 default_profile: Optional[ModelProfile] = None, seed: int = 0):
+        self.profiles = dict(profiles or {})
+        self.default_profile = default_profile or ModelProfile()
+        self._rng = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.models = _FakeModels(self)
+        self.aio = _FakeAio(self)
+
+    def profile(self, model: str) -> ModelProfile:
+        return self.profiles.get(model, self.default_profile)
+
+    def _draw(self, model: str):
+        """Latency (seconds) and injected error kind (or None) for one call"""
+        profile = self.profile(model)
+        latency = max(0.0, profile.latency_ms + self._rng.uniform(-profile.jitter_ms, profile.jitter_ms)) / 1000
+        error = profile.error_kind if self._rng.random() < profile.error_rate else None
+        self.calls[model] = self.calls.get(model, 0) + 1
+        if error:
+            self.errors[model] = self.errors.get(model, 0) + 1
+        return latency, error
+
+    @staticmethod
+    def _raise(model: str, kind: str) -> None:
+        if kind == "quota":
+            raise _api_error(genai_errors.ClientError, 429, "RESOURCE_EXHAUSTED", f"Quota exceeded for {model}")
+        if kind == "not_found":
+            raise _api_error(genai_errors.ClientError, 404, "NOT_FOUND", f"{model} is not found")
+        raise _api_error(genai_errors.ServerError, 503, "UNAVAILABLE", "The model is overloaded")
+
+    @staticmethod
+    def answer(prompt: str, config: Any = None) -> str:
+        """Deterministic response text for a prompt"""
+        blocks = _CONTENT_MARKERS.findall(prompt)
+        wants_json = getattr(config, "response_mime_type", None) == "application/json"
+
+        if "===== TÀI LIỆU 0 =====" in prompt:
+            return json.dumps([
+                {"index": index, "verdict": CVFeatures.extract(text.lower()).verdict(text.lower())}
+                for index, text in enumerate(blocks)
+            ], ensure_ascii=False)
+        if wants_json and "MÔ TẢ CÔNG VIỆC" in prompt:
+            score = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % 61 + 30
+            return json.dumps({
+                "match_score": score, "matching_skills": ["Python"], "missing_skills": ["AWS"],
+                "overall_assessment": "Synthetic assessment", "recommendations": ["Learn AWS"]
+            })
+        if wants_json:
+            return json.dumps({
+                "name": "Nguyễn Văn An", "email": "user100@gmail.com", "phone": "0901234567",
+                "skills": ["Python", "SQL"], "experience_years": 3, "education": "Đại học Bách Khoa",
+                "certifications": [], "languages": ["Tiếng Việt", "English"]
+            }, ensure_ascii=False)
+
+        content = (blocks[0] if blocks else prompt).lower()
+        return CVFeatures.extract(content).verdict(content)
+
+    def _response(self, prompt: str, config: Any) -> FakeResponse:
+        text = self.answer(prompt, config)
+        prompt_tokens = len(prompt) // 4
+        cached = 700 if getattr(config, "cached_content", None) else 0
+        return FakeResponse(text, FakeUsageMetadata(
+            prompt_token_count=prompt_tokens + cached,
+            candidates_token_count=len(text) // 4,
+            cached_content_token_count=cached,
+            total_token_count=prompt_tokens + cached + len(text) // 4
+        ))
+
+    def get_status_info(self) -> Dict[str, Any]:
+        return {"calls": dict(self.calls), "errors": dict(self.errors)}
+
+
+class _FakeModels:
+    def __init__(self, fake: FakeGenAI):
+        self._fake = fake
+
+    def generate_content(self, model: str, contents: str, config: Any = None) -> FakeResponse:
+        latency, error = self._fake._draw(model)
+        if error == "hang":
+            time.sleep(3600)
+        time.sleep(latency)
+        if error:
+            self._fake._raise(model, error)
+        return self._fake._response(contents, config)
+
+    def get(self, model: str) -> Dict[str, str]:
+        return {"name": model}
+
+
+class _FakeAsyncModels:
+    def __init__(self, fake: FakeGenAI):
+        self._fake = fake
+
+    async def generate_content(self, model: str, contents: str, config: Any = None) -> FakeResponse:
+        latency, error = self._fake._draw(model)
+        if error == "hang":
+            await asyncio.sleep(3600)
+        await asyncio.sleep(latency)
+        if error:
+            self._fake._raise(model, error)
+        return self._fake._response(contents, config)
+
+
+class _FakeCaches:
+    def __init__(self):
+        self._count = 0
+
+    async def create(self, model: str, config: Any = None) -> FakeCachedContent:
+        self._count += 1
+        return FakeCachedContent(name=f"cachedContents/fake-{self._count}")
+
+
+class _FakeAio:
+    def __init__(self, fake: FakeGenAI):
+        self.models = _FakeAsyncModels(fake)
+        self.caches = _FakeCaches()
+
+
+def install_fake_gemini(client: GeminiClient, fake: Optional[FakeGenAI] = None) -> FakeGenAI:
+    """Point an existing GeminiClient (e.g. the service singleton) at a FakeGenAI"""
+    fake = fake or FakeGenAI()
+    client.client = fake
+    client.context_cache.client = fake
+    return fake
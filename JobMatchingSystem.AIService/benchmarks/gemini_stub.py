@@ -0,0 +1,258 @@
+"""
+Local HTTP stand-in for the subset of the Gemini API the service uses
+(generateContent, cachedContents, model metadata), for load and chaos tests.
+
+    python -m benchmarks.gemini_stub --port 8090 --scenario benchmarks/scenarios/quota_storm.json
+    GEMINI_BASE_URL=http://127.0.0.1:8090 GOOGLE_API_KEY=stub python ai_service.py
+
+Per-model behaviour comes from a scenario (see benchmarks/scenarios/) and can
+be swapped at runtime with PUT /_stub/scenario; GET /_stub/stats returns
+call counts by model and outcome since the scenario was loaded.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from benchmarks.fake_gemini import FakeGenAI
+
+# HTTP status and Gemini error status for each injectable failure
+ERRORS = {
+    "quota": (429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."),
+    "not_found": (404, "NOT_FOUND", "Model is not found for API version v1beta."),
+    "server": (503, "UNAVAILABLE", "The model is overloaded. Please try again later."),
+}
+
+
+@dataclass
+class LatencyDistribution:
+    """fixed {value_ms}, uniform {min_ms, max_ms} or lognormal {p50_ms, p99_ms}"""
+    distribution: str = "fixed"
+    value_ms: float = 100.0
+    min_ms: float = 0.0
+    max_ms: float = 0.0
+    p50_ms: float = 100.0
+    p99_ms: float = 100.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == "uniform":
+            return rng.uniform(self.min_ms, self.max_ms) / 1000
+        if self.distribution == "lognormal":
+            # z(0.99) = 2.326: sigma chosen so the 99th percentile lands on p99_ms
+            sigma = max(0.0, math.log(self.p99_ms / self.p50_ms) / 2.326)
+            return rng.lognormvariate(math.log(self.p50_ms), sigma) / 1000
+        return self.value_ms / 1000
+
+
+@dataclass
+class Burst:
+    """An error window, relative to when the scenario was loaded (optionally repeating)"""
+    kind: str
+    start_s: float
+    duration_s: float
+    every_s: Optional[float] = None
+
+    def active(self, elapsed: float) -> bool:
+        if elapsed < self.start_s:
+            return False
+        offset = elapsed - self.start_s
+        if self.every_s:
+            offset %= self.every_s
+        return offset < self.duration_s
+
+
+@dataclass
+class ModelBehaviour:
+    available: bool = True  # False: every call is a 404
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    error_rates: Dict[str, float] = field(default_factory=dict)  # kind ("quota", "server", "hang") -> probability
+    bursts: List[Burst] = field(default_factory=list)
+    hang_seconds: float = 600.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: Optional["ModelBehaviour"] = None) -> "ModelBehaviour":
+        base = base or cls()
+        latency = data.get("latency_ms")
+        return cls(
+            available=data.get("available", base.available),
+            latency=LatencyDistribution(**latency) if latency else base.latency,
+            error_rates=dict(data.get("errors", base.error_rates)),
+            bursts=[Burst(**burst) for burst in data["bursts"]] if "bursts" in data else list(base.bursts),
+            hang_seconds=data.get("hang_seconds", base.hang_seconds),
+        )
+
+    def outcome(self, elapsed: float, rng: random.Random) -> str:
+        """"ok" or the failure kind for one call"""
+        if not self.available:
+            return "not_found"
+        for burst in self.bursts:
+            if burst.active(elapsed):
+                return burst.kind
+        draw = rng.random()
+        for kind, rate in self.error_rates.items():
+            if draw < rate:
+                return kind
+            draw -= rate
+        return "ok"
+
+
+class Scenario:
+    """Stub behaviour per model plus the clock bursts are measured against"""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, seed: int = 0):
+        data = data or {}
+        self.raw = data
+        self.default = ModelBehaviour.from_dict(data.get("default", {}))
+        self.models = {
+            self._normalize(name): ModelBehaviour.from_dict(spec, self.default)
+            for name, spec in data.get("models", {}).items()
+        }
+        self.cache_supported = data.get("context_cache", True)
+        self.started = time.monotonic()
+        self.rng = random.Random(data.get("seed", seed))
+        self.stats: Dict[str, Counter] = defaultdict(Counter)
+
+    @staticmethod
+    def _normalize(model: str) -> str:
+        return model if model.startswith("models/") else f"models/{model}"
+
+    def behaviour(self, model: str) -> ModelBehaviour:
+        return self.models.get(self._normalize(model), self.default)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+def _error(kind: str) -> JSONResponse:
+    code, status, message = ERRORS[kind]
+    return JSONResponse(status_code=code, content={"error": {"code": code, "message": message, "status": status}})
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    parts = []
+    for content in body.get("contents", []):
+        for part in content.get("parts", []):
+            parts.append(part.get("text", ""))
+    return "\n".join(parts)
+
+
+def create_app(scenario: Scenario) -> FastAPI:
+    app = FastAPI(title="Gemini stub")
+    app.state.scenario = scenario
+
+    @app.post("/{version}/models/{model_action}")
+    async def generate_content(version: str, model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        if action != "generateContent":
+            return _error("not_found")
+        current: Scenario = app.state.scenario
+        behaviour = current.behaviour(model)
+        outcome = behaviour.outcome(current.elapsed(), current.rng)
+        current.stats[current._normalize(model)][outcome] += 1
+
+        if outcome == "hang":
+            await asyncio.sleep(behaviour.hang_seconds)
+            return _error("server")
+        if outcome == "not_found":
+            return _error("not_found")
+        await asyncio.sleep(behaviour.latency.sample(current.rng))
+        if outcome != "ok":
+            return _error(outcome)
+
+        body = await request.json()
+        prompt = _prompt_text(body)
+        generation_config = body.get("generationConfig") or {}
+        config = SimpleNamespace(
+            response_mime_type=generation_config.get("responseMimeType"),
+            cached_content=body.get("cachedContent")
+        )
+        text = FakeGenAI.answer(prompt, config)
+        cached = 700 if body.get("cachedContent") else 0
+        prompt_tokens = len(prompt) // 4 + cached
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": len(text) // 4,
+                "cachedContentTokenCount": cached,
+                "totalTokenCount": prompt_tokens + len(text) // 4
+            },
+            "modelVersion": model
+        }
+
+    @app.get("/{version}/models/{model}")
+    async def get_model(version: str, model: str):
+        current: Scenario = app.state.scenario
+        if not current.behaviour(model).available:
+            return _error("not_found")
+        return {"name": current._normalize(model), "displayName": f"stub {model}"}
+
+    @app.post("/{version}/cachedContents")
+    async def create_cached_content(version: str, request: Request):
+        current: Scenario = app.state.scenario
+        body = await request.json()
+        model = body.get("model", "")
+        if not current.cache_supported or not current.behaviour(model).available:
+            code, status = 400, "INVALID_ARGUMENT"
+            return JSONResponse(status_code=code, content={"error": {
+                "code": code, "message": "Cached content is not supported for this model", "status": status
+            }})
+        current.stats[current._normalize(model)]["cache_created"] += 1
+        return {"name": f"cachedContents/stub-{int(time.time() * 1000)}", "model": model}
+
+    @app.put("/_stub/scenario")
+    async def put_scenario(request: Request):
+        app.state.scenario = Scenario(await request.json())
+        return {"status": "loaded", "models": sorted(app.state.scenario.models)}
+
+    @app.get("/_stub/scenario")
+    async def get_scenario():
+        return app.state.scenario.raw
+
+    @app.get("/_stub/stats")
+    async def get_stats():
+        current: Scenario = app.state.scenario
+        return {
+            "elapsed_s": round(current.elapsed(), 1),
+            "models": {model: dict(counts) for model, counts in current.stats.items()}
+        }
+
+    return app
+
+
+def load_scenario(path: Optional[str]) -> Dict[str, Any]:
+    """Scenario files may also hold a "load" section for benchmarks.load; the stub uses "stub" if present"""
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("stub", data)
+
+
+def main(argv=None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--scenario", help="Scenario JSON (default: every model answers in 100ms)")
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(Scenario(load_scenario(args.scenario))), host=args.host, port=args.port,
+                log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Open-loop load generator for POST /validate_cv against a running service,
+normally one pointed at benchmarks.gemini_stub via GEMINI_BASE_URL.
+
+    python -m benchmarks.load --scenario benchmarks/scenarios/quota_storm.json \\
+        --url http://127.0.0.1:8000 --stub-url http://127.0.0.1:8090
+
+Requests are sent on a fixed schedule at the target RPS whether or not earlier
+ones finished, so saturation shows up as growing latency and errors instead of
+a silently lower send rate. The report combines client-side latencies with the
+service's /metrics deltas (Gemini outcomes per model, fallbacks, quota errors)
+and, when DEBUG_MODE exposes /model-status, a per-second circuit breaker timeline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.run import summarize
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+# /metrics series reported as before/after deltas
+REPORTED_SERIES = (
+    "ai_service_gemini_call_seconds_count",
+    "ai_service_gemini_fallbacks_total",
+    "ai_service_gemini_quota_errors_total",
+    "ai_service_request_duration_seconds_count",
+    "ai_service_fast_path_decisions_total",
+)
+
+
+def parse_metrics(text: str) -> Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]:
+    """Prometheus text format -> {(name, sorted labels): value}"""
+    samples = {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match or line.startswith("#"):
+            continue
+        name, labels, value = match.groups()
+        samples[(name, tuple(sorted(_LABEL.findall(labels or ""))))] = float(value)
+    return samples
+
+
+def metric_deltas(before: Dict, after: Dict) -> Dict[str, Dict[str, float]]:
+    deltas: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for (name, labels), value in after.items():
+        if name not in REPORTED_SERIES:
+            continue
+        change = value - before.get((name, labels), 0.0)
+        if change:
+            deltas[name][",".join(f"{key}={val}" for key, val in labels) or "total"] = change
+    return dict(deltas)
+
+
+async def _fetch_metrics(client: httpx.AsyncClient, url: str) -> Dict:
+    try:
+        response = await client.get(f"{url}/metrics")
+        return parse_metrics(response.text) if response.status_code == 200 else {}
+    except httpx.HTTPError:
+        return {}
+
+
+async def _poll_breakers(client: httpx.AsyncClient, url: str, started: float, timeline: List[Dict], stop: asyncio.Event):
+    """Record non-closed circuits once a second (needs DEBUG_MODE for /model-status)"""
+    while not stop.is_set():
+        try:
+            response = await client.get(f"{url}/model-status")
+            if response.status_code != 200:
+                return
+            breakers = response.json()["model_status"].get("circuit_breakers", {})
+            timeline.append({
+                "t_s": round(time.perf_counter() - started, 1),
+                "not_closed": {model: info.get("state") for model, info in breakers.items()
+                               if info.get("state") != "closed"},
+                "current_model": response.json()["model_status"].get("current_model"),
+            })
+        except (httpx.HTTPError, KeyError, ValueError):
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(url: str, rps: float, duration_s: float, page_counts, seed: int,
+                   stub_url: Optional[str], stub_scenario: Optional[Dict[str, Any]], timeout_s: float) -> Dict[str, Any]:
+    corpus = generate_corpus(seed, page_counts=page_counts)
+    total = int(rps * duration_s)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    per_second: Dict[int, Counter] = defaultdict(Counter)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+
+    async with httpx.AsyncClient(timeout=timeout_s, limits=limits) as client:
+        if stub_url and stub_scenario is not None:
+            response = await client.put(f"{stub_url}/_stub/scenario", json=stub_scenario)
+            response.raise_for_status()
+        before = await _fetch_metrics(client, url)
+
+        async def one(index: int, scheduled: float):
+            document = corpus[index % len(corpus)]
+            second = int(scheduled)
+            try:
+                response = await client.post(f"{url}/validate_cv", files={"file": (document.filename, document.content)})
+                status = str(response.status_code)
+            except httpx.TimeoutException:
+                status = "timeout"
+            except httpx.HTTPError:
+                status = "connection_error"
+            latencies.append(time.perf_counter() - started - scheduled)
+            statuses[status] += 1
+            per_second[second][status] += 1
+
+        timeline: List[Dict] = []
+        stop = asyncio.Event()
+        started = time.perf_counter()
+        poller = asyncio.ensure_future(_poll_breakers(client, url, started, timeline, stop))
+        tasks = []
+        for index in range(total):
+            scheduled = index / rps
+            delay = started + scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(one(index, scheduled)))
+        send_finished = time.perf_counter() - started
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+        stop.set()
+        await poller
+
+        after = await _fetch_metrics(client, url)
+        stub_stats = None
+        if stub_url:
+            try:
+                stub_stats = (await client.get(f"{stub_url}/_stub/stats")).json()
+            except (httpx.HTTPError, ValueError):
+                pass
+
+    latency = summarize(latencies, wall)
+    return {
+        "target_rps": rps,
+        "duration_s": duration_s,
+        "sent": total,
+        # Below the target means the generator itself could not keep up
+        "achieved_send_rps": round(total / send_finished, 2) if send_finished else None,
+        "latency": latency,
+        "status_codes": dict(sorted(statuses.items())),
+        "per_second": {second: dict(counts) for second, counts in sorted(per_second.items())},
+        "service_metrics": metric_deltas(before, after),
+        "breaker_timeline": timeline,
+        "stub": stub_stats,
+    }
+
+
+def print_summary(report: Dict[str, Any]) -> None:
+    latency = report["latency"]
+    print(f"Sent {report['sent']} requests at {report['achieved_send_rps']} rps (target {report['target_rps']})")
+    print(f"Latency ms: p50 {latency.get('p50_ms')}  p95 {latency.get('p95_ms')}  p99 {latency.get('p99_ms')}  "
+          f"max {latency.get('max_ms')}  completed {latency.get('throughput_rps')} rps")
+    print(f"Status codes: {report['status_codes']}")
+    for name, series in report["service_metrics"].items():
+        print(f"{name}:")
+        for labels, value in sorted(series.items()):
+            print(f"    {labels:<60} {value:g}")
+    transitions = []
+    previous = None
+    for sample in report["breaker_timeline"]:
+        state = (tuple(sorted(sample["not_closed"].items())), sample["current_model"])
+        if state != previous:
+            transitions.append(f"    t={sample['t_s']:>6}s current={sample['current_model']} not_closed={sample['not_closed']}")
+            previous = state
+    if transitions:
+        print("Circuit breaker changes:")
+        print("\n".join(transitions))
+    if report["stub"]:
+        print(f"Stub calls by model/outcome: {json.dumps(report['stub']['models'])}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="AI service base URL")
+    parser.add_argument("--stub-url", help="Gemini stub base URL (loads the scenario's stub section, reads its stats)")
+    parser.add_argument("--scenario", help="Scenario JSON with \"stub\" and \"load\" sections")
+    parser.add_argument("--rps", type=float, help="Target requests per second (overrides the scenario)")
+    parser.add_argument("--duration", type=float, help="Seconds of load (overrides the scenario)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    scenario: Dict[str, Any] = {}
+    if args.scenario:
+        with open(args.scenario, encoding="utf-8") as f:
+            scenario = json.load(f)
+    load = scenario.get("load", {})
+    report = asyncio.run(run_load(
+        url=args.url.rstrip("/"),
+        rps=args.rps or load.get("rps", 10),
+        duration_s=args.duration or load.get("duration_s", 30),
+        page_counts=tuple(load.get("page_counts", (1, 2, 5))),
+        seed=args.seed,
+        stub_url=args.stub_url.rstrip("/") if args.stub_url else None,
+        stub_scenario=scenario.get("stub") if args.scenario else None,
+        timeout_s=args.timeout,
+    ))
+    report["scenario"] = args.scenario
+
+    print_summary(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
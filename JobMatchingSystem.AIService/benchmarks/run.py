@@ -0,0 +1,315 @@
+"""
+Offline benchmarks for the AI service (no Gemini quota used).
+
+    python -m benchmarks.run --out benchmarks/results/baseline.json
+    python -m benchmarks.run --quick --compare benchmarks/results/baseline.json
+
+Each benchmark reports latency percentiles in milliseconds; results are
+written as JSON so two runs (e.g. before / after a change) can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Any, Sequence
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_ROOT)
+
+from benchmarks.corpus import SyntheticDocument, generate_corpus
+
+# Applied (unless already set) before any service module reads Config: no caches or
+# snapshots that would turn repeated documents into hits, no client-side quota limits
+BENCHMARK_ENV = {
+    "GOOGLE_API_KEY": "benchmark",
+    "CACHE_ENABLED": "false",
+    "CACHE_DB_PATH": "",
+    "SKILL_INDEX_SNAPSHOT_PATH": "",
+    "JOB_INDEX_SNAPSHOT_PATH": "",
+    "JOB_DB_PATH": "",
+    "GEMINI_RPM_LIMIT": "1000000",
+    "GEMINI_TPM_LIMIT": "1000000000",
+    "GEMINI_MAX_IN_FLIGHT": "1000",
+    "HEALTH_PROBE_INTERVAL_SECONDS": "3600",
+    "LOG_LEVEL": "WARNING",
+}
+
+# Metrics compared by --compare, per result entry
+COMPARED_FIELDS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "throughput_rps")
+
+
+def summarize(samples: Sequence[float], wall_seconds: float = None) -> Dict[str, Any]:
+    """Latency percentiles (nearest rank) in ms for samples in seconds"""
+    ordered = sorted(samples)
+    n = len(ordered)
+    if n == 0:
+        return {"n": 0}
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(n - 1, max(0, int(round(p / 100 * n + 0.5)) - 1))] * 1000, 3)
+
+    stats = {
+        "n": n,
+        "mean_ms": round(sum(ordered) / n * 1000, 3),
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+    if wall_seconds:
+        stats["throughput_rps"] = round(n / wall_seconds, 2)
+    return stats
+
+
+def time_calls(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _group_key(document: SyntheticDocument) -> str:
+    return f"{document.file_type}/{document.pages}p"
+
+
+def bench_extract_text(corpus: Sequence[SyntheticDocument], repeat: int) -> Dict[str, Any]:
+    """DocumentProcessor.extract_text_from_file, full text and with the service's prompt budget"""
+    from config.config import Config
+    from utils.document_processor import DocumentProcessor
+
+    budget = max(Config.PDF_MAX_TEXT_LENGTH, Config.BATCH_DOC_MAX_TEXT_LENGTH, Config.CV_EXTRACTION_MAX_TEXT_LENGTH)
+    results = {}
+    for label, max_chars in (("full", None), ("budgeted", budget)):
+        groups: Dict[str, List[float]] = defaultdict(list)
+        sizes: Dict[str, int] = defaultdict(int)
+        for document in corpus:
+            samples = time_calls(
+                lambda: DocumentProcessor.extract_text_from_file(document.content, document.filename, max_chars), repeat
+            )
+            groups[_group_key(document)] += samples
+            sizes[_group_key(document)] += len(document.content) * repeat
+        for key, samples in sorted(groups.items()):
+            stats = summarize(samples)
+            stats["mb_per_s"] = round(sizes[key] / (1024 * 1024) / sum(samples), 2)
+            results[f"{label}/{key}"] = stats
+    return results
+
+
+def bench_file_info(corpus: Sequence[SyntheticDocument], repeat: int) -> Dict[str, Any]:
+    """DocumentProcessor.get_file_info standalone (parses) and with an already parsed document"""
+    from utils.document_processor import DocumentProcessor
+
+    standalone: Dict[str, List[float]] = defaultdict(list)
+    reused: Dict[str, List[float]] = defaultdict(list)
+    for document in corpus:
+        parsed = DocumentProcessor.parse_document(document.content, document.filename)
+        standalone[_group_key(document)] += time_calls(
+            lambda: DocumentProcessor.get_file_info(document.content, document.filename), repeat
+        )
+        reused[_group_key(document)] += time_calls(
+            lambda: DocumentProcessor.get_file_info(document.content, document.filename, parsed), repeat * 100
+        )
+    results = {f"standalone/{key}": summarize(samples) for key, samples in sorted(standalone.items())}
+    results.update({f"reused_parse/{key}": summarize(samples) for key, samples in sorted(reused.items())})
+    return results
+
+
+def bench_confidence(corpus: Sequence[SyntheticDocument], iterations: int) -> Dict[str, Any]:
+    """CVService._calculate_confidence over verdicts for the corpus (timed in batches of 100 calls)"""
+    from utils.document_processor import DocumentProcessor
+    from services.cv_service import CVService
+    from benchmarks.fake_gemini import FakeGenAI
+
+    service = CVService()
+    responses = []
+    for document in corpus:
+        text = DocumentProcessor.extract_text_from_file(document.content, document.filename, 3000)
+        verdict = FakeGenAI.answer(f"===== NỘI DUNG FILE =====\n{text}\n==========================")
+        responses.append((verdict, verdict.upper().startswith("YES")))
+    # Long free-form answers (what an unconstrained model may return) exercise the worst case
+    responses += [(" ".join(verdict for verdict, _ in responses[:20]), True)] * 5
+
+    batch = 100
+    samples = []
+    for index in range(max(1, iterations // batch)):
+        chunk = [responses[(index * batch + offset) % len(responses)] for offset in range(batch)]
+        started = time.perf_counter()
+        for response, is_cv in chunk:
+            service._calculate_confidence(response, is_cv)
+        samples.append((time.perf_counter() - started) / batch)
+    stats = summarize(samples)
+    stats["calls"] = len(samples) * batch
+    return {"per_call": stats}
+
+
+async def _drive_validate_cv(app, documents: Sequence[SyntheticDocument], total: int, concurrency: int):
+    import httpx
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    correct = 0
+    queue = asyncio.Queue()
+    for index in range(total):
+        queue.put_nowait(documents[index % len(documents)])
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark",
+                                 timeout=120) as client:
+        async def worker():
+            nonlocal correct
+            while not queue.empty():
+                document = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.post("/validate_cv", files={"file": (document.filename, document.content)})
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+                if response.status_code == 200 and response.json().get("is_cv") == document.is_cv:
+                    correct += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    stats = summarize(latencies, wall)
+    stats["status_codes"] = {str(code): count for code, count in sorted(statuses.items())}
+    stats["verdict_accuracy"] = round(correct / total, 3) if total else None
+    return stats
+
+
+async def _bench_validate_cv(corpus, total: int, concurrency_levels: Sequence[int], fake) -> Dict[str, Any]:
+    import ai_service
+    from benchmarks.fake_gemini import install_fake_gemini
+    from utils.gemini_client import get_gemini_client
+
+    install_fake_gemini(get_gemini_client(), fake)
+    results = {}
+    async with ai_service.app.router.lifespan_context(ai_service.app):
+        # One untimed pass starts the extraction pool workers and creates the context cache
+        await _drive_validate_cv(ai_service.app, corpus[:4], 4, 1)
+        for concurrency in concurrency_levels:
+            results[f"concurrency_{concurrency}"] = await _drive_validate_cv(ai_service.app, corpus, total, concurrency)
+    results["fake_gemini"] = fake.get_status_info()
+    return results
+
+
+def bench_validate_cv(corpus, total: int, concurrency_levels: Sequence[int], args) -> Dict[str, Any]:
+    """End-to-end POST /validate_cv through the ASGI app against the fake Gemini"""
+    from benchmarks.fake_gemini import FakeGenAI, ModelProfile
+
+    fake = FakeGenAI(
+        default_profile=ModelProfile(args.latency_ms, args.jitter_ms, args.error_rate, args.error_kind),
+        seed=args.seed
+    )
+    return asyncio.run(_bench_validate_cv(corpus, total, concurrency_levels, fake))
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Lines describing the relative change of each shared metric (positive = slower / more)"""
+    lines = []
+    for bench, entries in current["results"].items():
+        for key, stats in entries.items():
+            old = baseline.get("results", {}).get(bench, {}).get(key)
+            if not isinstance(old, dict) or not isinstance(stats, dict):
+                continue
+            for field in COMPARED_FIELDS:
+                if field in stats and old.get(field):
+                    change = (stats[field] - old[field]) / old[field] * 100
+                    lines.append(f"{bench:<14} {key:<28} {field:<15} {old[field]:>12} -> {stats[field]:>12} ({change:+.1f}%)")
+    return lines
+
+
+BENCHMARKS = ("extract_text", "file_info", "confidence", "validate_cv")
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", help="Write results JSON here (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Comma-separated subset of {BENCHMARKS}")
+    parser.add_argument("--quick", action="store_true", help="Small corpus and few repetitions (smoke run)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, help="Repetitions per document for the extraction benchmarks")
+    parser.add_argument("--requests", type=int, help="Requests per concurrency level for /validate_cv")
+    parser.add_argument("--concurrency", default="1,8,32", help="Concurrency levels for /validate_cv")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake Gemini latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake Gemini calls that fail")
+    parser.add_argument("--error-kind", default="quota", help="quota, not_found, server or hang")
+    args = parser.parse_args(argv)
+
+    for name, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(name, value)
+
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    page_counts = (1, 5) if args.quick else (1, 2, 5, 20, 50)
+    repeat = args.repeat or (2 if args.quick else 5)
+    total = args.requests or (40 if args.quick else 200)
+    concurrency_levels = [int(level) for level in args.concurrency.split(",")]
+    corpus = generate_corpus(args.seed, page_counts=page_counts)
+
+    results: Dict[str, Any] = {}
+    runners = {
+        "extract_text": lambda: bench_extract_text(corpus, repeat),
+        "file_info": lambda: bench_file_info(corpus, repeat),
+        "confidence": lambda: bench_confidence(corpus, 2_000 if args.quick else 50_000),
+        "validate_cv": lambda: bench_validate_cv(corpus, total, concurrency_levels, args),
+    }
+    for name in selected:
+        started = time.perf_counter()
+        results[name] = runners[name]()
+        print(f"{name}: done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus": {"documents": len(corpus), "page_counts": list(page_counts), "seed": args.seed},
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+    out = args.out or os.path.join(
+        SERVICE_ROOT, "benchmarks", "results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
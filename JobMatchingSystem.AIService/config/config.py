@@ -1,7 +1,11 @@
+import json
+import logging
 import os
 from typing import Optional
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -27,24 +31,134 @@ class Config:
         "models/gemini-exp-1206",               # Latest experimental
     ]
     
+    # Gemini HTTP transport
+    GEMINI_BASE_URL: str = os.getenv("GEMINI_BASE_URL", "")  # Empty = Google's endpoint; e.g. a local stub for load tests
+    GEMINI_CONNECT_TIMEOUT: float = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5"))
+    GEMINI_READ_TIMEOUT: float = float(os.getenv("GEMINI_READ_TIMEOUT", "30"))
+    GEMINI_MAX_CONNECTIONS: int = int(os.getenv("GEMINI_MAX_CONNECTIONS", "100"))  # Keep-alive pool + I/O threads
+    
+    # Client-side rate limiting per model (defaults; override per model below)
+    GEMINI_RPM_LIMIT: int = int(os.getenv("GEMINI_RPM_LIMIT", "15"))
+    GEMINI_TPM_LIMIT: int = int(os.getenv("GEMINI_TPM_LIMIT", "1000000"))
+    GEMINI_MAX_IN_FLIGHT: int = int(os.getenv("GEMINI_MAX_IN_FLIGHT", "10"))
+    GEMINI_RATE_LIMIT_MAX_WAIT_SECONDS: float = float(os.getenv("GEMINI_RATE_LIMIT_MAX_WAIT_SECONDS", "2"))
+    GEMINI_ESTIMATED_OUTPUT_TOKENS: int = int(os.getenv("GEMINI_ESTIMATED_OUTPUT_TOKENS", "256"))
+    # e.g. {"models/gemini-2.5-pro": {"rpm": 5, "tpm": 250000, "max_in_flight": 2}}
+    GEMINI_MODEL_RATE_LIMITS: dict = json.loads(os.getenv("GEMINI_MODEL_RATE_LIMITS", "{}"))
+    
+    # Circuit breaker per model (replaces permanent exclusion after one failure)
+    CIRCUIT_FAILURE_RATE_THRESHOLD: float = float(os.getenv("CIRCUIT_FAILURE_RATE_THRESHOLD", "0.5"))
+    CIRCUIT_MIN_CALLS: int = int(os.getenv("CIRCUIT_MIN_CALLS", "4"))  # Before failure rate counts
+    CIRCUIT_WINDOW_SIZE: int = int(os.getenv("CIRCUIT_WINDOW_SIZE", "20"))  # Recent calls considered
+    CIRCUIT_COOLDOWN_SECONDS: float = float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "60"))  # Doubles per re-trip
+    CIRCUIT_MAX_COOLDOWN_SECONDS: float = float(os.getenv("CIRCUIT_MAX_COOLDOWN_SECONDS", "3600"))
+    
+    # Hedged requests across fallback models (opt-in)
+    GEMINI_HEDGING_ENABLED: bool = os.getenv("GEMINI_HEDGING_ENABLED", "False").lower() == "true"
+    GEMINI_HEDGE_PERCENTILE: float = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "0.95"))  # Of the model's recent latencies
+    GEMINI_HEDGE_MIN_SAMPLES: int = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+    GEMINI_HEDGE_MIN_DELAY_SECONDS: float = float(os.getenv("GEMINI_HEDGE_MIN_DELAY_SECONDS", "1"))
+    GEMINI_HEDGE_DEFAULT_DELAY_SECONDS: float = float(os.getenv("GEMINI_HEDGE_DEFAULT_DELAY_SECONDS", "8"))  # Until enough samples
+    GEMINI_HEDGE_BUDGET_RATIO: float = float(os.getenv("GEMINI_HEDGE_BUDGET_RATIO", "0.1"))  # Max extra calls per call
+    GEMINI_HEDGE_MAX_EXTRA_CALLS: int = int(os.getenv("GEMINI_HEDGE_MAX_EXTRA_CALLS", "1"))  # Per request
+    
+    # Gemini context caching of static prompt prefixes (falls back to an inline system instruction)
+    GEMINI_CONTEXT_CACHE_ENABLED: bool = os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS: float = float(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+    
     # PDF Processing
     PDF_MAX_SIZE_MB: int = int(os.getenv("PDF_MAX_SIZE_MB", "10"))  # 10MB default
     PDF_MIN_TEXT_LENGTH: int = int(os.getenv("PDF_MIN_TEXT_LENGTH", "50"))
     PDF_MAX_TEXT_LENGTH: int = int(os.getenv("PDF_MAX_TEXT_LENGTH", "3000"))  # For prompt
     
+    # Upload ingestion (streamed in chunks, aborted past PDF_MAX_SIZE_MB)
+    UPLOAD_CHUNK_SIZE_KB: int = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", "64"))
+    UPLOAD_MAX_IN_FLIGHT_MB: int = int(os.getenv("UPLOAD_MAX_IN_FLIGHT_MB", "256"))  # All requests together
+    
+    # Document extraction process pool (0 workers = run in a thread instead)
+    EXTRACTION_POOL_SIZE: int = int(os.getenv("EXTRACTION_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+    EXTRACTION_QUEUE_SIZE: int = int(os.getenv("EXTRACTION_QUEUE_SIZE", "32"))  # Waiting tasks beyond busy workers
+    EXTRACTION_TIMEOUT_SECONDS: float = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "30"))
+    
     # FastAPI Settings
     CORS_ORIGINS: list = os.getenv("CORS_ORIGINS", "*").split(",")
     DEBUG_MODE: bool = os.getenv("DEBUG_MODE", "False").lower() == "true"
     MOCK_MODE: bool = os.getenv("MOCK_MODE", "False").lower() == "true"
+    DISCONNECT_POLL_SECONDS: float = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.5"))
+    HEALTH_PROBE_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "60"))  # Background Gemini probe
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "5"))
+    
+    # Logging (JSON lines on stdout, written by a background thread)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG_MODE else "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")  # Per-module overrides, e.g. "utils.gemini_client=DEBUG,utils.result_cache=WARNING"
     
     # CV Validation Settings
     CV_CONFIDENCE_THRESHOLD: float = float(os.getenv("CV_CONFIDENCE_THRESHOLD", "0.7"))
     
+    # Fast-path pre-classifier (keyword heuristic answers obvious cases without Gemini)
+    FAST_PATH_ENABLED: bool = os.getenv("FAST_PATH_ENABLED", "True").lower() == "true"
+    FAST_PATH_YES_THRESHOLD: float = float(os.getenv("FAST_PATH_YES_THRESHOLD", "0.9"))  # Score >= this: CV
+    FAST_PATH_NO_THRESHOLD: float = float(os.getenv("FAST_PATH_NO_THRESHOLD", "0.1"))  # Score <= this: not a CV
+    FAST_PATH_SHADOW_RATE: float = float(os.getenv("FAST_PATH_SHADOW_RATE", "0.05"))  # Local decisions re-checked by Gemini
+    
+    # CV information extraction (/extract_cv_info)
+    CV_EXTRACTION_MAX_TEXT_LENGTH: int = int(os.getenv("CV_EXTRACTION_MAX_TEXT_LENGTH", "6000"))  # For prompt
+    PARSED_DOCUMENT_CACHE_SIZE: int = int(os.getenv("PARSED_DOCUMENT_CACHE_SIZE", "32"))  # Parses shared across endpoints
+    
+    # CV - job matching (/match_cv_job): local prefilter, Gemini only above the threshold
+    MATCH_LLM_THRESHOLD: float = float(os.getenv("MATCH_LLM_THRESHOLD", "40"))  # Prefilter score 0-100
+    MATCH_SKILL_WEIGHT: float = float(os.getenv("MATCH_SKILL_WEIGHT", "0.7"))  # Rest is keyword coverage
+    MATCH_MAX_TEXT_LENGTH: int = int(os.getenv("MATCH_MAX_TEXT_LENGTH", "4000"))  # Per text in the prompt
+    
+    # Job posting index for /rank_jobs (hashed TF-IDF vectors)
+    JOB_INDEX_FEATURES: int = int(os.getenv("JOB_INDEX_FEATURES", str(2 ** 20)))  # Hash space
+    JOB_INDEX_SKILL_WEIGHT: float = float(os.getenv("JOB_INDEX_SKILL_WEIGHT", "3"))  # Skill term boost
+    JOB_INDEX_REBUILD_THRESHOLD: int = int(os.getenv("JOB_INDEX_REBUILD_THRESHOLD", "1000"))  # Changes before rebuild
+    JOB_INDEX_REBUILD_FRACTION: float = float(os.getenv("JOB_INDEX_REBUILD_FRACTION", "0.1"))  # Or this share of all jobs (at rank time)
+    JOB_INDEX_SNAPSHOT_PATH: str = os.getenv("JOB_INDEX_SNAPSHOT_PATH", ".cache/job_index.npz")  # Empty = memory only
+    RANK_MAX_TOP_K: int = int(os.getenv("RANK_MAX_TOP_K", "100"))
+    RANK_MAX_RERANK: int = int(os.getenv("RANK_MAX_RERANK", "5"))  # Top results re-ranked by Gemini
+    
+    # Inverted skill/keyword index over pushed jobs and CV profiles
+    SKILL_INDEX_SNAPSHOT_PATH: str = os.getenv("SKILL_INDEX_SNAPSHOT_PATH", ".cache/skill_index.npz")  # Empty = memory only
+    SKILL_INDEX_SNAPSHOT_INTERVAL_SECONDS: float = float(os.getenv("SKILL_INDEX_SNAPSHOT_INTERVAL_SECONDS", "300"))  # When changed (also the job ranking index)
+    SKILL_INDEX_MAX_KEYWORD_DF: float = float(os.getenv("SKILL_INDEX_MAX_KEYWORD_DF", "0.2"))  # Commoner keywords are ignored
+    SKILL_INDEX_REBUILD_THRESHOLD: int = int(os.getenv("SKILL_INDEX_REBUILD_THRESHOLD", "1000"))  # Changes before compaction
+    SKILL_INDEX_MAX_RESULTS: int = int(os.getenv("SKILL_INDEX_MAX_RESULTS", "500"))
+    
+    # Batch validation (several documents packed into one Gemini prompt)
+    BATCH_MAX_FILES: int = int(os.getenv("BATCH_MAX_FILES", "50"))
+    BATCH_PACK_SIZE: int = int(os.getenv("BATCH_PACK_SIZE", "5"))  # Documents per prompt
+    BATCH_DOC_MAX_TEXT_LENGTH: int = int(os.getenv("BATCH_DOC_MAX_TEXT_LENGTH", "2000"))  # Per document in a pack
+    
+    # Result Cache (keyed by SHA-256 of uploaded bytes)
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "True").lower() == "true"
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # 7 days
+    CACHE_MEMORY_MAX_ENTRIES: int = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "1000"))
+    CACHE_DB_PATH: str = os.getenv("CACHE_DB_PATH", ".cache/ai_results.sqlite3")  # Empty = memory only
+    CACHE_DB_MAX_ENTRIES: int = int(os.getenv("CACHE_DB_MAX_ENTRIES", "50000"))
+    
+    # Identical concurrent requests (same upload / prompt) share one parse and Gemini call
+    COALESCING_ENABLED: bool = os.getenv("COALESCING_ENABLED", "True").lower() == "true"
+    
+    # Async jobs (POST /jobs/validate_cv, GET /jobs/{id}); queue persisted in SQLite
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", ".cache/jobs.sqlite3")  # Empty = memory only (lost on restart)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))  # Jobs processed concurrently
+    JOB_QUEUE_MAX_PENDING: int = int(os.getenv("JOB_QUEUE_MAX_PENDING", "1000"))  # Queued + running; beyond this 503
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))  # Restarts a job may be interrupted by
+    JOB_RESULT_TTL_SECONDS: int = int(os.getenv("JOB_RESULT_TTL_SECONDS", str(24 * 3600)))  # Finished jobs kept
+    JOB_CALLBACK_TIMEOUT_SECONDS: float = float(os.getenv("JOB_CALLBACK_TIMEOUT_SECONDS", "10"))
+    JOB_CALLBACK_MAX_ATTEMPTS: int = int(os.getenv("JOB_CALLBACK_MAX_ATTEMPTS", "6"))  # Exponential backoff between
+    JOB_CALLBACK_ALLOWED_HOSTS: list = [
+        host.strip() for host in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()
+    ]  # Empty = callbacks disabled; "*" = any host resolving to public IPs
+    JOB_CALLBACK_SECRET: str = os.getenv("JOB_CALLBACK_SECRET", "")  # Signs callbacks (X-Signature: sha256=HMAC)
+    
     @classmethod
     def validate_config(cls) -> bool:
         """Validate required configuration"""
         if cls.GOOGLE_API_KEY == "YOUR_API_KEY_HERE":
-            print("WARNING: GOOGLE_API_KEY not set. Please set environment variable.")
+            logger.warning("GOOGLE_API_KEY not set. Please set environment variable.")
             return False
         return True
     
@@ -53,10 +167,28 @@ class Config:
         """Get current configuration info (for debugging)"""
         return {
             "gemini_model": cls.GEMINI_MODEL,
+            "gemini_connect_timeout": cls.GEMINI_CONNECT_TIMEOUT,
+            "gemini_read_timeout": cls.GEMINI_READ_TIMEOUT,
+            "gemini_base_url": cls.GEMINI_BASE_URL or None,
+            "gemini_rpm_limit": cls.GEMINI_RPM_LIMIT,
+            "gemini_tpm_limit": cls.GEMINI_TPM_LIMIT,
+            "gemini_max_in_flight": cls.GEMINI_MAX_IN_FLIGHT,
+            "gemini_hedging_enabled": cls.GEMINI_HEDGING_ENABLED,
             "pdf_max_size_mb": cls.PDF_MAX_SIZE_MB,
             "pdf_min_text_length": cls.PDF_MIN_TEXT_LENGTH,
+            "extraction_pool_size": cls.EXTRACTION_POOL_SIZE,
+            "extraction_queue_size": cls.EXTRACTION_QUEUE_SIZE,
+            "extraction_timeout_seconds": cls.EXTRACTION_TIMEOUT_SECONDS,
             "cv_confidence_threshold": cls.CV_CONFIDENCE_THRESHOLD,
+            "match_llm_threshold": cls.MATCH_LLM_THRESHOLD,
+            "fast_path_enabled": cls.FAST_PATH_ENABLED,
             "debug_mode": cls.DEBUG_MODE,
+            "log_level": cls.LOG_LEVEL,
             "mock_mode": cls.MOCK_MODE,
+            "cache_enabled": cls.CACHE_ENABLED,
+            "cache_ttl_seconds": cls.CACHE_TTL_SECONDS,
+            "coalescing_enabled": cls.COALESCING_ENABLED,
+            "job_workers": cls.JOB_WORKERS,
+            "job_queue_max_pending": cls.JOB_QUEUE_MAX_PENDING,
             "api_key_set": cls.GOOGLE_API_KEY != "YOUR_API_KEY_HERE"
         }
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Pydantic request/response models for the AI Service
+"""
+
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field, field_validator
+
+
+class CVValidationResponse(BaseModel):
+    """Result of validating whether a document is a CV"""
+    is_cv: bool
+    confidence: float = Field(..., ge=0.0, le=1.0)
+    reason: str
+    file_info: Optional[Dict[str, Any]] = None
+    cached: bool = False
+    fast_path: bool = False  # Answered by the local pre-classifier, not Gemini
+
+
+class CVBatchValidationItem(BaseModel):
+    """Per-file outcome of a batch validation (either a result or an error)"""
+    filename: Optional[str] = None
+    result: Optional[CVValidationResponse] = None
+    error: Optional[str] = None
+
+
+class CVBatchValidationResponse(BaseModel):
+    """Results of /validate_cv/batch in upload order"""
+    results: List[CVBatchValidationItem]
+    total: int
+    succeeded: int
+    failed: int
+
+
+class CVExtractionResponse(BaseModel):
+    """Structured information extracted from a CV"""
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    skills: List[str] = []
+    experience_years: Optional[str] = None
+    education: Optional[str] = None
+    certifications: List[str] = []
+    languages: List[str] = []
+    
+    @field_validator("experience_years", mode="before")
+    @classmethod
+    def _years_as_text(cls, value: Any) -> Any:
+        """Models sometimes answer a number despite the string schema"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return f"{value:g}"
+        return value
+
+
+class AsyncJobSubmitResponse(BaseModel):
+    """Accepted async job; poll status_url or wait for the callback"""
+    job_id: str
+    status: str
+    created_at: str
+    status_url: str
+
+
+class AsyncJobStatusResponse(BaseModel):
+    """State of an async job (result is set once status is "succeeded")"""
+    job_id: str
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    filename: Optional[str] = None
+    attempts: int = 0
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[CVValidationResponse] = None
+    error: Optional[str] = None
+    callback_status: Optional[str] = None  # pending, delivered, failed (None: no callback_url)
+
+
+class JobMatchRequest(BaseModel):
+    """Request body for CV - job description matching"""
+    cv_text: str
+    job_description: str
+
+
+class JobMatchResponse(BaseModel):
+    """Result of matching a CV against a job description"""
+    match_score: float = Field(..., ge=0, le=100)
+    matching_skills: List[str] = []
+    missing_skills: List[str] = []
+    overall_assessment: str = ""
+    recommendations: Optional[str] = None
+    prefilter_score: Optional[float] = None  # Local skill/keyword score (0-100)
+    ai_assessed: bool = False  # False when the prefilter answered without Gemini
+    cached: bool = False
+    
+    @field_validator("recommendations", mode="before")
+    @classmethod
+    def _recommendations_as_text(cls, value: Any) -> Any:
+        """Accept a list of recommendations and join it into one string"""
+        if isinstance(value, list):
+            return "; ".join(str(item) for item in value)
+        return value
+
+
+class JobPosting(BaseModel):
+    """A job posting pushed by the main API for ranking"""
+    job_id: str
+    title: Optional[str] = None
+    description: str
+    skills: List[str] = []
+
+
+class JobPostingsUpsertRequest(BaseModel):
+    """Bulk add/replace of job postings"""
+    jobs: List[JobPosting]
+
+
+class JobRankRequest(BaseModel):
+    """Rank indexed job postings for one CV"""
+    cv_text: str
+    top_k: int = Field(20, ge=1)
+    rerank_top: int = Field(0, ge=0)  # How many of the best results Gemini re-assesses
+
+
+class RankedJob(BaseModel):
+    """One ranked job posting"""
+    job_id: str
+    title: Optional[str] = None
+    score: float  # Vector similarity 0-1
+    match: Optional[JobMatchResponse] = None  # Present for re-ranked results
+
+
+class JobRankResponse(BaseModel):
+    """Ranked job postings, best first"""
+    results: List[RankedJob]
+    total_jobs: int
+    took_ms: float
+
+
+class CVProfile(BaseModel):
+    """A candidate CV pushed by the main API for job-to-candidate lookups"""
+    cv_id: str
+    text: Optional[str] = None
+    skills: List[str] = []
+
+
+class CVProfilesUpsertRequest(BaseModel):
+    """Bulk add/replace of CV profiles"""
+    profiles: List[CVProfile]
+
+
+class SkillIndexQuery(BaseModel):
+    """Look up indexed jobs or CVs sharing skills/keywords with a text"""
+    text: Optional[str] = None
+    skills: List[str] = []
+    limit: int = Field(50, ge=1)
+
+
+class SkillIndexCandidate(BaseModel):
+    """One candidate id with the number of shared tokens"""
+    id: str
+    matching_skills: int
+    matching_keywords: int
+
+
+class SkillIndexQueryResponse(BaseModel):
+    """Candidate set, most shared skills first"""
+    candidates: List[SkillIndexCandidate]
+    total_indexed: int
+    took_ms: float
+
+
+class ErrorResponse(BaseModel):
+    """Standard error payload"""
+    error: str
+    error_code: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+
+class HealthResponse(BaseModel):
+    """Health check payload"""
+    status: str
+    version: str
+    services: Dict[str, Any]
+    timestamp: str
@@ -0,0 +1,49 @@
+"""
+CV Information Extraction Prompts for Gemini AI
+"""
+
+
+class CVExtractionPrompts:
+    """Prompts and output schema for extracting structured data from a CV"""
+
+    # Gemini response schema (OpenAPI subset) mirroring models.schemas.CVExtractionResponse
+    RESPONSE_SCHEMA = {
+        "type": "OBJECT",
+        "properties": {
+            "name": {"type": "STRING", "nullable": True},
+            "email": {"type": "STRING", "nullable": True},
+            "phone": {"type": "STRING", "nullable": True},
+            "skills": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "experience_years": {"type": "STRING", "nullable": True},
+            "education": {"type": "STRING", "nullable": True},
+            "certifications": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "languages": {"type": "ARRAY", "items": {"type": "STRING"}}
+        },
+        "required": ["skills", "certifications", "languages"]
+    }
+
+    @staticmethod
+    def extract_cv_info(text: str, max_length: int = 6000) -> str:
+        """Generate prompt for extracting structured information from CV text"""
+
+        truncated_text = text[:max_length] if len(text) > max_length else text
+
+        return f"""Bạn là chuyên gia tuyển dụng. Hãy trích xuất thông tin từ CV dưới đây và trả về JSON.
+
+===== NỘI DUNG CV =====
+{truncated_text}
+==========================
+
+YÊU CẦU:
+- name: họ tên đầy đủ của ứng viên
+- email, phone: thông tin liên lạc (giữ nguyên như trong CV)
+- skills: danh sách kỹ năng chuyên môn (ngôn ngữ lập trình, framework, công cụ, kỹ năng mềm)
+- experience_years: tổng số năm kinh nghiệm làm việc, dạng chuỗi (ví dụ "3" hoặc "0.5")
+- education: trình độ học vấn cao nhất (bằng cấp + chuyên ngành + trường)
+- certifications: danh sách chứng chỉ
+- languages: danh sách ngoại ngữ
+
+QUY TẮC:
+- Chỉ dùng thông tin có trong CV, KHÔNG suy đoán
+- Trường không có thông tin: null (hoặc [] với danh sách)
+- Chỉ trả về JSON, không giải thích thêm"""
\ No newline at end of file
@@ -2,23 +2,14 @@
 CV Validation Prompts for Gemini AI
 """
 
+from typing import List
+
+
 class CVValidationPrompts:
     """Prompts specifically for CV validation tasks"""
     
-    @staticmethod
-    def validate_cv_content(text: str, max_length: int = 3000) -> str:
-        """Generate prompt to validate if document is a CV"""
-        # Truncate text if too long
-        truncated_text = text[:max_length] if len(text) > max_length else text
-        
-        return f"""
-Bạn là chuyên gia HR với 15 năm kinh nghiệm tuyển dụng. Phân tích CHÍNH XÁC xem văn bản sau có phải CV/Resume thật không:
-
-===== NỘI DUNG FILE =====
-{truncated_text}
-==========================
-
-🔍 PHÂN TÍCH THEO BƯỚC:
+    # Criteria shared by the single-document and batch prompts
+    ANALYSIS_STEPS = """🔍 PHÂN TÍCH THEO BƯỚC:
 
 BƯỚC 1: KIỂM TRA LOẠI TÀI LIỆU
 ❌ LOẠI BỎ NGAY nếu thuộc các loại sau:
@@ -56,15 +47,52 @@ BƯỚC 4: KIỂM TRA CẤU TRÚC CV
 - Database/Technical docs: NGAY LẬP TỨC = NO
 - Thiếu thông tin cá nhân: = NO
 - Có dưới 4/6 mục CV: = NO
-- Đủ tiêu chí: = YES
-
-ĐỊNH DẠNG TRẢ LỜI:
+- Đủ tiêu chí: = YES"""
+    
+    ANSWER_FORMAT = '''ĐỊNH DẠNG TRẢ LỜI:
 - "YES - CV hợp lệ. Có [X/6 mục]: [liệt kê cụ thể các mục tìm thấy]"
 - "NO - [Lý do cụ thể]. [Mô tả ngắn gọn tài liệu này là gì]"
 
 VÍ DỤ TRẢ LỜI CHUẨN:
 - "NO - Đây là tài liệu thiết kế database với ERD và bảng dữ liệu, không phải CV"
 - "NO - Thiếu thông tin cá nhân (tên/liên lạc) và chỉ có 2/6 mục CV"
-- "YES - CV hợp lệ. Có 5/6 mục: Thông tin cá nhân, Học vấn, Kinh nghiệm, Kỹ năng, Dự án"
+- "YES - CV hợp lệ. Có 5/6 mục: Thông tin cá nhân, Học vấn, Kinh nghiệm, Kỹ năng, Dự án"'''
+    
+    # Static part of every validation prompt, sent as the system instruction so
+    # Gemini can cache it (explicitly or implicitly) instead of re-reading it per CV
+    SYSTEM_INSTRUCTION = f"""Bạn là chuyên gia HR với 15 năm kinh nghiệm tuyển dụng. Nhiệm vụ: phân tích CHÍNH XÁC xem văn bản người dùng gửi có phải CV/Resume thật không.
+
+{ANALYSIS_STEPS}
+
+{ANSWER_FORMAT}"""
+    
+    @staticmethod
+    def validate_cv_content(text: str, max_length: int = 3000) -> str:
+        """Generate the per-document part of the validation prompt (paired with SYSTEM_INSTRUCTION)"""
+        # Truncate text if too long
+        truncated_text = text[:max_length] if len(text) > max_length else text
+        
+        return f"""Đánh giá xem văn bản sau có phải CV/Resume thật không:
+
+===== NỘI DUNG FILE =====
+{truncated_text}
+==========================
+
+Phân tích ngay:"""
+    
+    @staticmethod
+    def validate_cv_batch(texts: List[str], max_length: int = 2000) -> str:
+        """Generate the batch part of the validation prompt (paired with SYSTEM_INSTRUCTION), answered as a JSON verdict list"""
+        documents = "\n\n".join(
+            f"===== TÀI LIỆU {index} =====\n{text[:max_length]}\n=========================="
+            for index, text in enumerate(texts)
+        )
+        
+        return f"""Dưới đây có {len(texts)} tài liệu ĐỘC LẬP, đánh số từ 0 đến {len(texts) - 1}. Phân tích CHÍNH XÁC TỪNG tài liệu xem có phải CV/Resume thật không. KHÔNG trộn thông tin giữa các tài liệu.
+
+{documents}
+
+ĐỊNH DẠNG KẾT QUẢ: CHỈ trả về một JSON array, mỗi tài liệu đúng một phần tử với "verdict" theo ĐỊNH DẠNG TRẢ LỜI ở trên, không kèm giải thích nào khác:
+[{{"index": 0, "verdict": "YES - CV hợp lệ. Có [X/6 mục]: ..."}}, {{"index": 1, "verdict": "NO - [Lý do cụ thể]"}}]
 
-Phân tích ngay:"""
\ No newline at end of file
+Phân tích ngay:"""
@@ -0,0 +1,53 @@
+"""
+CV - Job Matching Prompts for Gemini AI
+"""
+
+from typing import List
+
+
+class JobMatchingPrompts:
+    """Prompts and output schema for assessing how well a CV fits a job"""
+
+    # Gemini response schema (OpenAPI subset) mirroring models.schemas.JobMatchResponse
+    RESPONSE_SCHEMA = {
+        "type": "OBJECT",
+        "properties": {
+            "match_score": {"type": "NUMBER"},
+            "matching_skills": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "missing_skills": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "overall_assessment": {"type": "STRING"},
+            "recommendations": {"type": "STRING", "nullable": True}
+        },
+        "required": ["match_score", "matching_skills", "missing_skills", "overall_assessment"]
+    }
+
+    @staticmethod
+    def match_cv_job(cv_text: str, job_description: str, matching_skills: List[str], missing_skills: List[str],
+                     max_length: int = 4000) -> str:
+        """Generate prompt for the narrative match assessment (after the local prefilter)"""
+
+        cv_text = cv_text[:max_length]
+        job_description = job_description[:max_length]
+
+        return f"""Bạn là chuyên gia tuyển dụng. Đánh giá mức độ phù hợp giữa CV và mô tả công việc dưới đây.
+
+===== MÔ TẢ CÔNG VIỆC =====
+{job_description}
+==========================
+
+===== NỘI DUNG CV =====
+{cv_text}
+==========================
+
+Phân tích sơ bộ (tự động, có thể chưa đầy đủ):
+- Kỹ năng trùng khớp: {", ".join(matching_skills) or "không rõ"}
+- Kỹ năng còn thiếu: {", ".join(missing_skills) or "không rõ"}
+
+YÊU CẦU - trả về JSON:
+- match_score: điểm phù hợp từ 0 đến 100
+- matching_skills: kỹ năng yêu cầu mà ứng viên đã có
+- missing_skills: kỹ năng yêu cầu mà ứng viên còn thiếu
+- overall_assessment: nhận xét tổng quan ngắn gọn (2-3 câu) về kinh nghiệm, kỹ năng, học vấn so với yêu cầu
+- recommendations: gợi ý ngắn để ứng viên cải thiện mức độ phù hợp
+
+Chỉ trả về JSON, không giải thích thêm."""
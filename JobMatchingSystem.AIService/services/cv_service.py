@@ -1,11 +1,61 @@
-from typing import Tuple
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Tuple, Optional, List, Dict
 from fastapi import UploadFile
-from models.schemas import CVValidationResponse, CVExtractionResponse, JobMatchResponse, ErrorResponse
-from utils.document_processor import DocumentProcessor
+from models.schemas import (
+    CVValidationResponse,
+    CVBatchValidationItem,
+    CVBatchValidationResponse,
+    CVExtractionResponse,
+    JobMatchResponse,
+    ErrorResponse
+)
+from utils.document_processor import DocumentProcessor, ParsedDocument
+from utils.extraction_pool import get_extraction_pool, ExtractionQueueFull
 from utils.gemini_client import get_gemini_client, GeminiClient
+from utils.result_cache import ResultCache
+from utils.cv_classifier import get_cv_pre_classifier, PreClassification
+from utils.upload_reader import get_upload_reader, UploadRejected, UploadCapacityExceeded
+from utils.rate_limiter import RateLimitExceeded
+from utils.single_flight import SingleFlight
+from utils.keyword_matcher import KeywordMatcher
+from utils.metrics import PROMPT_BUILD_SECONDS, CONFIDENCE_SCORING_SECONDS
 from prompts.cv_validation import CVValidationPrompts
+from prompts.cv_extraction import CVExtractionPrompts
 from config.config import Config
 
+logger = logging.getLogger(__name__)
+
+
+# Wording in a validation verdict that _calculate_confidence looks for
+PROFESSIONAL_ELEMENTS = ("experience", "skills", "projects", "education", "achievements")
+CONFIDENCE_KEYWORDS = KeywordMatcher({
+    "identity": ["tên", "họ", "name", "email", "điện thoại", "phone"],  # Name + contact
+    "experience": ["kinh nghiệm", "experience", "làm việc", "công việc", "vị trí"],
+    "skills": ["kỹ năng", "skills", "công nghệ", "technology", "lập trình"],
+    "projects": ["dự án", "project", "thực hiện", "phát triển"],
+    "education": ["học vấn", "education", "trường", "đại học", "bằng cấp"],
+    "achievements": ["chứng chỉ", "certificate", "thành tích", "giải thưởng"],
+    "missing": ["thiếu", "missing", "không có", "lack"],
+    "high_confidence": ["rõ ràng", "chắc chắn", "clearly", "definitely"],
+    "medium_confidence": ["có thể", "dường như", "appears", "seems"],
+})
+
+
+@dataclass
+class _BatchDocument:
+    """One file of a batch request on its way through extraction and validation"""
+    index: int
+    filename: str
+    content: bytes
+    cache_key: Optional[str]
+    parsed: Optional[ParsedDocument] = None
+    pre_classification: Optional[PreClassification] = None
+
 
 class CVService:
     """Service class for CV-related operations"""
@@ -13,51 +63,68 @@ class CVService:
     def __init__(self):
         self.gemini_client = get_gemini_client()
         self.document_processor = DocumentProcessor()
+        self.extraction_pool = get_extraction_pool()
+        self.upload_reader = get_upload_reader()
+        # Stop text extraction once the prompts have all they can use
+        self.text_budget = max(
+            Config.PDF_MAX_TEXT_LENGTH, Config.BATCH_DOC_MAX_TEXT_LENGTH, Config.CV_EXTRACTION_MAX_TEXT_LENGTH
+        )
+        # Recently parsed documents by content hash, so validate-then-extract parses once
+        self._parsed_documents: "OrderedDict[str, ParsedDocument]" = OrderedDict()
+        self.pre_classifier = get_cv_pre_classifier() if Config.FAST_PATH_ENABLED else None
+        self.validation_version = self._validation_version()
+        self.validation_cache = self._create_validation_cache(self.validation_version) if Config.CACHE_ENABLED else None
+        self.extraction_cache = self._create_extraction_cache() if Config.CACHE_ENABLED else None
+        # Identical uploads in flight at once (double clicks, client retries) share one run
+        self.validation_flights = SingleFlight("validate_cv")
+    
+    @staticmethod
+    def _validation_version() -> str:
+        """Fingerprint of what decides a verdict: prompt templates, fast path settings and models"""
+        return ResultCache.make_version(
+            CVValidationPrompts.SYSTEM_INSTRUCTION,
+            CVValidationPrompts.validate_cv_content("", Config.PDF_MAX_TEXT_LENGTH),
+            CVValidationPrompts.validate_cv_batch([""], Config.BATCH_DOC_MAX_TEXT_LENGTH),
+            str(Config.PDF_MAX_TEXT_LENGTH),
+            f"fast_path={Config.FAST_PATH_ENABLED}:{Config.FAST_PATH_NO_THRESHOLD}:{Config.FAST_PATH_YES_THRESHOLD}",
+            Config.GEMINI_MODEL,
+            ",".join(Config.GEMINI_FALLBACK_MODELS)
+        )
+    
+    @staticmethod
+    def _create_validation_cache(version: str) -> ResultCache:
+        """Create the /validate_cv result cache, versioned by prompt template and model"""
+        return ResultCache(namespace="validate_cv", version=version)
+    
+    @staticmethod
+    def _create_extraction_cache() -> ResultCache:
+        """Create the /extract_cv_info result cache, versioned by prompt, schema and model"""
+        version = ResultCache.make_version(
+            CVExtractionPrompts.extract_cv_info("", Config.CV_EXTRACTION_MAX_TEXT_LENGTH),
+            json.dumps(CVExtractionPrompts.RESPONSE_SCHEMA, sort_keys=True),
+            str(Config.CV_EXTRACTION_MAX_TEXT_LENGTH),
+            Config.GEMINI_MODEL,
+            ",".join(Config.GEMINI_FALLBACK_MODELS)
+        )
+        return ResultCache(namespace="extract_cv_info", version=version)
     
     async def validate_cv_file(self, file: UploadFile) -> CVValidationResponse:
         """Validate if uploaded file is a CV"""
         try:
-            # Read file content
-            content = await file.read()
-            
-            # Validate file
-            is_valid, error_msg = self.document_processor.validate_file(content, file.filename)
-            if not is_valid:
-                return CVValidationResponse(
-                    is_cv=False,
-                    confidence=0.0,
-                    reason=error_msg,
-                    file_info={"filename": file.filename, "error": error_msg}
-                )
-            
-            # Extract text from file
-            text = self.document_processor.extract_text_from_file(content, file.filename)
-            
-            if len(text) < Config.PDF_MIN_TEXT_LENGTH:
-                return CVValidationResponse(
-                    is_cv=False,
-                    confidence=0.0,
-                    reason=f"File contains insufficient text content (minimum {Config.PDF_MIN_TEXT_LENGTH} characters required)",
-                    file_info=self.document_processor.get_file_info(content, file.filename)
-                )
-            
-            # Generate prompt and get AI response
-            prompt = CVValidationPrompts.validate_cv_content(text, Config.PDF_MAX_TEXT_LENGTH)
-            ai_response = self.gemini_client.generate_content(prompt)
-            
-            # Parse AI response
-            is_cv, reason = GeminiClient.parse_yes_no_response(ai_response)
-            
-            # Calculate confidence based on response clarity
-            confidence = self._calculate_confidence(ai_response, is_cv)
+            # Stream the upload in chunks (aborts early on oversized or mislabelled files)
+            async with self.upload_reader.read(file) as content:
+                return await self._validate_content(content, file.filename)
             
+        except UploadRejected as e:
             return CVValidationResponse(
-                is_cv=is_cv,
-                confidence=confidence,
-                reason=reason,
-                file_info=self.document_processor.get_file_info(content, file.filename)
+                is_cv=False,
+                confidence=0.0,
+                reason=str(e),
+                file_info={"filename": file.filename, "error": str(e)}
             )
-            
+        except (ExtractionQueueFull, RateLimitExceeded, UploadCapacityExceeded):
+            # Let the API layer answer 503/429 so callers back off
+            raise
         except Exception as e:
             return CVValidationResponse(
                 is_cv=False,
@@ -66,30 +133,358 @@ class CVService:
                 file_info={"filename": file.filename, "error": str(e)}
             )
     
-    def _calculate_confidence(self, ai_response: str, is_cv: bool) -> float:
-        """Calculate confidence score based on AI response and CV elements detected"""
-        response_lower = ai_response.lower()
+    async def validate_cv_content(self, content: bytes, filename: str) -> CVValidationResponse:
+        """Validate bytes that were already read (queued /jobs/validate_cv submissions)"""
+        try:
+            return await self._validate_content(content, filename)
+        except (ExtractionQueueFull, RateLimitExceeded, UploadCapacityExceeded):
+            # The job queue defers the job and tries again
+            raise
+        except Exception as e:
+            return CVValidationResponse(
+                is_cv=False,
+                confidence=0.0,
+                reason=f"Error processing file: {str(e)}",
+                file_info={"filename": filename, "error": str(e)}
+            )
+    
+    async def _validate_content(self, content: bytes, filename: str) -> CVValidationResponse:
+        """Validate the bytes of one uploaded file"""
+        # Validate file
+        is_valid, error_msg = self.document_processor.validate_file(content, filename)
+        if not is_valid:
+            return CVValidationResponse(
+                is_cv=False,
+                confidence=0.0,
+                reason=error_msg,
+                file_info={"filename": filename, "error": error_msg}
+            )
+        
+        # Return cached verdict for identical bytes
+        content_hash = ResultCache.hash_bytes(content)
+        cache_key = content_hash if self.validation_cache else None
+        cached = await self._get_cached_response(cache_key, filename)
+        if cached is not None:
+            return cached
+        
+        response = await self.validation_flights.do(
+            f"{self.validation_version}:{content_hash}",
+            lambda: self._validate_uncached(content, filename, content_hash, cache_key)
+        )
+        if response.file_info and response.file_info.get("filename") != filename:
+            # Joined another upload of the same bytes under a different name
+            response = response.model_copy(update={"file_info": {**response.file_info, "filename": filename}})
+        return response
+    
+    async def _validate_uncached(self, content: bytes, filename: str, content_hash: str,
+                                 cache_key: Optional[str]) -> CVValidationResponse:
+        """Parse, pre-classify and (if undecided) ask Gemini about one document"""
+        # Parse the file once (in the extraction pool); text and file info share the result
+        parsed = await self._parse(content, filename, content_hash)
+        
+        if len(parsed.text) < Config.PDF_MIN_TEXT_LENGTH:
+            return self._insufficient_text_response(content, filename, parsed, cache_key)
+        
+        pre_classification = self._pre_classify(parsed)
+        local = self._fast_path_response(content, filename, parsed, cache_key, pre_classification)
+        if local is not None:
+            return local
+        
+        return await self._validate_parsed(content, filename, parsed, cache_key, pre_classification)
+    
+    async def extract_cv_info(self, file: UploadFile) -> CVExtractionResponse:
+        """Extract structured information (contacts, skills, experience, education) from a CV.
         
-        # Parse elements found from AI response
-        elements_count = 0
-        required_elements = 0
+        Raises UploadRejected for unusable files and AIResponseError when the
+        model returns nothing that fits CVExtractionResponse.
+        """
+        async with self.upload_reader.read(file) as content:
+            is_valid, error_msg = self.document_processor.validate_file(content, file.filename)
+            if not is_valid:
+                raise UploadRejected(error_msg)
+            
+            content_hash = ResultCache.hash_bytes(content)
+            if self.extraction_cache is not None:
+                cached = await self.extraction_cache.get(content_hash)
+                if cached is not None:
+                    return CVExtractionResponse.model_validate(cached)
+            
+            parsed = await self._parse(content, file.filename, content_hash)
+            if len(parsed.text) < Config.PDF_MIN_TEXT_LENGTH:
+                raise UploadRejected(
+                    f"File contains insufficient text content (minimum {Config.PDF_MIN_TEXT_LENGTH} characters required)"
+                )
+            
+            with PROMPT_BUILD_SECONDS.time("extract_cv_info"):
+                prompt = CVExtractionPrompts.extract_cv_info(parsed.text, Config.CV_EXTRACTION_MAX_TEXT_LENGTH)
+            result, model = await self.gemini_client.generate_json_async(
+                prompt,
+                response_schema=CVExtractionPrompts.RESPONSE_SCHEMA,
+                response_model=CVExtractionResponse
+            )
+            
+            # Only cache real model output, never mock fallbacks
+            if model is not None and self.extraction_cache is not None:
+                self.extraction_cache.set(content_hash, result.model_dump())
+            return result
+    
+    async def _parse(self, content: bytes, filename: str, content_hash: Optional[str] = None) -> ParsedDocument:
+        """Parse in the extraction pool, reusing a recent parse of the same bytes"""
+        content_hash = content_hash or ResultCache.hash_bytes(content)
+        parsed = self._parsed_documents.get(content_hash)
+        if parsed is not None:
+            self._parsed_documents.move_to_end(content_hash)
+            return parsed
+        
+        parsed = await self.extraction_pool.parse_document(content, filename, self.text_budget)
+        if Config.PARSED_DOCUMENT_CACHE_SIZE > 0 and parsed.error is None:
+            self._parsed_documents[content_hash] = parsed
+            while len(self._parsed_documents) > Config.PARSED_DOCUMENT_CACHE_SIZE:
+                self._parsed_documents.popitem(last=False)
+        return parsed
+    
+    async def validate_cv_batch(self, files: List[UploadFile]) -> CVBatchValidationResponse:
+        """Validate many files, packing several documents into each Gemini call"""
+        items: List[Optional[CVBatchValidationItem]] = [None] * len(files)
+        pending: List[_BatchDocument] = []
+        
+        # Uploaded bytes count against the in-flight cap until the whole batch is done
+        async with AsyncExitStack() as uploads:
+            for index, file in enumerate(files):
+                try:
+                    content = await uploads.enter_async_context(self.upload_reader.read(file))
+                except (UploadRejected, UploadCapacityExceeded) as e:
+                    items[index] = CVBatchValidationItem(filename=file.filename, error=str(e))
+                    continue
+                except Exception as e:
+                    items[index] = CVBatchValidationItem(filename=file.filename, error=f"Error reading file: {str(e)}")
+                    continue
+                
+                is_valid, error_msg = self.document_processor.validate_file(content, file.filename)
+                if not is_valid:
+                    items[index] = CVBatchValidationItem(filename=file.filename, error=error_msg)
+                    continue
+                
+                cache_key = ResultCache.hash_bytes(content) if self.validation_cache else None
+                cached = await self._get_cached_response(cache_key, file.filename)
+                if cached is not None:
+                    items[index] = CVBatchValidationItem(filename=file.filename, result=cached)
+                    continue
+                
+                pending.append(_BatchDocument(index, file.filename, content, cache_key))
+            
+            return await self._validate_batch_documents(items, pending)
+    
+    async def _validate_batch_documents(self, items: List[Optional[CVBatchValidationItem]],
+                                        pending: List["_BatchDocument"]) -> CVBatchValidationResponse:
+        """Parse, fast-path and pack the read documents of a batch"""
+        # Extract text in parallel across the extraction pool
+        parsed_documents = await asyncio.gather(
+            *[self._parse(doc.content, doc.filename, doc.cache_key) for doc in pending],
+            return_exceptions=True
+        )
+        
+        to_validate: List[_BatchDocument] = []
+        for doc, parsed in zip(pending, parsed_documents):
+            if isinstance(parsed, Exception):
+                items[doc.index] = CVBatchValidationItem(filename=doc.filename, error=f"Error processing file: {str(parsed)}")
+            elif len(parsed.text) < Config.PDF_MIN_TEXT_LENGTH:
+                items[doc.index] = CVBatchValidationItem(
+                    filename=doc.filename,
+                    result=self._insufficient_text_response(doc.content, doc.filename, parsed, doc.cache_key)
+                )
+            else:
+                doc.parsed = parsed
+                doc.pre_classification = self._pre_classify(parsed)
+                local = self._fast_path_response(doc.content, doc.filename, parsed, doc.cache_key, doc.pre_classification)
+                if local is not None:
+                    items[doc.index] = CVBatchValidationItem(filename=doc.filename, result=local)
+                else:
+                    to_validate.append(doc)
+        
+        pack_size = max(1, Config.BATCH_PACK_SIZE)
+        packs = [to_validate[i:i + pack_size] for i in range(0, len(to_validate), pack_size)]
+        await asyncio.gather(*[self._validate_pack(pack, items) for pack in packs])
+        
+        failed = sum(1 for item in items if item.error is not None)
+        return CVBatchValidationResponse(
+            results=items,
+            total=len(items),
+            succeeded=len(items) - failed,
+            failed=failed
+        )
+    
+    async def _validate_pack(self, pack: List["_BatchDocument"], items: List[Optional[CVBatchValidationItem]]) -> None:
+        """Validate one pack of documents with a single prompt and fan the verdicts back out"""
+        if len(pack) == 1:
+            verdicts, model, ai_response = {}, None, None
+        else:
+            with PROMPT_BUILD_SECONDS.time("validate_cv_batch"):
+                prompt = CVValidationPrompts.validate_cv_batch(
+                    [doc.parsed.text for doc in pack], Config.BATCH_DOC_MAX_TEXT_LENGTH
+                )
+            try:
+                ai_response, model = await self.gemini_client.generate_content_with_model_async(
+                    prompt, system_instruction=CVValidationPrompts.SYSTEM_INSTRUCTION
+                )
+            except RateLimitExceeded as e:
+                for doc in pack:
+                    items[doc.index] = CVBatchValidationItem(
+                        filename=doc.filename, error=f"{str(e)} (retry after {e.retry_after_header}s)"
+                    )
+                return
+            
+            if model is None:
+                # Every model failed - report it per file so the caller can retry them
+                for doc in pack:
+                    items[doc.index] = CVBatchValidationItem(filename=doc.filename, error=ai_response)
+                return
+            verdicts = self._parse_batch_verdicts(ai_response)
+        
+        for position, doc in enumerate(pack):
+            try:
+                verdict = verdicts.get(position)
+                if verdict is None:
+                    # Not packed, or the model skipped this document - validate it on its own
+                    result = await self._validate_parsed(
+                        doc.content, doc.filename, doc.parsed, doc.cache_key, doc.pre_classification
+                    )
+                else:
+                    result = self._build_response(
+                        verdict, model, doc.content, doc.filename, doc.parsed, doc.cache_key, doc.pre_classification
+                    )
+                items[doc.index] = CVBatchValidationItem(filename=doc.filename, result=result)
+            except RateLimitExceeded as e:
+                items[doc.index] = CVBatchValidationItem(
+                    filename=doc.filename, error=f"{str(e)} (retry after {e.retry_after_header}s)"
+                )
+            except Exception as e:
+                items[doc.index] = CVBatchValidationItem(filename=doc.filename, error=f"Error processing file: {str(e)}")
+    
+    @staticmethod
+    def _parse_batch_verdicts(ai_response: str) -> Dict[int, str]:
+        """Map document index -> YES/NO verdict from the batch JSON answer"""
+        verdicts = {}
+        try:
+            for entry in GeminiClient.parse_json_response(ai_response):
+                verdicts[int(entry["index"])] = str(entry["verdict"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Could not parse batch verdicts: %s", e)
+        return verdicts
+    
+    async def _get_cached_response(self, cache_key: Optional[str], filename: str) -> Optional[CVValidationResponse]:
+        """Return the cached verdict for identical bytes, relabelled with this filename"""
+        if not cache_key or self.validation_cache is None:
+            return None
+        cached = await self.validation_cache.get(cache_key)
+        if cached is None:
+            return None
+        
+        file_info = dict(cached.get("file_info") or {})
+        file_info["filename"] = filename
+        return CVValidationResponse(
+            is_cv=cached["is_cv"],
+            confidence=cached["confidence"],
+            reason=cached["reason"],
+            file_info=file_info,
+            cached=True,
+            fast_path=cached.get("fast_path", False)
+        )
+    
+    def _insufficient_text_response(self, content: bytes, filename: str, parsed: ParsedDocument,
+                                    cache_key: Optional[str]) -> CVValidationResponse:
+        """Response for documents too short to be judged"""
+        response = CVValidationResponse(
+            is_cv=False,
+            confidence=0.0,
+            reason=f"File contains insufficient text content (minimum {Config.PDF_MIN_TEXT_LENGTH} characters required)",
+            file_info=self.document_processor.get_file_info(content, filename, parsed)
+        )
+        self._store_in_cache(cache_key, response)
+        return response
+    
+    def _pre_classify(self, parsed: ParsedDocument) -> Optional[PreClassification]:
+        """Run the keyword fast path (None when disabled)"""
+        if self.pre_classifier is None:
+            return None
+        return self.pre_classifier.classify(parsed.text)
+    
+    def _fast_path_response(self, content: bytes, filename: str, parsed: ParsedDocument,
+                            cache_key: Optional[str],
+                            pre_classification: Optional[PreClassification]) -> Optional[CVValidationResponse]:
+        """Answer locally when the pre-classifier is confident, else None (ask Gemini)"""
+        if pre_classification is None or not self.pre_classifier.should_answer_locally(pre_classification):
+            return None
+        
+        response = CVValidationResponse(
+            is_cv=pre_classification.is_cv,
+            confidence=pre_classification.confidence,
+            reason=pre_classification.reason,
+            file_info=self.document_processor.get_file_info(content, filename, parsed),
+            fast_path=True
+        )
+        self._store_in_cache(cache_key, response)
+        return response
+    
+    async def _validate_parsed(self, content: bytes, filename: str, parsed: ParsedDocument,
+                               cache_key: Optional[str],
+                               pre_classification: Optional[PreClassification] = None) -> CVValidationResponse:
+        """Ask Gemini about a single parsed document"""
+        # Generate prompt and get AI response
+        with PROMPT_BUILD_SECONDS.time("validate_cv"):
+            prompt = CVValidationPrompts.validate_cv_content(parsed.text, Config.PDF_MAX_TEXT_LENGTH)
+        ai_response, model = await self.gemini_client.generate_content_with_model_async(
+            prompt, system_instruction=CVValidationPrompts.SYSTEM_INSTRUCTION
+        )
+        return self._build_response(ai_response, model, content, filename, parsed, cache_key, pre_classification)
+    
+    def _build_response(self, ai_response: str, model: Optional[str], content: bytes, filename: str,
+                        parsed: ParsedDocument, cache_key: Optional[str],
+                        pre_classification: Optional[PreClassification] = None) -> CVValidationResponse:
+        """Turn a YES/NO verdict into a validation response (and cache real model verdicts)"""
+        # Parse AI response
+        is_cv, reason = GeminiClient.parse_yes_no_response(ai_response)
+        
+        # Track how often the fast path agrees with the model
+        if model is not None and pre_classification is not None:
+            self.pre_classifier.record_model_verdict(pre_classification, is_cv)
         
-        # Check for required elements (name + contact)
-        if any(word in response_lower for word in ["tên", "họ", "name", "email", "điện thoại", "phone"]):
-            required_elements += 1
+        # Calculate confidence based on response clarity
+        with CONFIDENCE_SCORING_SECONDS.time():
+            confidence = self._calculate_confidence(ai_response, is_cv)
         
-        # Check for professional elements (need at least 3)
-        professional_elements = [
-            ["kinh nghiệm", "experience", "làm việc", "công việc", "vị trí"],  # Experience
-            ["kỹ năng", "skills", "công nghệ", "technology", "lập trình"],      # Skills  
-            ["dự án", "project", "thực hiện", "phát triển"],                   # Projects
-            ["học vấn", "education", "trường", "đại học", "bằng cấp"],        # Education
-            ["chứng chỉ", "certificate", "thành tích", "giải thưởng"]          # Achievements
-        ]
+        response = CVValidationResponse(
+            is_cv=is_cv,
+            confidence=confidence,
+            reason=reason,
+            file_info=self.document_processor.get_file_info(content, filename, parsed)
+        )
         
-        for element_group in professional_elements:
-            if any(word in response_lower for word in element_group):
-                elements_count += 1
+        # Only cache real model verdicts, never error/mock fallbacks
+        if model is not None:
+            self._store_in_cache(cache_key, response)
+        
+        return response
+    
+    def _store_in_cache(self, cache_key: Optional[str], response: CVValidationResponse) -> None:
+        """Persist a validation result for future identical uploads"""
+        if not cache_key or self.validation_cache is None:
+            return
+        self.validation_cache.set(cache_key, {
+            "is_cv": response.is_cv,
+            "confidence": response.confidence,
+            "reason": response.reason,
+            "file_info": response.file_info,
+            "fast_path": response.fast_path
+        })
+    
+    def _calculate_confidence(self, ai_response: str, is_cv: bool) -> float:
+        """Calculate confidence score based on AI response and CV elements detected"""
+        hits = CONFIDENCE_KEYWORDS.scan(ai_response)
+        
+        # Required elements (name + contact) and professional elements (need at least 3)
+        required_elements = 1 if hits.has("identity") else 0
+        elements_count = sum(1 for element in PROFESSIONAL_ELEMENTS if hits.has(element))
         
         # Calculate confidence based on CV validation criteria
         if is_cv:
@@ -115,16 +510,13 @@ class CVService:
             confidence = 0.70
             
             # If clearly states missing requirements, higher confidence
-            if any(word in response_lower for word in ["thiếu", "missing", "không có", "lack"]):
+            if hits.has("missing"):
                 confidence = 0.85
         
         # Adjust based on response clarity
-        high_confidence_words = ["rõ ràng", "chắc chắn", "clearly", "definitely"]
-        medium_confidence_words = ["có thể", "dường như", "appears", "seems"] 
-        
-        if any(word in response_lower for word in high_confidence_words):
+        if hits.has("high_confidence"):
             confidence = min(confidence + 0.05, 0.95)
-        elif any(word in response_lower for word in medium_confidence_words):
+        elif hits.has("medium_confidence"):
             confidence = min(confidence + 0.02, 0.90)
         
         # Clear YES/NO response bonus
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from models.schemas import (
+    JobMatchRequest,
+    JobMatchResponse,
+    JobPosting,
+    JobRankRequest,
+    JobRankResponse,
+    RankedJob,
+    CVProfile,
+    SkillIndexQuery,
+    SkillIndexCandidate,
+    SkillIndexQueryResponse
+)
+from utils.gemini_client import get_gemini_client
+from utils.result_cache import ResultCache
+from utils.job_vector_index import JobVectorIndex
+from utils.skill_index import get_skill_index
+from utils.metrics import PROMPT_BUILD_SECONDS
+from utils.text_matching import SKILL_ALIASES, tokenize, extract_skills, bm25_coverage, skill_overlap
+from prompts.job_matching import JobMatchingPrompts
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PrefilterResult:
+    """Local (no LLM) estimate of how well a CV fits a job"""
+    score: float  # 0-100
+    matching_skills: List[str]
+    missing_skills: List[str]
+    skill_fraction: float
+    keyword_coverage: float
+
+
+class JobMatchingService:
+    """Two-stage CV - job matching: local skill/keyword prefilter, Gemini only above a threshold"""
+
+    def __init__(self):
+        self.gemini_client = get_gemini_client()
+        self.match_cache = self._create_match_cache() if Config.CACHE_ENABLED else None
+        self.job_index = JobVectorIndex()
+        self.skill_index = get_skill_index()
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _create_match_cache() -> ResultCache:
+        """Create the /match_cv_job result cache, versioned by prompt, schema, skill aliases, threshold and model"""
+        version = ResultCache.make_version(
+            JobMatchingPrompts.match_cv_job("", "", [], [], Config.MATCH_MAX_TEXT_LENGTH),
+            json.dumps(JobMatchingPrompts.RESPONSE_SCHEMA, sort_keys=True),
+            json.dumps(SKILL_ALIASES, sort_keys=True, ensure_ascii=False),
+            f"threshold={Config.MATCH_LLM_THRESHOLD}:skill_weight={Config.MATCH_SKILL_WEIGHT}",
+            Config.GEMINI_MODEL,
+            ",".join(Config.GEMINI_FALLBACK_MODELS)
+        )
+        return ResultCache(namespace="match_cv_job", version=version)
+
+    @staticmethod
+    def prefilter(cv_text: str, job_description: str) -> PrefilterResult:
+        """Score skill overlap and BM25-style keyword coverage of the job by the CV"""
+        matching, missing, skill_fraction = skill_overlap(extract_skills(cv_text), extract_skills(job_description))
+        keyword_coverage = bm25_coverage(tokenize(cv_text), tokenize(job_description))
+
+        if matching or missing:
+            score = Config.MATCH_SKILL_WEIGHT * skill_fraction + (1 - Config.MATCH_SKILL_WEIGHT) * keyword_coverage
+        else:
+            # No recognisable skills in the job description - keywords are all we have
+            score = keyword_coverage
+
+        return PrefilterResult(
+            score=round(100 * score, 1),
+            matching_skills=matching,
+            missing_skills=missing,
+            skill_fraction=skill_fraction,
+            keyword_coverage=keyword_coverage
+        )
+
+    async def match_cv_job(self, request: JobMatchRequest) -> JobMatchResponse:
+        """Match one CV against one job description"""
+        cache_key = self._cache_key(request)
+        if self.match_cache is not None:
+            cached = await self.match_cache.get(cache_key)
+            if cached is not None:
+                return JobMatchResponse.model_validate({**cached, "cached": True})
+
+        prefiltered = self.prefilter(request.cv_text, request.job_description)
+        if prefiltered.score < Config.MATCH_LLM_THRESHOLD:
+            return self._local_response(prefiltered)
+
+        with PROMPT_BUILD_SECONDS.time("match_cv_job"):
+            prompt = JobMatchingPrompts.match_cv_job(
+                request.cv_text,
+                request.job_description,
+                prefiltered.matching_skills,
+                prefiltered.missing_skills,
+                Config.MATCH_MAX_TEXT_LENGTH
+            )
+        result, model = await self.gemini_client.generate_json_async(
+            prompt,
+            response_schema=JobMatchingPrompts.RESPONSE_SCHEMA,
+            response_model=JobMatchResponse
+        )
+        result.prefilter_score = prefiltered.score
+        result.ai_assessed = True
+
+        # Only cache real model output, never mock fallbacks
+        if model is not None and self.match_cache is not None:
+            self.match_cache.set(cache_key, result.model_dump(exclude={"cached"}))
+        return result
+
+    @staticmethod
+    def _cache_key(request: JobMatchRequest) -> str:
+        """(CV hash, job hash) pair"""
+        cv_hash = ResultCache.hash_bytes(request.cv_text.encode("utf-8"))
+        job_hash = ResultCache.hash_bytes(request.job_description.encode("utf-8"))
+        return f"{cv_hash}:{job_hash}"
+
+    @staticmethod
+    def _local_response(prefiltered: PrefilterResult) -> JobMatchResponse:
+        """Answer a clear mismatch from the prefilter alone"""
+        if prefiltered.missing_skills:
+            assessment = (
+                f"Low match: the CV covers {len(prefiltered.matching_skills)} of "
+                f"{len(prefiltered.matching_skills) + len(prefiltered.missing_skills)} required skills"
+            )
+            recommendations = f"Consider gaining experience with: {', '.join(prefiltered.missing_skills[:5])}"
+        else:
+            assessment = "Low match: the CV shares few keywords with the job description"
+            recommendations = None
+
+        return JobMatchResponse(
+            match_score=prefiltered.score,
+            matching_skills=prefiltered.matching_skills,
+            missing_skills=prefiltered.missing_skills,
+            overall_assessment=assessment,
+            recommendations=recommendations,
+            prefilter_score=prefiltered.score,
+            ai_assessed=False
+        )
+
+    async def upsert_jobs(self, jobs: List[JobPosting]) -> int:
+        """Add or replace job postings in the ranking and skill indexes"""
+        # (title, description) are kept with the vectors for Gemini re-ranking
+        stored = {job.job_id: (job.title, job.description[:Config.MATCH_MAX_TEXT_LENGTH]) for job in jobs}
+        documents = [(job.job_id, f"{job.title or ''}\n{job.description}", job.skills) for job in jobs]
+        await asyncio.to_thread(self.job_index.upsert_many, documents, stored)
+        await asyncio.to_thread(self.skill_index.upsert_many, "job", documents)
+        return len(self.job_index)
+
+    def delete_job(self, job_id: str) -> bool:
+        """Remove a job posting from the ranking and skill indexes"""
+        in_ranking = self.job_index.delete(job_id)
+        in_skill_index = self.skill_index.delete("job", job_id)
+        return in_ranking or in_skill_index
+
+    async def restore_indexes(self) -> None:
+        """Load both index snapshots and drop jobs present in only one of them.
+
+        PUT /job_postings feeds both indexes, so after a restart /rank_jobs and
+        /job_postings/search must see the same jobs; a job missing from either
+        snapshot (written between the two) is dropped until it is pushed again.
+        """
+        ranking_restored = await asyncio.to_thread(self.job_index.restore)
+        skills_restored = await asyncio.to_thread(self.skill_index.restore)
+        ranking_jobs = set(self.job_index.job_ids())
+        skill_jobs = set(self.skill_index.ids("job"))
+        for job_id in ranking_jobs - skill_jobs:
+            self.job_index.delete(job_id)
+        for job_id in skill_jobs - ranking_jobs:
+            self.skill_index.delete("job", job_id)
+        if ranking_jobs ^ skill_jobs:
+            logger.warning("Dropped %d jobs found in only one index snapshot", len(ranking_jobs ^ skill_jobs))
+        if ranking_restored or skills_restored:
+            logger.info("Job indexes restored (%d jobs, %d CVs)", len(self.job_index), self.skill_index.count("cv"))
+
+    def start_snapshots(self) -> None:
+        """Compact and snapshot both indexes periodically on the running event loop"""
+        if self._snapshot_task is None or self._snapshot_task.done():
+            self._snapshot_task = asyncio.create_task(self._run_snapshots())
+
+    async def stop_snapshots(self) -> None:
+        """Cancel periodic snapshots and write a final one"""
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self._snapshot_task = None
+        await self._snapshot_indexes()
+
+    async def _snapshot_indexes(self) -> None:
+        # Written back to back so a restart finds both at (nearly) the same point
+        if self.job_index.unsaved_changes or self.skill_index.unsaved_changes:
+            await asyncio.to_thread(self.job_index.snapshot)
+            await asyncio.to_thread(self.skill_index.snapshot)
+
+    async def _run_snapshots(self) -> None:
+        while True:
+            await asyncio.sleep(Config.SKILL_INDEX_SNAPSHOT_INTERVAL_SECONDS)
+            # Deletes only mask postings; fold them in here rather than in the request
+            await asyncio.to_thread(self.skill_index.compact_pending)
+            await self._snapshot_indexes()
+
+    async def upsert_cv_profiles(self, profiles: List[CVProfile]) -> int:
+        """Add or replace CV profiles in the skill index"""
+        await asyncio.to_thread(
+            self.skill_index.upsert_many,
+            "cv",
+            [(profile.cv_id, profile.text, profile.skills) for profile in profiles]
+        )
+        return self.skill_index.count("cv")
+
+    def delete_cv_profile(self, cv_id: str) -> bool:
+        """Remove a CV profile from the skill index"""
+        return self.skill_index.delete("cv", cv_id)
+
+    def find_candidates(self, kind: str, query: SkillIndexQuery) -> SkillIndexQueryResponse:
+        """Indexed jobs (kind="job") or CVs (kind="cv") sharing skills with the query"""
+        started = time.perf_counter()
+        found = self.skill_index.query(
+            kind, query.text, query.skills, min(query.limit, Config.SKILL_INDEX_MAX_RESULTS)
+        )
+        return SkillIndexQueryResponse(
+            candidates=[
+                SkillIndexCandidate(id=doc_id, matching_skills=skills, matching_keywords=keywords)
+                for doc_id, skills, keywords in found
+            ],
+            total_indexed=self.skill_index.count(kind),
+            took_ms=round((time.perf_counter() - started) * 1000, 3)
+        )
+
+    async def rank_jobs(self, request: JobRankRequest) -> JobRankResponse:
+        """Top-k indexed jobs for a CV, optionally re-ranking the best few with Gemini"""
+        started = time.perf_counter()
+        top_k = min(request.top_k, Config.RANK_MAX_TOP_K)
+        ranked = await asyncio.to_thread(self.job_index.rank, request.cv_text, top_k)
+
+        # Looked up once: a job deleted while ranking ran off the loop is dropped, not re-ranked
+        texts: Dict[str, Tuple[Optional[str], str]] = {}
+        results = []
+        for job_id, score in ranked:
+            stored = self.job_index.stored(job_id)
+            if stored is None:
+                continue
+            texts[job_id] = stored
+            results.append(RankedJob(job_id=job_id, title=stored[0], score=round(score, 4)))
+
+        rerank = min(request.rerank_top, Config.RANK_MAX_RERANK, len(results))
+        if rerank:
+            matches = await asyncio.gather(
+                *[
+                    self.match_cv_job(JobMatchRequest(cv_text=request.cv_text, job_description=texts[r.job_id][1]))
+                    for r in results[:rerank]
+                ],
+                return_exceptions=True
+            )
+            for result, match in zip(results, matches):
+                if isinstance(match, JobMatchResponse):
+                    result.match = match
+                else:
+                    logger.warning("Re-ranking %s failed: %s", result.job_id, match)
+            # Re-assessed jobs are ordered by the match score; failures keep their vector rank
+            results[:rerank] = sorted(
+                results[:rerank],
+                key=lambda r: r.match.match_score / 100 if r.match else r.score,
+                reverse=True
+            )
+
+        return JobRankResponse(
+            results=results,
+            total_jobs=len(self.job_index),
+            took_ms=round((time.perf_counter() - started) * 1000, 2)
+        )
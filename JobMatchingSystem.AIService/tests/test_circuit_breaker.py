@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = {
+        "failure_rate_threshold": 0.5,
+        "min_calls": 4,
+        "window_size": 10,
+        "cooldown_seconds": 30,
+        "max_cooldown_seconds": 100,
+        "probe_timeout_seconds": 60
+    }
+    options.update(kwargs)
+    return CircuitBreaker("gemini-test", **options)
+
+
+def test_opens_on_failure_rate_only_after_min_calls(clock):
+    breaker = make_breaker()
+
+    for _ in range(3):
+        breaker.record_failure("boom")
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure("boom")
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert not breaker.is_available()
+
+
+def test_trip_opens_immediately_with_given_cooldown(clock):
+    breaker = make_breaker()
+
+    breaker.record_failure("quota", trip=True, cooldown_seconds=5)
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.get_status_info()["retry_in_seconds"] == 5
+    clock.now += 5
+    assert breaker.is_available()
+
+
+def test_half_open_admits_a_single_probe(clock):
+    breaker = make_breaker()
+    breaker.record_failure("quota", trip=True)
+    clock.now += 30
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+    # A stuck probe expires and the slot can be claimed again
+    clock.now += 61
+    assert breaker.allow_request()
+
+
+def test_released_probe_can_be_claimed_again(clock):
+    breaker = make_breaker()
+    breaker.record_failure("quota", trip=True)
+    clock.now += 30
+
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+
+def test_successful_probe_closes_and_resets_backoff(clock):
+    breaker = make_breaker()
+    breaker.record_failure("quota", trip=True)
+    clock.now += 30
+    breaker.allow_request()
+
+    breaker.record_success()
+
+    status = breaker.get_status_info()
+    assert breaker.state == CircuitState.CLOSED
+    assert status["consecutive_opens"] == 0
+    assert status["last_error"] is None
+
+
+def test_failed_probes_back_off_exponentially_up_to_the_cap(clock):
+    breaker = make_breaker()
+    breaker.record_failure("boom", trip=True)
+    cooldowns = []
+
+    for _ in range(3):
+        clock.now += breaker.get_status_info()["retry_in_seconds"]
+        assert breaker.allow_request()
+        breaker.record_failure("still down")
+        cooldowns.append(breaker.get_status_info()["retry_in_seconds"])
+
+    assert cooldowns == [60, 100, 100]
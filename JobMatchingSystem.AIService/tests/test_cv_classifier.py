@@ -0,0 +1,101 @@
+import pytest
+from utils.cv_classifier import CVFeatures, CVPreClassifier
+
+CV_TEXT = """Nguyễn Văn An
+THÔNG TIN CÁ NHÂN
+Email: an.nguyen@gmail.com | Điện thoại: 0912345678
+MỤC TIÊU NGHỀ NGHIỆP
+Trở thành kỹ sư phần mềm chính.
+KINH NGHIỆM LÀM VIỆC
+2019 - 2023: Developer tại công ty FPT Software, phát triển hệ thống ERP.
+KỸ NĂNG
+Python, Java, SQL, React
+DỰ ÁN
+Website thương mại điện tử: xây dựng API thanh toán.
+HỌC VẤN
+Đại học Bách Khoa - Cử nhân Công nghệ Thông tin (2015 - 2019)
+"""
+
+JOB_DESCRIPTION_TEXT = """Job Description - Senior Python Developer
+Company name: Acme Software. Contact: hr@acme.example
+Responsibilities
+- Develop and maintain backend services in Python and Java
+- Own projects from design to release
+Requirements
+- 3+ years of experience as a developer or engineer
+- University degree in Computer Science, certified AWS engineer is a plus
+Skills: Python, SQL, React
+Benefits
+- Competitive salary, 2024 - 2025 review cycle
+How to apply: send your CV to hr@acme.example or call 0912345678
+"""
+
+API_DOC_TEXT = """User API Reference
+Overview
+This project exposes a REST API for the user management app, developed by the platform engineer team.
+Authentication
+Send your API key; contact support@example.com or phone 0987654321 for access.
+Endpoints
+POST /users - create a user with name, email and phone
+Parameters
+name (string): full name of the user
+email (string): e-mail address
+skills (array): e.g. python, java, sql
+experience (int): years of experience
+education (string): university
+Response
+Returns the created user. Supported API versions: 2019 - 2024.
+"""
+
+INVOICE_TEXT = """HÓA ĐƠN GIÁ TRỊ GIA TĂNG
+Đơn vị bán hàng: Công ty Nguyễn Văn Phát. Email: ketoan@phat.vn. Điện thoại: 0281234567
+Mã số thuế: 0312345678
+STT | Hàng hóa | Số lượng | Đơn giá | Thành tiền
+1 | Máy tính | 2 | 15.000.000 | 30.000.000
+Tổng tiền thanh toán: 30.000.000 (đã bao gồm thuế GTGT)
+"""
+
+
+@pytest.fixture
+def classifier():
+    return CVPreClassifier(yes_threshold=0.9, no_threshold=0.1, shadow_rate=0)
+
+
+def test_structured_cv_is_answered_locally(classifier):
+    result = classifier.classify(CV_TEXT)
+
+    assert result.decided and result.is_cv
+    assert result.bucket == "yes"
+
+
+@pytest.mark.parametrize("text", [JOB_DESCRIPTION_TEXT, API_DOC_TEXT], ids=["job_description", "api_doc"])
+def test_cv_vocabulary_alone_does_not_skip_gemini(classifier, text):
+    features = CVFeatures.extract(text)
+    result = classifier.classify(text)
+
+    # Keywords score these like a CV, but the layout is not a CV's
+    assert features.cv_score >= classifier.yes_threshold
+    assert not features.is_structured_cv
+    assert result.bucket != "yes"
+
+
+def test_invoice_is_never_a_local_yes(classifier):
+    result = classifier.classify(INVOICE_TEXT)
+
+    assert not CVFeatures.extract(INVOICE_TEXT).is_structured_cv
+    assert result.bucket != "yes"
+
+
+def test_structure_requires_contact_and_date_range():
+    without_dates = CV_TEXT.replace("2019 - 2023", "Hiện tại").replace("(2015 - 2019)", "")
+    without_contact = CV_TEXT.replace("an.nguyen@gmail.com", "").replace("0912345678", "")
+
+    assert CVFeatures.extract(CV_TEXT).is_structured_cv
+    assert not CVFeatures.extract(without_dates).is_structured_cv
+    assert not CVFeatures.extract(without_contact).is_structured_cv
+
+
+def test_obvious_non_cv_is_answered_no(classifier):
+    result = classifier.classify("Biên bản họp: báo cáo tiến độ quý, hợp đồng và điều khoản thanh toán.")
+
+    assert result.decided and not result.is_cv
@@ -0,0 +1,101 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+import requests
+from google.genai import errors as genai_errors
+
+from utils.circuit_breaker import CircuitState
+from utils.gemini_client import GeminiClient, _CallState
+
+
+@pytest.mark.parametrize("response, expected", [
+    ('{"is_cv": true}', {"is_cv": True}),
+    ('```json\n[{"index": 0, "verdict": "YES"}]\n```', [{"index": 0, "verdict": "YES"}]),
+    ('```\n{"a": 1}\n```', {"a": 1}),
+    ('Here is the result:\n[{"index": 1, "verdict": "NO"}]\nHope this helps.', [{"index": 1, "verdict": "NO"}]),
+    ('Sure! {"score": 80, "skills": ["Python"]} Done.', {"score": 80, "skills": ["Python"]}),
+])
+def test_parse_json_response_extracts_the_payload(response, expected):
+    assert GeminiClient.parse_json_response(response) == expected
+
+
+@pytest.mark.parametrize("response", [
+    "YES - this is a CV",
+    "The answer is } not JSON {",
+    '{"score": 80',
+])
+def test_parse_json_response_rejects_responses_without_json(response):
+    with pytest.raises(ValueError):
+        GeminiClient.parse_json_response(response)
+
+
+def api_error(cls, code: int, status: str, message: str):
+    response = requests.Response()
+    response.status_code = code
+    response._content = json.dumps({"error": {"code": code, "status": status, "message": message}}).encode()
+    return cls(code, response)
+
+
+class FakeModels:
+    """aio.models stand-in: raises the queued errors, then answers"""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.configs = []
+
+    async def generate_content(self, model, contents, config=None):
+        self.configs.append(config)
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(text="YES", usage_metadata=None)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    gemini = GeminiClient()
+    monkeypatch.setattr(gemini.context_cache, "lookup", lambda model, instruction: "cachedContents/abc")
+    invalidated = []
+    monkeypatch.setattr(gemini.context_cache, "invalidate", lambda model, instruction: invalidated.append(model))
+    gemini.invalidated = invalidated
+    return gemini
+
+
+def attempt(gemini: GeminiClient, models: FakeModels):
+    gemini.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    state = _CallState(estimated_tokens=10, system_instruction="Answer YES or NO")
+    return asyncio.run(gemini._attempt("gemini-test", "prompt", state)), state
+
+
+def test_rejected_cached_prefix_is_retried_inline(client):
+    models = FakeModels(api_error(
+        genai_errors.ClientError, 400, "INVALID_ARGUMENT", "CachedContent not found (or permission denied)"
+    ))
+
+    response, state = attempt(client, models)
+
+    assert response == ("YES", "gemini-test")
+    assert client.invalidated == ["gemini-test"]
+    assert models.configs[0].cached_content == "cachedContents/abc"
+    assert models.configs[1].cached_content is None
+    assert models.configs[1].system_instruction == "Answer YES or NO"
+    assert client._breaker("gemini-test").state == CircuitState.CLOSED
+
+
+@pytest.mark.parametrize("error, breaker_state", [
+    # Quota errors trip the breaker straight away
+    (api_error(genai_errors.ClientError, 429, "RESOURCE_EXHAUSTED", "Quota exceeded"), CircuitState.OPEN),
+    (api_error(genai_errors.ServerError, 503, "UNAVAILABLE", "The model is overloaded"), CircuitState.CLOSED),
+])
+def test_model_errors_are_not_blamed_on_the_cached_prefix(client, error, breaker_state):
+    models = FakeModels(error)
+
+    response, state = attempt(client, models)
+
+    assert response is None
+    assert len(models.configs) == 1
+    assert client.invalidated == []
+    assert state.last_error is not None
+    assert client._breaker("gemini-test").state == breaker_state
+    assert client._breaker("gemini-test").get_status_info()["last_error"] is not None
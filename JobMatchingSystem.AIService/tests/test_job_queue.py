@@ -0,0 +1,118 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from utils import job_queue
+from utils.job_queue import JobQueue, InvalidCallbackUrl
+
+
+def make_queue(*allowed_hosts: str) -> JobQueue:
+    queue = JobQueue(db_path="", workers=1, max_pending=10, max_attempts=3)
+    queue.allowed_callback_hosts = set(allowed_hosts)
+    return queue
+
+
+def fake_resolver(addresses):
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host not in addresses:
+            raise socket.gaierror("unknown host")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, 0)) for address in addresses[host]]
+    return getaddrinfo
+
+
+def test_callbacks_are_denied_when_no_host_is_allowed():
+    queue = make_queue()
+
+    assert queue.check_callback_url(None) is None
+    with pytest.raises(InvalidCallbackUrl):
+        queue.check_callback_url("https://example.com/hook")
+
+
+def test_only_listed_hosts_are_accepted():
+    queue = make_queue("api.internal")
+
+    assert queue.check_callback_url(" http://API.internal:5000/hook ") == "http://API.internal:5000/hook"
+    with pytest.raises(InvalidCallbackUrl):
+        queue.check_callback_url("http://169.254.169.254/latest/meta-data")
+
+
+@pytest.mark.parametrize("url", ["ftp://example.com/x", "/relative/path", "http:///no-host"])
+def test_non_http_urls_are_rejected(url):
+    with pytest.raises(InvalidCallbackUrl):
+        make_queue("example.com").check_callback_url(url)
+
+
+def test_wildcard_accepts_only_public_addresses(monkeypatch):
+    monkeypatch.setattr(job_queue.socket, "getaddrinfo", fake_resolver({
+        "hooks.example.com": ["93.184.216.34"],
+        "rebind.example.com": ["93.184.216.34", "10.0.0.5"],
+        "metadata.example.com": ["169.254.169.254"],
+    }))
+    queue = make_queue("*")
+
+    assert queue.check_callback_url("https://hooks.example.com/x") == "https://hooks.example.com/x"
+    for url in ("https://rebind.example.com/x", "https://metadata.example.com/x", "http://127.0.0.1:8000/x",
+                "http://localhost/x", "https://unresolvable.example.com/x"):
+        with pytest.raises(InvalidCallbackUrl):
+            queue.check_callback_url(url)
+
+
+def test_callback_post_does_not_follow_redirects():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            hits.append(self.path)
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path == "/hook":
+                self.send_response(307)
+                self.send_header("Location", "/internal")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        status = make_queue()._post_callback(f"http://127.0.0.1:{server.server_port}/hook", b"{}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert status == 307
+    assert hits == ["/hook"]
+
+
+def test_callback_delivery_does_not_block_the_event_loop(monkeypatch):
+    queue = make_queue("hooks.example.com")
+    queue.register("noop", None)
+    job_id = queue.submit("noop", b"", "cv.pdf", "https://hooks.example.com/done")["job_id"]
+    queue._claim()
+    assert queue._finish(job_id, job_queue.SUCCEEDED, {"is_cv": True}, None)
+    monkeypatch.setattr(queue, "_post_callback", lambda url, body: 200)
+
+    async def scenario():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        # A worker thread holding the queue lock (slow disk, busy queue) must not stall the loop
+        queue._lock.acquire()
+        threading.Timer(0.2, queue._lock.release).start()
+        ticking = asyncio.create_task(ticker())
+        await queue._deliver(job_id)
+        ticking.cancel()
+        return len(ticks)
+
+    assert asyncio.run(scenario()) >= 5
+    assert queue.get(job_id)["callback_status"] == job_queue.CALLBACK_DELIVERED
@@ -0,0 +1,77 @@
+from utils.job_vector_index import JobVectorIndex
+
+
+def make_index(tmp_path=None, **kwargs) -> JobVectorIndex:
+    options = {"n_features": 2 ** 16, "skill_weight": 3, "rebuild_threshold": 1000, "rebuild_fraction": 0.1}
+    options.update(kwargs)
+    return JobVectorIndex(snapshot_path=str(tmp_path / "job_index.npz") if tmp_path else "", **options)
+
+
+def add_corpus(index: JobVectorIndex) -> None:
+    # "zorblat" is in every posting but one, "quixel" only in job-rare
+    index.upsert_many(
+        [(f"job-{n}", f"zorblat zorblat zorblat filler{n}", None) for n in range(6)] + [("job-rare", "quixel fillerq", None)],
+        {**{f"job-{n}": (f"Job {n}", f"zorblat {n}") for n in range(6)}, "job-rare": ("Rare", "quixel")}
+    )
+
+
+def test_small_corpus_is_ranked_with_idf():
+    index = make_index()
+    add_corpus(index)
+
+    ranked = index.rank("zorblat quixel", top_k=3)
+
+    # Plain TF cosine would put the repeated common term first; IDF favours the rare one
+    assert ranked[0][0] == "job-rare"
+    assert index.get_status_info()["pending_changes"] == 0
+
+
+def test_small_delta_is_scored_without_rebuild():
+    index = make_index()
+    add_corpus(index)
+    index.rank("zorblat", top_k=1)
+    for n in range(20):
+        index.upsert(f"extra-{n}", f"zorblat filler-extra{n}")
+    index.rank("zorblat", top_k=1)
+
+    index.upsert("new", "quixel python developer", stored=("New", "quixel python developer"))
+    ranked = dict(index.rank("quixel python", top_k=5))
+
+    assert index.get_status_info()["pending_changes"] == 1
+    assert "new" in ranked and "job-rare" in ranked
+
+
+def test_deleted_jobs_are_not_ranked_and_lose_stored_text():
+    index = make_index()
+    add_corpus(index)
+    index.rank("quixel", top_k=1)
+
+    assert index.delete("job-rare")
+    assert not index.delete("job-rare")
+    assert index.stored("job-rare") is None
+    assert "job-rare" not in dict(index.rank("quixel zorblat", top_k=10))
+
+
+def test_snapshot_round_trip(tmp_path):
+    index = make_index(tmp_path)
+    add_corpus(index)
+    index.delete("job-0")
+    expected = index.rank("zorblat quixel", top_k=10)
+
+    assert index.snapshot()
+    restored = make_index(tmp_path)
+    assert restored.restore()
+
+    assert sorted(restored.job_ids()) == sorted(index.job_ids())
+    assert restored.stored("job-rare") == ("Rare", "quixel")
+    assert [job_id for job_id, _ in restored.rank("zorblat quixel", top_k=10)] == [job_id for job_id, _ in expected]
+    assert restored.get_status_info()["unsaved_changes"] == 0
+
+
+def test_snapshot_from_other_hashing_is_ignored(tmp_path):
+    index = make_index(tmp_path)
+    add_corpus(index)
+    index.snapshot()
+
+    assert not make_index(tmp_path, n_features=2 ** 15).restore()
+    assert not make_index().restore()
@@ -0,0 +1,53 @@
+import random
+
+from utils.keyword_matcher import KeywordMatcher, fold_diacritics
+
+
+def naive_scan(categories, text):
+    """Reference semantics: `keyword in text.lower()` for every keyword"""
+    text = text.lower()
+    return {keyword for keywords in categories.values() for keyword in keywords if keyword in text}
+
+
+def test_matches_substring_semantics_on_overlapping_keywords():
+    categories = {
+        "a": ["ab", "abc", "bcd", "c"],
+        "b": ["abcde", "de", "cab", "bb"],
+    }
+    matcher = KeywordMatcher(categories)
+    rng = random.Random(7)
+
+    for _ in range(2000):
+        text = "".join(rng.choice("abcde ") for _ in range(rng.randint(0, 12)))
+        assert matcher.scan(text).keywords == naive_scan(categories, text), text
+
+
+def test_counts_distinct_keywords_per_category():
+    matcher = KeywordMatcher({
+        "contact": ["email", "phone"],
+        "skills": ["python", "sql", "email"],
+    })
+
+    hits = matcher.scan("Email: a@b.c, Python, Python and SQL")
+
+    assert hits.count("contact") == 1
+    assert hits.count("skills") == 3
+    assert hits.has("skills")
+    assert not hits.has("education")
+
+
+def test_folded_matching_ignores_vietnamese_marks():
+    matcher = KeywordMatcher({"experience": ["kinh nghiệm"], "education": ["đại học"]}, fold_diacritics=True)
+
+    hits = matcher.scan("KINH NGHIEM LAM VIEC - Dai hoc Bach khoa")
+
+    assert hits.keywords == {"kinh nghiem", "dai hoc"}
+
+
+def test_fold_diacritics_preserves_length():
+    text = "Trường Đại học Bách khoa, kỹ sư phần mềm"
+
+    folded = fold_diacritics(text)
+
+    assert folded == "Truong Dai hoc Bach khoa, ky su phan mem"
+    assert len(folded) == len(text)
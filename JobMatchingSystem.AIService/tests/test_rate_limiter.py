@@ -0,0 +1,105 @@
+import asyncio
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from config.config import Config
+from utils import rate_limiter
+from utils.rate_limiter import ModelRateLimiter, RateLimitExceeded, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(Config, "GEMINI_MODEL_RATE_LIMITS", {
+        "gemini-test": {"rpm": 2, "tpm": 1000, "max_in_flight": 1}
+    })
+
+
+def test_bucket_reserves_into_debt_and_refills(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+
+    assert bucket.reserve(10, max_wait=0) == 0
+    assert bucket.reserve(5, max_wait=10) == 5
+    assert bucket.available == -5
+
+    clock.now += 15
+    assert bucket.available == 10  # capped at capacity
+
+
+def test_bucket_refuses_reservations_beyond_max_wait(clock):
+    bucket = TokenBucket(capacity=1, refill_per_second=0.5)
+    bucket.reserve(1, max_wait=0)
+
+    assert bucket.reserve(1, max_wait=1) is None
+    assert bucket.wait_time(1) == 2
+    assert TokenBucket(capacity=0, refill_per_second=0).wait_time(1) == math.inf
+
+
+def test_retry_after_header_rounds_up_to_whole_seconds():
+    assert RateLimitExceeded("limit", 0.2).retry_after_header == "1"
+    assert RateLimitExceeded("limit", 2.1).retry_after_header == "3"
+
+
+def test_rpm_limit_rejects_without_spending_tokens(clock, limits):
+    limiter = ModelRateLimiter()
+    limiter.try_acquire("gemini-test", 100)
+    limiter.try_acquire("gemini-test", 100)
+
+    with pytest.raises(RateLimitExceeded, match="RPM"):
+        limiter.try_acquire("gemini-test", 100)
+
+    status = limiter.get_status_info()["gemini-test"]
+    assert status["tokens_available"] == 800
+    assert status["rejected"] == 1
+
+
+def test_tpm_limit_refunds_the_request_slot(clock, limits):
+    limiter = ModelRateLimiter()
+
+    with pytest.raises(RateLimitExceeded, match="TPM") as error:
+        limiter.try_acquire("gemini-test", 1500)
+
+    assert error.value.retry_after == pytest.approx(30)
+    assert limiter.get_status_info()["gemini-test"]["requests_available"] == 2
+
+
+def test_record_usage_corrects_the_token_estimate(clock, limits):
+    limiter = ModelRateLimiter()
+    limiter.try_acquire("gemini-test", 600)
+
+    limiter.record_usage("gemini-test", estimated_tokens=600, actual_tokens=200)
+
+    assert limiter.get_status_info()["gemini-test"]["tokens_available"] == 800
+
+
+def test_in_flight_cap_rejects_after_max_wait(limits):
+    limiter = ModelRateLimiter()
+
+    async def scenario():
+        async with limiter.acquire("gemini-test", 10, max_wait=1):
+            assert limiter.get_status_info()["gemini-test"]["in_flight"] == 1
+            with pytest.raises(RateLimitExceeded, match="in-flight"):
+                async with limiter.acquire("gemini-test", 10, max_wait=0.01):
+                    pass
+        # The slot is free again once the first call is done
+        async with limiter.acquire("gemini-test", 10, max_wait=0.01):
+            pass
+
+    asyncio.run(scenario())
+    assert limiter.get_status_info()["gemini-test"]["in_flight"] == 0
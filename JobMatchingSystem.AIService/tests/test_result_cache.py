@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+from utils import result_cache
+from utils.result_cache import ResultCache
+
+
+def make_cache(tmp_path=None, **kwargs) -> ResultCache:
+    options = {"ttl_seconds": 3600, "memory_max_entries": 10, "db_max_entries": 1000}
+    options.update(kwargs)
+    db_path = str(tmp_path / "cache.sqlite3") if tmp_path else ""
+    return ResultCache(namespace="test", version="v1", db_path=db_path, **options)
+
+
+def test_database_is_not_created_until_opened(tmp_path):
+    cache = make_cache(tmp_path)
+
+    assert not (tmp_path / "cache.sqlite3").exists()
+    assert cache.get_stats()["disk_entries"] is None
+
+    cache.open()
+    assert (tmp_path / "cache.sqlite3").exists()
+
+
+def test_disk_hits_survive_a_restart(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        cache.open()
+        cache.set("key", {"is_cv": True})
+        await cache.close()
+
+        restarted = make_cache(tmp_path)
+        restarted.open()
+        value = await restarted.get("key")
+        await restarted.close()
+        return value, restarted.get_stats()
+
+    value, stats = asyncio.run(scenario())
+
+    assert value == {"is_cv": True}
+    assert stats["hits"] == 1
+    assert stats["memory_entries"] == 1
+
+
+def test_version_change_invalidates_disk_entries(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.open()
+    cache.set("key", {"is_cv": True})
+
+    changed = ResultCache(namespace="test", version="v2", db_path=str(tmp_path / "cache.sqlite3"))
+    changed.open()
+
+    assert asyncio.run(changed.get("key")) is None
+    assert changed.get_stats()["disk_entries"] == 0
+
+
+def test_disk_queries_run_off_the_event_loop(tmp_path):
+    cache = make_cache(tmp_path, memory_max_entries=0)
+    cache.open()
+    threads = []
+    disk_get, disk_set = cache._disk_get, cache._disk_set
+
+    def record(func):
+        def wrapper(*args):
+            threads.append(threading.current_thread())
+            return func(*args)
+        return wrapper
+
+    cache._disk_get, cache._disk_set = record(disk_get), record(disk_set)
+
+    async def scenario():
+        cache.set("key", {"n": 1})
+        await cache.flush()
+        return await cache.get("key")
+
+    assert asyncio.run(scenario()) == {"n": 1}
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_disk_size_is_checked_every_n_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "EVICT_EVERY_WRITES", 5)
+    cache = make_cache(tmp_path, memory_max_entries=0, db_max_entries=3)
+    cache.open()
+    evictions = []
+    evict_disk = cache._evict_disk
+
+    def counting_evict():
+        evictions.append(1)
+        evict_disk()
+
+    cache._evict_disk = counting_evict
+    for n in range(10):
+        cache.set(f"key-{n}", {"n": n})
+
+    assert len(evictions) == 2
+    assert cache.get_stats()["disk_entries"] == 3
+    # Least recently written keys went first
+    assert asyncio.run(cache.get("key-0")) is None
+    assert asyncio.run(cache.get("key-9")) == {"n": 9}
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+class Work:
+    """Factory that counts its runs and finishes when released"""
+
+    def __init__(self, result="done", error: Exception = None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_identical_calls_share_one_run():
+    async def scenario():
+        flights = SingleFlight("test", enabled=True)
+        work = Work()
+        callers = [asyncio.ensure_future(flights.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        work.release.set()
+        return await asyncio.gather(*callers), work, flights
+
+    results, work, flights = asyncio.run(scenario())
+
+    assert results == ["done"] * 3
+    assert work.calls == 1
+    assert flights.get_status_info() == {"enabled": True, "in_flight": 0, "leaders": 1, "followers": 2}
+
+
+def test_followers_get_the_leaders_exception():
+    async def scenario():
+        flights = SingleFlight("test", enabled=True)
+        work = Work(error=ValueError("bad model output"))
+        callers = [asyncio.ensure_future(flights.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        work.release.set()
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_run():
+    async def scenario():
+        flights = SingleFlight("test", enabled=True)
+        work = Work()
+        leader = asyncio.ensure_future(flights.do("key", work))
+        follower = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        work.release.set()
+        return await follower, work
+
+    result, work = asyncio.run(scenario())
+
+    assert result == "done"
+    assert not work.cancelled
+
+
+def test_run_is_cancelled_once_every_caller_is_gone():
+    async def scenario():
+        flights = SingleFlight("test", enabled=True)
+        work = Work()
+        caller = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        in_flight = flights.get_status_info()["in_flight"]
+
+        # A later call starts a fresh run rather than joining the cancelled one
+        retry = Work()
+        retry.release.set()
+        return work, in_flight, await flights.do("key", retry)
+
+    work, in_flight, result = asyncio.run(scenario())
+
+    assert work.cancelled
+    assert in_flight == 0
+    assert result == "done"
+
+
+def test_disabled_runs_every_call():
+    async def scenario():
+        flights = SingleFlight("test", enabled=False)
+        work = Work()
+        work.release.set()
+        await asyncio.gather(flights.do("key", work), flights.do("key", work))
+        return work
+
+    assert asyncio.run(scenario()).calls == 2
@@ -0,0 +1,89 @@
+from utils.skill_index import SkillIndex
+
+
+def make_index(tmp_path=None, **kwargs) -> SkillIndex:
+    options = {"max_keyword_df": 0.5, "rebuild_threshold": 1000}
+    options.update(kwargs)
+    return SkillIndex(snapshot_path=str(tmp_path / "skill_index.npz") if tmp_path else "", **options)
+
+
+JOBS = [
+    ("job-py", "Backend developer building payment services", ["Python", "PostgreSQL"]),
+    ("job-js", "Frontend developer for the customer portal", ["ReactJS", "TypeScript"]),
+    ("job-java", "Java engineer, Spring Boot microservices and kafka", None),
+]
+
+
+def test_query_ranks_by_shared_skills():
+    index = make_index()
+    index.upsert_many("job", JOBS)
+
+    found = index.query("job", "Python and PostgreSQL developer, some React")
+
+    assert [doc_id for doc_id, _, _ in found][:2] == ["job-py", "job-js"]
+    assert found[0][1] == 2
+
+
+def test_query_sees_changes_before_and_after_compaction():
+    index = make_index(rebuild_threshold=1)
+    index.upsert_many("job", JOBS)  # compacted
+    index.upsert("job", "job-go", "Go developer", ["Golang"])
+    index.delete("job", "job-py")
+
+    assert [doc_id for doc_id, _, _ in index.query("job", skills=["golang", "python"])] == ["job-go"]
+    assert sorted(index.ids("job")) == ["job-go", "job-java", "job-js"]
+
+
+
+def test_delete_only_masks_until_background_compaction():
+    index = make_index(rebuild_threshold=1)
+    index.upsert_many("job", JOBS)  # compacted
+    index.delete("job", "job-py")
+    index.delete("job", "job-js")
+
+    assert index.get_status_info()["pending_changes"]["job"] == 2
+    assert index.query("job", skills=["python", "reactjs"]) == []
+
+    assert index.compact_pending() == 1
+    assert index.get_status_info()["pending_changes"]["job"] == 0
+    assert index.query("job", skills=["python", "reactjs"]) == []
+    assert index.ids("job") == ["job-java"]
+
+def test_kinds_are_separate():
+    index = make_index()
+    index.upsert_many("job", JOBS)
+    index.upsert("cv", "cv-1", "Python developer", ["FastAPI"])
+
+    assert index.count("cv") == 1 and index.count("job") == 3
+    assert [doc_id for doc_id, _, _ in index.query("cv", skills=["python"])] == ["cv-1"]
+
+
+def test_snapshot_round_trip(tmp_path):
+    index = make_index(tmp_path, rebuild_threshold=2)
+    index.upsert_many("job", JOBS)
+    index.upsert("cv", "cv-1", "Python developer", ["FastAPI"])
+    index.delete("job", "job-js")
+    queries = [("job", "python spring kafka"), ("cv", "fastapi"), ("job", "portal frontend")]
+
+    assert index.snapshot()
+    assert index.unsaved_changes == 0
+    restored = make_index(tmp_path)
+    assert restored.restore()
+
+    for kind, text in queries:
+        assert restored.query(kind, text) == index.query(kind, text)
+    assert sorted(restored.ids("job")) == sorted(index.ids("job"))
+    assert restored.count("cv") == 1
+
+
+def test_snapshot_from_other_tokenizer_is_ignored(tmp_path, monkeypatch):
+    index = make_index(tmp_path)
+    index.upsert_many("job", JOBS)
+    index.snapshot()
+
+    monkeypatch.setattr(SkillIndex, "fingerprint", staticmethod(lambda: "other"))
+    restored = make_index(tmp_path)
+
+    assert not restored.restore()
+    assert restored.count("job") == 0
+
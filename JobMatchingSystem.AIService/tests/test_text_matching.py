@@ -0,0 +1,48 @@
+import pytest
+from utils.text_matching import tokenize, extract_skills, bm25_coverage, skill_overlap
+
+
+@pytest.mark.parametrize("text", [
+    "I excel at communication with stakeholders",
+    "Please express interest by email",
+    "Shared the work with the rest of the team",
+    "Joined in spring 2021 as a node in the on-call rota",
+    "A swift response to incidents",
+])
+def test_common_words_are_not_skills(text):
+    assert extract_skills(text) - {"Communication"} == set()
+
+
+@pytest.mark.parametrize("text, skill", [
+    ("Backend with Express.js and Node.js", "Express"),
+    ("Backend with ExpressJS", "Express"),
+    ("Node.js, MongoDB", "Node.js"),
+    ("Java 17, Spring Boot, Kafka", "Spring"),
+    ("Spring Framework 5", "Spring"),
+    ("Designed RESTful services", "REST API"),
+    ("Built a REST API for payments", "REST API"),
+    ("Reporting in Microsoft Excel and Power BI", "Excel"),
+    ("iOS app in SwiftUI", "Swift"),
+])
+def test_tech_forms_are_skills(text, skill):
+    assert skill in extract_skills(text)
+
+
+def test_aliases_match_on_token_boundaries():
+    assert extract_skills("C#, C++ and ASP.NET Core") == {"C#", "C++", ".NET"}
+    assert extract_skills("JavaScript, TypeScript") == {"JavaScript", "TypeScript"}
+
+
+def test_tokenize_keeps_tech_tokens_and_drops_stopwords():
+    assert tokenize("The C# and Node.js developer, CI/CD in 2024") == ["c#", "node.js", "developer", "ci/cd"]
+
+
+def test_bm25_coverage_bounds():
+    assert bm25_coverage([], ["python"]) == 0.0
+    assert bm25_coverage(["python", "python", "django"], ["python"]) == 1.0
+    assert 0.0 < bm25_coverage(["python", "django"], ["python", "kafka"]) < 1.0
+
+
+def test_skill_overlap():
+    assert skill_overlap({"Python", "SQL"}, {"Python", "Docker"}) == (["Python"], ["Docker"], 0.5)
+    assert skill_overlap({"Python"}, set()) == ([], [], 0.0)
@@ -0,0 +1,73 @@
+import pytest
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from ai_service import UploadSizeLimitMiddleware
+from config.config import Config
+
+
+LIMIT = Config.PDF_MAX_SIZE_MB * 1024 * 1024 + UploadSizeLimitMiddleware.OVERHEAD_BYTES
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware)
+
+    @app.post("/raw")
+    async def raw(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+def chunked(size: int, chunk_size: int = 256 * 1024):
+    """Body generator, sent with Transfer-Encoding: chunked (no Content-Length)"""
+    def body():
+        remaining = size
+        while remaining > 0:
+            yield b"x" * min(chunk_size, remaining)
+            remaining -= chunk_size
+    return body()
+
+
+def test_declared_oversized_body_is_rejected(client):
+    response = client.post("/raw", content=b"x" * (LIMIT + 1))
+
+    assert response.status_code == 413
+
+
+def test_chunked_body_under_the_limit_passes(client):
+    response = client.post("/raw", content=chunked(1024))
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 1024}
+
+
+def test_chunked_body_over_the_limit_is_rejected(client):
+    response = client.post("/raw", content=chunked(LIMIT + 1))
+
+    assert response.status_code == 413
+
+
+def test_chunked_multipart_upload_over_the_limit_is_rejected(client):
+    boundary = "limit-test"
+    head = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"cv.pdf\"\r\n"
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+
+    def body():
+        yield head
+        yield from chunked(LIMIT)
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/upload", content=body(), headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+
+    assert response.status_code == 413
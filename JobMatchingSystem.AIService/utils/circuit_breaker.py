@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState:
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Per-model circuit breaker: closed -> open -> half-open probe -> closed"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = None,
+        min_calls: int = None,
+        window_size: int = None,
+        cooldown_seconds: float = None,
+        max_cooldown_seconds: float = None,
+        probe_timeout_seconds: float = None
+    ):
+        self.name = name
+        self.failure_rate_threshold = Config.CIRCUIT_FAILURE_RATE_THRESHOLD if failure_rate_threshold is None else failure_rate_threshold
+        self.min_calls = Config.CIRCUIT_MIN_CALLS if min_calls is None else min_calls
+        self.cooldown_seconds = Config.CIRCUIT_COOLDOWN_SECONDS if cooldown_seconds is None else cooldown_seconds
+        self.max_cooldown_seconds = Config.CIRCUIT_MAX_COOLDOWN_SECONDS if max_cooldown_seconds is None else max_cooldown_seconds
+        self.probe_timeout_seconds = (
+            Config.GEMINI_CONNECT_TIMEOUT + Config.GEMINI_READ_TIMEOUT
+            if probe_timeout_seconds is None else probe_timeout_seconds
+        )
+
+        self.state = CircuitState.CLOSED
+        self._outcomes = deque(maxlen=Config.CIRCUIT_WINDOW_SIZE if window_size is None else window_size)
+        self._opened_at = 0.0
+        self._current_cooldown = self.cooldown_seconds
+        self._probe_started_at: Optional[float] = None
+        self._consecutive_opens = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _cooldown_elapsed(self, now: float) -> bool:
+        return now >= self._opened_at + self._current_cooldown
+
+    def is_available(self) -> bool:
+        """Whether the model is (or will be on next call) in rotation, without claiming a probe"""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                return self._cooldown_elapsed(time.monotonic())
+            return True
+
+    def allow_request(self) -> bool:
+        """Decide whether a call may go to this model; claims the probe slot when half-open"""
+        with self._lock:
+            now = time.monotonic()
+
+            if self.state == CircuitState.CLOSED:
+                return True
+
+            if self.state == CircuitState.OPEN:
+                if not self._cooldown_elapsed(now):
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self._probe_started_at = None
+
+            # Half-open: exactly one probe at a time (a stuck probe expires)
+            if self._probe_started_at is None or now - self._probe_started_at > self.probe_timeout_seconds:
+                self._probe_started_at = now
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """Give back a claimed probe slot when the call never reached the model"""
+        with self._lock:
+            self._probe_started_at = None
+
+    def record_success(self) -> None:
+        """A call succeeded; a successful probe closes the circuit"""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                logger.info("Circuit for %s closed after successful probe", self.name, extra={"model": self.name})
+                self._reset()
+            self._outcomes.append(True)
+
+    def record_failure(self, error: str = None, trip: bool = False, cooldown_seconds: float = None) -> None:
+        """A call failed; `trip` opens immediately (quota/404), otherwise use the failure rate"""
+        with self._lock:
+            self.last_error = error
+            self._outcomes.append(False)
+
+            if self.state == CircuitState.HALF_OPEN:
+                self._open(cooldown_seconds)
+                return
+
+            if trip:
+                self._open(cooldown_seconds)
+                return
+
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate_threshold:
+                self._open(cooldown_seconds)
+
+    def _open(self, cooldown_seconds: Optional[float]) -> None:
+        """Open the circuit with exponential backoff on repeated trips (caller holds the lock)"""
+        self._consecutive_opens += 1
+        if cooldown_seconds is None:
+            cooldown_seconds = self.cooldown_seconds * (2 ** (self._consecutive_opens - 1))
+        self._current_cooldown = min(cooldown_seconds, self.max_cooldown_seconds)
+        self._opened_at = time.monotonic()
+        self._probe_started_at = None
+        self.state = CircuitState.OPEN
+        logger.warning("Circuit for %s opened for %gs", self.name, self._current_cooldown, extra={"model": self.name})
+
+    def _reset(self) -> None:
+        self.state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._consecutive_opens = 0
+        self._current_cooldown = self.cooldown_seconds
+        self._probe_started_at = None
+        self.last_error = None
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """Get breaker state for status endpoints"""
+        with self._lock:
+            now = time.monotonic()
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "failure_rate": round(self._outcomes.count(False) / calls, 2) if calls else 0.0,
+                "recent_calls": calls,
+                "retry_in_seconds": (
+                    round(max(0.0, self._opened_at + self._current_cooldown - now), 1)
+                    if self.state == CircuitState.OPEN else 0.0
+                ),
+                "consecutive_opens": self._consecutive_opens,
+                "last_error": self.last_error[:200] if self.last_error else None
+            }
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Set, Tuple
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedPrefix:
+    """A Gemini cached content for one (model, system instruction), or a remembered refusal"""
+    name: Optional[str]  # None = the model refused to cache it; retry after expires_at
+    expires_at: float
+
+
+class ContextCacheManager:
+    """Gemini cached contents for static system instructions, created per model in the background.
+
+    Requests never wait for a cache: until one exists (or when the model does not
+    support caching, e.g. the instruction is below its minimum cacheable size) the
+    instruction is sent inline as system_instruction, which still lets Gemini's
+    implicit prefix caching apply.
+    """
+
+    # Stop handing out a cache this long before it expires
+    REFRESH_MARGIN_SECONDS = 60
+
+    def __init__(self, client, ttl_seconds: float = None, enabled: bool = None):
+        self.client = client
+        self.ttl_seconds = Config.GEMINI_CONTEXT_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.enabled = Config.GEMINI_CONTEXT_CACHE_ENABLED if enabled is None else enabled
+        self._entries: Dict[Tuple[str, str], _CachedPrefix] = {}
+        self._creating: Set[Tuple[str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.created = 0
+        self.refused = 0
+
+    @staticmethod
+    def _key(model: str, system_instruction: str) -> Tuple[str, str]:
+        return model, hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()[:16]
+
+    def lookup(self, model: str, system_instruction: str) -> Optional[str]:
+        """Name of a live cached content for this instruction, starting its creation if needed"""
+        if not self.enabled:
+            return None
+        key = self._key(model, system_instruction)
+        entry = self._entries.get(key)
+        now = time.time()
+
+        if entry is not None and entry.name is None and entry.expires_at > now:
+            return None
+        if entry is None or entry.expires_at - self.REFRESH_MARGIN_SECONDS <= now:
+            if key not in self._creating:
+                self._creating.add(key)
+                task = asyncio.ensure_future(self._create(key, model, system_instruction))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        if entry is not None and entry.name is not None and entry.expires_at > now:
+            return entry.name
+        return None
+
+    async def _create(self, key: Tuple[str, str], model: str, system_instruction: str) -> None:
+        try:
+            cached = await asyncio.wait_for(
+                self.client.aio.caches.create(
+                    model=model,
+                    config=genai_types.CreateCachedContentConfig(
+                        system_instruction=system_instruction,
+                        ttl=f"{int(self.ttl_seconds)}s",
+                        display_name="job-matching-ai-prompt-prefix"
+                    )
+                ),
+                timeout=Config.GEMINI_CONNECT_TIMEOUT + Config.GEMINI_READ_TIMEOUT
+            )
+            self._entries[key] = _CachedPrefix(cached.name, time.time() + self.ttl_seconds)
+            self.created += 1
+            logger.info("Context cache created for %s: %s", model, cached.name, extra={"model": model})
+        except Exception as e:
+            # Unsupported model or prefix below the minimum cacheable size: stay inline for a TTL;
+            # network errors and timeouts are retried sooner
+            retry_after = self.ttl_seconds if isinstance(e, genai_errors.ClientError) else self.REFRESH_MARGIN_SECONDS
+            self._entries[key] = _CachedPrefix(None, time.time() + retry_after)
+            self.refused += 1
+            logger.warning("Context caching unavailable for %s, sending instruction inline: %s", model, str(e)[:100],
+                           extra={"model": model})
+        finally:
+            self._creating.discard(key)
+
+    def invalidate(self, model: str, system_instruction: str) -> None:
+        """Forget a cache the API rejected (expired or deleted) so the next lookup recreates it"""
+        self._entries.pop(self._key(model, system_instruction), None)
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """Live caches per model for status endpoints"""
+        now = time.time()
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "created": self.created,
+            "refused": self.refused,
+            "models": {
+                model: ("cached" if entry.name else "inline")
+                for (model, _), entry in self._entries.items() if entry.expires_at > now
+            }
+        }
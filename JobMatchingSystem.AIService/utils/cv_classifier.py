@@ -0,0 +1,253 @@
+import random
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from config.config import Config
+from utils.metrics import FAST_PATH_DECISIONS
+
+
+# Keyword groups for the heuristic (matched as substrings of the lower-cased text)
+NAME_KEYWORDS = ["tên", "name", "nguyễn", "trần", "lê", "phạm", "hoàng", "văn", "thị"]
+CONTACT_KEYWORDS = ["email", "phone", "điện thoại", "@", "gmail", "yahoo", "hotmail"]
+PROFESSIONAL_KEYWORDS = [
+    # 1. Experience - real work experience
+    ["kinh nghiệm", "experience", "làm việc", "intern", "developer", "engineer", "tại công ty", "năm developer", "năm làm"],
+    # 2. Skills - technical skills
+    ["kỹ năng", "skills", "java", "python", "javascript", "react", "html", "css", "spring", "node.js", "sql"],
+    # 3. Projects - actual projects
+    ["dự án", "project", "phát triển", "xây dựng", "website", "app", "hệ thống"],
+    # 4. Education - formal education (not just "trường" alone)
+    ["học vấn", "education", "đại học", "university", "cử nhân", "thạc sĩ", "bằng cấp", "tốt nghiệp đại học"],
+    # 5. Achievements/Certificates
+    ["chứng chỉ", "certificate", "giải thưởng", "thành tích", "certify", "certified"],
+]
+NON_CV_KEYWORDS = ["invoice", "hóa đơn", "contract", "hợp đồng", "report", "báo cáo"]
+# Stronger signals of invoices/contracts/reports used only by the fast path
+NON_CV_STRONG_KEYWORDS = NON_CV_KEYWORDS + [
+    "bên a", "bên b", "điều khoản", "đơn giá", "thành tiền", "tổng tiền", "thuế gtgt",
+    "mã số thuế", "biên bản", "quyết định", "total amount", "unit price", "terms and conditions"
+]
+
+# Section headings (a short line, or the label before ":") typical of CVs, grouped by section
+CV_SECTION_HEADINGS = [
+    ["kinh nghiệm", "kinh nghiệm làm việc", "experience", "work experience", "professional experience", "employment history"],
+    ["kỹ năng", "skills", "technical skills", "kỹ năng chuyên môn"],
+    ["dự án", "projects", "dự án tham gia", "personal projects"],
+    ["học vấn", "education", "trình độ học vấn", "academic background"],
+    ["chứng chỉ", "certificates", "certifications", "giải thưởng", "awards"],
+    ["mục tiêu nghề nghiệp", "career objective", "objective", "summary", "profile"],
+    ["thông tin cá nhân", "personal information", "personal details", "contact", "thông tin liên hệ"],
+]
+# Section headings of job descriptions, API/technical docs and other non-CV documents
+OTHER_SECTION_HEADINGS = [
+    "job description", "mô tả công việc", "responsibilities", "trách nhiệm", "requirements", "yêu cầu",
+    "yêu cầu công việc", "benefits", "quyền lợi", "phúc lợi", "how to apply", "cách ứng tuyển", "we offer",
+    "endpoints", "parameters", "request", "response", "request body", "response body", "authentication",
+    "example", "examples", "errors", "api reference", "usage", "installation", "overview",
+]
+_CV_HEADING_GROUP = {heading: group for group, headings in enumerate(CV_SECTION_HEADINGS) for heading in headings}
+_OTHER_HEADINGS = frozenset(OTHER_SECTION_HEADINGS)
+_HEADING_LABEL_MAX_LENGTH = 40
+_HEADING_STRIP = re.compile(r"^[\s\d.)\-•*#|]+|[\s:.|]+$")
+_EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_PATTERN = re.compile(r"(?:\+84|\b0)[\s.]?\d(?:[\s.-]?\d){8,9}\b")
+_DATE_RANGE_PATTERN = re.compile(
+    r"\b(?:\d{1,2}[/.-])?(?:19|20)\d{2}\s*(?:-|–|—|to|đến)\s*"
+    r"(?:(?:\d{1,2}[/.-])?(?:19|20)\d{2}\b|present|now|current|hiện tại|nay)"
+)
+# Structural evidence required before the fast path may answer YES without Gemini
+MIN_CV_SECTIONS = 3
+MIN_CV_HEADING_RATIO = 0.8
+
+
+def _heading_label(line: str) -> str:
+    """Lower-cased heading candidate of a line: the label before ':' or the whole short line"""
+    label = line.split(":", 1)[0] if ":" in line else line
+    label = _HEADING_STRIP.sub("", label.strip().lower())
+    return label if len(label) <= _HEADING_LABEL_MAX_LENGTH else ""
+
+
+@dataclass
+class CVFeatures:
+    """Keyword signals found in a document"""
+    has_name: bool
+    has_contact: bool
+    professional_count: int
+    non_cv_hits: int
+    cv_sections: int = 0  # Distinct CV section groups found as headings
+    other_headings: int = 0  # Headings typical of job descriptions, API docs, ...
+    has_contact_pattern: bool = False  # An actual e-mail address or phone number
+    has_date_range: bool = False  # e.g. "2019 - 2022", "03/2020 - nay"
+
+    @classmethod
+    def extract(cls, text: str) -> "CVFeatures":
+        content_lower = text.lower()
+        cv_groups = set()
+        other_headings = 0
+        for line in content_lower.splitlines():
+            label = _heading_label(line)
+            if not label:
+                continue
+            if label in _CV_HEADING_GROUP:
+                cv_groups.add(_CV_HEADING_GROUP[label])
+            elif label in _OTHER_HEADINGS:
+                other_headings += 1
+        return cls(
+            has_name=any(word in content_lower for word in NAME_KEYWORDS),
+            has_contact=any(word in content_lower for word in CONTACT_KEYWORDS),
+            professional_count=sum(
+                1 for group in PROFESSIONAL_KEYWORDS if any(word in content_lower for word in group)
+            ),
+            non_cv_hits=sum(1 for word in NON_CV_STRONG_KEYWORDS if word in content_lower),
+            cv_sections=len(cv_groups),
+            other_headings=other_headings,
+            has_contact_pattern=bool(_EMAIL_PATTERN.search(content_lower) or _PHONE_PATTERN.search(content_lower)),
+            has_date_range=bool(_DATE_RANGE_PATTERN.search(content_lower))
+        )
+
+    def verdict(self, content_lower: str) -> str:
+        """YES/NO answer in the same format the validation prompt asks Gemini for"""
+        if self.has_name and self.has_contact and self.professional_count >= 3:
+            elements = []
+            if self.has_name: elements.append("họ tên")
+            if self.has_contact: elements.append("thông tin liên lạc")
+            elements.append(f"{self.professional_count}/5 yếu tố chuyên môn")
+            return f"YES - CV hợp lệ. Có {' + '.join(elements)}"
+        elif self.has_name and self.has_contact and self.professional_count >= 1:
+            return f"NO - Thiếu yếu tố chuyên môn (chỉ có {self.professional_count}/3 yêu cầu)"
+        elif (self.has_name or self.has_contact) and self.professional_count >= 2:
+            missing = "thông tin liên lạc" if not self.has_contact else "họ tên"
+            return f"NO - Thiếu {missing}"
+        elif any(indicator in content_lower for indicator in NON_CV_KEYWORDS):
+            return "NO - Đây không phải CV vì là tài liệu khác"
+        else:
+            return "NO - Thiếu các yếu tố cơ bản của CV (họ tên, thông tin liên lạc, ít nhất 3 yếu tố chuyên môn)"
+
+    @property
+    def cv_score(self) -> float:
+        """Heuristic probability (0-1) that the document is a CV"""
+        if self.non_cv_hits >= 2 and self.professional_count <= 1:
+            return 0.05
+        if self.has_name and self.has_contact:
+            score = 0.5 + 0.1 * self.professional_count - 0.1 * self.non_cv_hits
+        else:
+            score = 0.1 * self.professional_count + (0.1 if self.has_name or self.has_contact else 0.0)
+            score = min(score, 0.5)
+        return round(max(0.0, min(1.0, score)), 2)
+
+    @property
+    def is_structured_cv(self) -> bool:
+        """CV layout rather than CV vocabulary: section headings, a real contact and a date range.
+
+        Keywords alone also fire on job descriptions and technical docs (a name
+        field, an e-mail, "developer", "python"), so only this may skip Gemini for YES.
+        """
+        headings = self.cv_sections + self.other_headings
+        return (
+            self.cv_sections >= MIN_CV_SECTIONS
+            and headings > 0 and self.cv_sections / headings >= MIN_CV_HEADING_RATIO
+            and self.has_contact_pattern
+            and self.has_date_range
+            and self.non_cv_hits == 0
+        )
+
+
+@dataclass
+class PreClassification:
+    """Fast-path decision for one document"""
+    is_cv: bool
+    confidence: float
+    reason: str
+    score: float
+    decided: bool  # Outside the ambiguous band, so Gemini is not needed
+
+    @property
+    def bucket(self) -> str:
+        if not self.decided:
+            return "ambiguous"
+        return "yes" if self.is_cv else "no"
+
+
+class CVPreClassifier:
+    """Keyword heuristic in front of Gemini: answers obvious CVs / non-CVs locally.
+
+    Scores at or below FAST_PATH_NO_THRESHOLD are answered NO. Scores at or
+    above FAST_PATH_YES_THRESHOLD are answered YES only when the document is
+    also laid out like a CV (CVFeatures.is_structured_cv); everything else goes
+    to the model. A FAST_PATH_SHADOW_RATE sample of local decisions is still sent
+    to Gemini to measure how often both agree.
+    """
+
+    def __init__(self, yes_threshold: float = None, no_threshold: float = None, shadow_rate: float = None):
+        self.yes_threshold = Config.FAST_PATH_YES_THRESHOLD if yes_threshold is None else yes_threshold
+        self.no_threshold = Config.FAST_PATH_NO_THRESHOLD if no_threshold is None else no_threshold
+        self.shadow_rate = Config.FAST_PATH_SHADOW_RATE if shadow_rate is None else shadow_rate
+        self._decisions = {"yes": 0, "no": 0, "ambiguous": 0}
+        self._agreement = {bucket: {"checked": 0, "agreed": 0} for bucket in self._decisions}
+        self._lock = threading.Lock()
+
+    def classify(self, text: str) -> PreClassification:
+        """Score a document and decide whether it can skip the model"""
+        features = CVFeatures.extract(text)
+        score = features.cv_score
+        is_cv = score >= 0.5
+        decided = (score >= self.yes_threshold and features.is_structured_cv) or score <= self.no_threshold
+        result = PreClassification(
+            is_cv=is_cv,
+            confidence=score if is_cv else round(1.0 - score, 2),
+            reason=features.verdict(text.lower()),
+            score=score,
+            decided=decided
+        )
+        with self._lock:
+            self._decisions[result.bucket] += 1
+        return result
+
+    def should_answer_locally(self, result: PreClassification) -> bool:
+        """Decided documents skip Gemini, except for the shadow-checked sample"""
+        if not result.decided:
+            FAST_PATH_DECISIONS.inc("model")
+            return False
+        if random.random() < self.shadow_rate:
+            FAST_PATH_DECISIONS.inc("shadow")
+            return False
+        FAST_PATH_DECISIONS.inc("local")
+        return True
+
+    def record_model_verdict(self, result: PreClassification, model_is_cv: bool) -> None:
+        """Compare the fast-path answer with the model's verdict for the same document"""
+        with self._lock:
+            stats = self._agreement[result.bucket]
+            stats["checked"] += 1
+            if result.is_cv == model_is_cv:
+                stats["agreed"] += 1
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """Decision counts and agreement with the model per bucket"""
+        with self._lock:
+            agreement = {
+                bucket: {
+                    **stats,
+                    "agreement_rate": round(stats["agreed"] / stats["checked"], 3) if stats["checked"] else None
+                }
+                for bucket, stats in self._agreement.items()
+            }
+            return {
+                "yes_threshold": self.yes_threshold,
+                "no_threshold": self.no_threshold,
+                "shadow_rate": self.shadow_rate,
+                "decisions": dict(self._decisions),
+                "agreement": agreement
+            }
+
+
+_cv_pre_classifier: Optional[CVPreClassifier] = None
+
+
+def get_cv_pre_classifier() -> CVPreClassifier:
+    """Get singleton pre-classifier instance"""
+    global _cv_pre_classifier
+    if _cv_pre_classifier is None:
+        _cv_pre_classifier = CVPreClassifier()
+    return _cv_pre_classifier
@@ -1,10 +1,39 @@
-import tempfile
-import os
-from typing import Optional, Tuple
+import io
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, List, Dict, Iterator
 from docx import Document
 import PyPDF2
 from config.config import Config
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ParsedDocument:
+    """Result of parsing an uploaded document once, shared across a request"""
+    filename: str
+    file_type: Optional[str]
+    file_size_bytes: int
+    text: str = ""
+    num_pages: Optional[int] = None
+    num_paragraphs: Optional[int] = None
+    num_tables: Optional[int] = None
+    tables: List[List[List[str]]] = field(default_factory=list)
+    metadata: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    # Lazy extraction: pages (PDF) or paragraphs + table rows (DOCX) read vs. present
+    units_read: int = 0
+    total_units: int = 0
+    truncated: bool = False
+    
+    @property
+    def estimated_text_length(self) -> int:
+        """Full text length, extrapolated from the units read when extraction stopped early"""
+        if not self.truncated or self.units_read == 0:
+            return len(self.text)
+        return round(len(self.text) * self.total_units / self.units_read)
+
 
 class DocumentProcessor:
     """Utility class for processing multiple document types (PDF, DOCX)"""
@@ -14,7 +43,13 @@ class DocumentProcessor:
         'document': ['docx', 'doc']
     }
     
-    MAX_FILE_SIZE_MB = 10  # 10MB limit
+    # Leading bytes of each supported container format
+    MAGIC_BYTES = {
+        'pdf': [b'%PDF-'],
+        'document': [b'PK\x03\x04', b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1']  # DOCX (zip), legacy DOC (OLE)
+    }
+    
+    MAX_FILE_SIZE_MB = Config.PDF_MAX_SIZE_MB
     
     @classmethod
     def get_file_type(cls, filename: str) -> Optional[str]:
@@ -35,6 +70,21 @@ class DocumentProcessor:
         """Check if file type is supported"""
         return cls.get_file_type(filename) is not None
     
+    @classmethod
+    def sniff_file_type(cls, head: bytes) -> Optional[str]:
+        """Determine file type from the first bytes of the content"""
+        for file_type, signatures in cls.MAGIC_BYTES.items():
+            if any(head.startswith(signature) for signature in signatures):
+                return file_type
+        return None
+    
+    @classmethod
+    def check_magic_bytes(cls, head: bytes, filename: str) -> Optional[str]:
+        """Error message if the content does not match the file extension, else None"""
+        if cls.sniff_file_type(head) != cls.get_file_type(filename):
+            return "File content does not match its extension (expected a real PDF or DOCX file)"
+        return None
+    
     @classmethod
     def validate_file(cls, file_content: bytes, filename: str) -> Tuple[bool, Optional[str]]:
         """Validate file size, type, and basic content"""
@@ -52,159 +102,154 @@ class DocumentProcessor:
         if len(file_content) == 0:
             return False, "File is empty"
         
+        # Check the content really is the claimed format
+        magic_error = cls.check_magic_bytes(file_content[:16], filename)
+        if magic_error:
+            return False, magic_error
+        
         return True, None
     
     @classmethod
-    def extract_text_from_file(cls, file_content: bytes, filename: str) -> str:
-        """Extract text from various file types"""
+    def parse_document(cls, file_content: bytes, filename: str, max_chars: Optional[int] = None) -> ParsedDocument:
+        """Parse the document once, collecting text, structure and metadata.
+        
+        With `max_chars`, text extraction stops once that many characters are
+        collected (e.g. the prompt limit) instead of walking every page.
+        """
         file_type = cls.get_file_type(filename)
+        parsed = ParsedDocument(
+            filename=filename,
+            file_type=file_type,
+            file_size_bytes=len(file_content)
+        )
         
         try:
             if file_type == 'pdf':
-                return cls._extract_text_from_pdf(file_content)
+                cls._parse_pdf(file_content, parsed, max_chars)
             elif file_type == 'document':
-                return cls._extract_text_from_docx(file_content)
-            else:
-                return ""
+                cls._parse_docx(file_content, parsed, max_chars)
         except Exception as e:
-            print(f"Error extracting text from {filename}: {e}")
-            return ""
+            logger.warning("Error extracting text from %s: %s", filename, e)
+            parsed.error = str(e)
+        
+        return parsed
     
     @classmethod
-    def _extract_text_from_pdf(cls, pdf_bytes: bytes) -> str:
-        """Extract text from PDF bytes"""
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                tmp.write(pdf_bytes)
-                tmp_path = tmp.name
-
-            reader = PyPDF2.PdfReader(tmp_path)
-            text = ""
-            
-            for page in reader.pages:
-                try:
-                    extracted = page.extract_text()
-                    if extracted:
-                        text += extracted + "\n"
-                except Exception as e:
-                    print(f"Error extracting text from page: {e}")
-                    continue
-            
-            # Clean up temp file
-            os.unlink(tmp_path)
-            
-            return text.strip()
-            
-        except Exception as e:
-            print(f"Error processing PDF: {e}")
-            return ""
+    def extract_text_from_file(cls, file_content: bytes, filename: str, max_chars: Optional[int] = None) -> str:
+        """Extract text from various file types"""
+        return cls.parse_document(file_content, filename, max_chars).text
+    
+    @staticmethod
+    def _collect_text(blocks: Iterator[str], parsed: ParsedDocument, max_chars: Optional[int]) -> None:
+        """Consume text blocks until the character budget is met"""
+        text = ""
+        for block in blocks:
+            parsed.units_read += 1
+            if block:
+                text += block + "\n"
+            if max_chars is not None and len(text.rstrip()) >= max_chars:
+                break
+        
+        parsed.text = text.strip()
+        parsed.truncated = parsed.units_read < parsed.total_units
+    
+    @staticmethod
+    def _iter_pdf_pages(reader: PyPDF2.PdfReader) -> Iterator[str]:
+        """Yield the text of each page, extracting only when the caller asks for it"""
+        for page in reader.pages:
+            try:
+                yield page.extract_text() or ""
+            except Exception as e:
+                logger.warning("Error extracting text from page: %s", e)
+                yield ""
     
     @classmethod
-    def _extract_text_from_docx(cls, docx_bytes: bytes) -> str:
-        """Extract text from Word document"""
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                tmp.write(docx_bytes)
-                tmp_path = tmp.name
-            
-            # Read Word document
-            doc = Document(tmp_path)
-            text = ""
-            
-            # Extract text from paragraphs
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text += paragraph.text + "\n"
-            
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
-                    if row_text:
-                        text += " | ".join(row_text) + "\n"
-            
-            # Clean up temp file
-            os.unlink(tmp_path)
-            
-            return text.strip()
-            
-        except Exception as e:
-            print(f"Error processing Word document: {e}")
-            return ""
+    def _parse_pdf(cls, pdf_bytes: bytes, parsed: ParsedDocument, max_chars: Optional[int] = None) -> None:
+        """Extract text, page count and metadata from PDF bytes"""
+        # Parse straight from memory - no temp file round trip
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        
+        parsed.num_pages = len(reader.pages)
+        parsed.total_units = parsed.num_pages
+        cls._collect_text(cls._iter_pdf_pages(reader), parsed, max_chars)
+        
+        if reader.metadata:
+            parsed.metadata = {
+                "title": reader.metadata.get('/Title', ''),
+                "author": reader.metadata.get('/Author', ''),
+                "creator": reader.metadata.get('/Creator', '')
+            }
+    
+    @staticmethod
+    def _iter_docx_blocks(doc, parsed: ParsedDocument) -> Iterator[str]:
+        """Yield paragraph text, then table rows (recording the tables as they are read)"""
+        # Extract text from paragraphs
+        for paragraph in doc.paragraphs:
+            yield paragraph.text if paragraph.text.strip() else ""
+        
+        # Extract text from tables
+        for table in doc.tables:
+            rows = []
+            parsed.tables.append(rows)
+            for row in table.rows:
+                row_text = []
+                for cell in row.cells:
+                    if cell.text.strip():
+                        row_text.append(cell.text.strip())
+                rows.append(row_text)
+                yield " | ".join(row_text)
     
     @classmethod
-    def get_file_info(cls, file_content: bytes, filename: str) -> dict:
-        """Get basic information about the file"""
+    def _parse_docx(cls, docx_bytes: bytes, parsed: ParsedDocument, max_chars: Optional[int] = None) -> None:
+        """Extract paragraphs, tables and core properties from Word document"""
+        # Read Word document straight from memory
+        doc = Document(io.BytesIO(docx_bytes))
+        
+        parsed.num_paragraphs = len(doc.paragraphs)
+        parsed.num_tables = len(doc.tables)
+        parsed.total_units = parsed.num_paragraphs + sum(len(table.rows) for table in doc.tables)
+        cls._collect_text(cls._iter_docx_blocks(doc, parsed), parsed, max_chars)
+        
+        # Check for document properties
+        if doc.core_properties:
+            parsed.metadata = {
+                "title": doc.core_properties.title or '',
+                "author": doc.core_properties.author or '',
+                "created": str(doc.core_properties.created) if doc.core_properties.created else ''
+            }
+    
+    @classmethod
+    def get_file_info(cls, file_content: bytes, filename: str, parsed: Optional[ParsedDocument] = None) -> dict:
+        """Get basic information about the file (reuses an already parsed document if given)"""
         try:
-            file_type = cls.get_file_type(filename)
+            if parsed is None:
+                parsed = cls.parse_document(file_content, filename)
             
             info = {
                 "filename": filename,
-                "file_type": file_type,
+                "file_type": parsed.file_type,
                 "file_size_mb": len(file_content) / (1024 * 1024),
-                "text_length": 0,
+                "text_length": parsed.estimated_text_length,
                 "processing_method": ""
             }
-            
-            # Extract text and get length
-            text = cls.extract_text_from_file(file_content, filename)
-            info["text_length"] = len(text)
+            if parsed.truncated:
+                info["text_length_estimated"] = True
             
             # Set processing method
-            if file_type == 'pdf':
+            if parsed.file_type == 'pdf':
                 info["processing_method"] = "PDF text extraction"
-                
-                # Additional info for PDFs
-                try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                        tmp.write(file_content)
-                        tmp_path = tmp.name
-                    
-                    reader = PyPDF2.PdfReader(tmp_path)
-                    info["num_pages"] = len(reader.pages)
-                    
-                    if reader.metadata:
-                        info["has_metadata"] = True
-                        info["metadata"] = {
-                            "title": reader.metadata.get('/Title', ''),
-                            "author": reader.metadata.get('/Author', ''),
-                            "creator": reader.metadata.get('/Creator', '')
-                        }
-                    
-                    os.unlink(tmp_path)
+                if parsed.num_pages is not None:
+                    info["num_pages"] = parsed.num_pages
                     
-                except Exception:
-                    pass
-                    
-            elif file_type == 'document':
+            elif parsed.file_type == 'document':
                 info["processing_method"] = "Word document parsing"
-                
-                # Additional info for Word docs
-                try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                        tmp.write(file_content)
-                        tmp_path = tmp.name
-                    
-                    doc = Document(tmp_path)
-                    info["num_paragraphs"] = len(doc.paragraphs)
-                    info["num_tables"] = len(doc.tables)
-                    
-                    # Check for document properties
-                    if doc.core_properties:
-                        info["has_metadata"] = True
-                        info["metadata"] = {
-                            "title": doc.core_properties.title or '',
-                            "author": doc.core_properties.author or '',
-                            "created": str(doc.core_properties.created) if doc.core_properties.created else ''
-                        }
-                    
-                    os.unlink(tmp_path)
-                    
-                except Exception:
-                    pass
+                if parsed.num_paragraphs is not None:
+                    info["num_paragraphs"] = parsed.num_paragraphs
+                    info["num_tables"] = parsed.num_tables
+            
+            if parsed.metadata:
+                info["has_metadata"] = True
+                info["metadata"] = parsed.metadata
             
             return info
             
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from config.config import Config
+from utils.document_processor import DocumentProcessor, ParsedDocument
+from utils.metrics import TEXT_EXTRACTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionQueueFull(Exception):
+    """Raised when the extraction pool already has too many queued tasks"""
+
+
+class ExtractionTimeout(Exception):
+    """Raised when parsing a document exceeds the per-task timeout"""
+
+
+def _parse_document_worker(file_content: bytes, filename: str, max_chars: Optional[int] = None) -> ParsedDocument:
+    """Entry point executed inside pool worker processes"""
+    return DocumentProcessor.parse_document(file_content, filename, max_chars)
+
+
+class ExtractionPool:
+    """Runs CPU-bound document parsing off the event loop in a bounded process pool"""
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_queue: int = None,
+        timeout_seconds: float = None
+    ):
+        self.max_workers = Config.EXTRACTION_POOL_SIZE if max_workers is None else max_workers
+        self.max_queue = Config.EXTRACTION_QUEUE_SIZE if max_queue is None else max_queue
+        self.timeout_seconds = Config.EXTRACTION_TIMEOUT_SECONDS if timeout_seconds is None else timeout_seconds
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self.timeouts = 0
+        self.rejections = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool lazily so importing the module spawns nothing"""
+        if self._executor is None:
+            # spawn: safe alongside uvicorn's threads and identical on Windows
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _kill_executor(self) -> None:
+        """Terminate worker processes (the only way to stop a stuck PyPDF2 parse)"""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+
+        for process in list(getattr(executor, "_processes", {}).values()):
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def parse_document(self, file_content: bytes, filename: str, max_chars: Optional[int] = None) -> ParsedDocument:
+        """Parse a document in the pool, enforcing queue depth and timeout (text stops at `max_chars`)"""
+        capacity = max(self.max_workers, 1) + self.max_queue
+        if self._in_flight >= capacity:
+            self.rejections += 1
+            raise ExtractionQueueFull(f"Extraction queue is full ({self._in_flight}/{capacity} tasks)")
+
+        self._in_flight += 1
+        file_type = os.path.splitext(filename or "")[1].lower().lstrip(".") or "unknown"
+        try:
+            with TEXT_EXTRACTION_SECONDS.time(file_type):
+                return await self._parse(file_content, filename, max_chars)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ExtractionTimeout(f"Parsing {filename} exceeded {self.timeout_seconds:g}s")
+        finally:
+            self._in_flight -= 1
+
+    async def _parse(self, file_content: bytes, filename: str, max_chars: Optional[int]) -> ParsedDocument:
+        """Run one parse inline-threaded or in the pool"""
+        if self.max_workers <= 0:
+            return await asyncio.wait_for(
+                asyncio.to_thread(DocumentProcessor.parse_document, file_content, filename, max_chars),
+                timeout=self.timeout_seconds
+            )
+
+        try:
+            return await self._run_in_pool(file_content, filename, max_chars)
+        except BrokenProcessPool:
+            # Pool was torn down under us (another task timed out) - retry once on a fresh pool
+            return await self._run_in_pool(file_content, filename, max_chars)
+
+    async def _run_in_pool(self, file_content: bytes, filename: str, max_chars: Optional[int]) -> ParsedDocument:
+        """Submit one parse task and kill the pool if it hangs"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        future = loop.run_in_executor(executor, _parse_document_worker, file_content, filename, max_chars)
+
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            if self._executor is executor:
+                logger.warning("Parsing %s timed out, restarting extraction pool", filename)
+                self._kill_executor()
+            raise
+
+    def shutdown(self) -> None:
+        """Stop worker processes (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_status_info(self) -> dict:
+        """Get pool sizing and counters"""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout_seconds,
+            "in_flight": self._in_flight,
+            "timeouts": self.timeouts,
+            "rejections": self.rejections
+        }
+
+
+# Singleton instance
+_extraction_pool: Optional[ExtractionPool] = None
+
+def get_extraction_pool() -> ExtractionPool:
+    """Get singleton extraction pool instance"""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ExtractionPool()
+    return _extraction_pool
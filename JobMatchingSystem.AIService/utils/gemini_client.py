@@ -1,148 +1,491 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Type
+import asyncio
+import hashlib
 import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+import requests
+from pydantic import BaseModel, ValidationError
+from requests.adapters import HTTPAdapter
 from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+from google.genai import _api_client as genai_api_client
+from utils.rate_limiter import ModelRateLimiter, RateLimitExceeded
+from utils.circuit_breaker import CircuitBreaker
+from utils.hedging import LatencyTracker, HedgeBudget, hedge_delay
+from utils.cv_classifier import CVFeatures
+from utils.keyword_matcher import KeywordMatcher
+from utils.context_cache import ContextCacheManager
+from utils.token_usage import TokenUsage, TokenUsageTracker
+from utils.single_flight import SingleFlight
+from utils.metrics import GEMINI_CALL_SECONDS, GEMINI_FALLBACKS, GEMINI_QUOTA_ERRORS, GEMINI_TOKENS
+from utils.log import annotate_request
 from config.config import Config
 
+logger = logging.getLogger(__name__)
+
+# SDK release whose private _request_unauthorized the pooled transport replaces (pinned in requirements.txt)
+PATCHED_GENAI_VERSION = "0.3.0"
+
+
+# Prompt wording _get_mock_response uses to tell the tasks apart
+MOCK_PROMPT_KEYWORDS = KeywordMatcher({
+    "validation": ["có phải cv", "có phải là cv", "curriculum vitae", "validate", "đánh giá xem", "cv/resume", "resume"],
+    "extraction": ["trích xuất thông tin"],
+    "extract": ["extract"],
+    "json": ["json"],
+    "matching": ["match score", "phù hợp"],
+})
+
+
+class AIResponseError(Exception):
+    """Raised when the model output cannot be used (missing, malformed or off-schema)"""
+
+
+@dataclass
+class _CallState:
+    """Bookkeeping shared by the attempts of one generate call"""
+    estimated_tokens: int
+    last_error: Optional[str] = None
+    rate_limited: Optional[RateLimitExceeded] = None
+    attempted: bool = False
+    config: Optional[genai_types.GenerateContentConfig] = None
+    system_instruction: Optional[str] = None
+
 
 class GeminiClient:
     """Utility class for Google Gemini API interactions with fallback support"""
     
     def __init__(self):
-        self.client = genai.Client(api_key=Config.GOOGLE_API_KEY)
+        http_options = {"base_url": Config.GEMINI_BASE_URL.rstrip("/") + "/"} if Config.GEMINI_BASE_URL else None
+        self.client = genai.Client(api_key=Config.GOOGLE_API_KEY, http_options=http_options)
         self.primary_model = Config.GEMINI_MODEL
         self.fallback_models = Config.GEMINI_FALLBACK_MODELS.copy()
         self.current_model = self.primary_model
-        self.failed_models = set()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.call_timeout = Config.GEMINI_CONNECT_TIMEOUT + Config.GEMINI_READ_TIMEOUT
+        self.rate_limiter = ModelRateLimiter()
+        self.latency_tracker = LatencyTracker()
+        self.hedge_budget = HedgeBudget()
+        self.context_cache = ContextCacheManager(self.client)
+        self.token_usage = TokenUsageTracker()
+        self.in_flight = SingleFlight("gemini")
+        self.transport = self._install_pooled_transport()
+    
+    def _install_pooled_transport(self) -> Dict[str, Any]:
+        """Route SDK HTTP calls through one keep-alive session with connect/read timeouts.
+        
+        google-genai 0.3.0 opens a new requests.Session per call and never sets a
+        timeout; both the sync and the aio surface go through _request_unauthorized,
+        a private method, so the patch is applied only to that exact release. On
+        any other version the SDK's own transport is used (no pooling, no HTTP
+        timeouts) and /model-status reports it.
+        
+        The 0.3.0 aio surface is the sync call on a worker thread: cancelling the
+        awaiting task (hedge loser, client disconnect, call_timeout) does not stop
+        the HTTP request, which only ends when it completes or hits
+        GEMINI_READ_TIMEOUT.
+        """
+        status = {"pooled": False, "sdk_version": genai.__version__, "patched_version": PATCHED_GENAI_VERSION}
+        api_client = getattr(self.client, "_api_client", None)
+        if api_client is None or api_client.vertexai:
+            return dict(status, reason="not the Gemini Developer API client")
+        if genai.__version__ != PATCHED_GENAI_VERSION or not hasattr(api_client, "_request_unauthorized"):
+            logger.warning(
+                "google-genai %s is not the patched %s: using the SDK transport without connection pooling "
+                "or HTTP timeouts", genai.__version__, PATCHED_GENAI_VERSION,
+                extra={"outcome": "transport_fallback"}
+            )
+            return dict(status, reason=f"google-genai {genai.__version__} is not {PATCHED_GENAI_VERSION}")
+        
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=Config.GEMINI_MAX_CONNECTIONS,
+            pool_maxsize=Config.GEMINI_MAX_CONNECTIONS
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        timeout = (Config.GEMINI_CONNECT_TIMEOUT, Config.GEMINI_READ_TIMEOUT)
+        
+        def _request_unauthorized(http_request, stream: bool = False):
+            data = http_request.data
+            if data and not isinstance(data, bytes):
+                data = json.dumps(data, cls=genai_api_client.RequestJsonEncoder)
+            response = session.request(
+                method=http_request.method,
+                url=http_request.url,
+                headers=http_request.headers,
+                data=data or None,
+                stream=stream,
+                timeout=timeout
+            )
+            genai_errors.APIError.raise_for_response(response)
+            return genai_api_client.HttpResponse(response.headers, response if stream else [response.text])
+        
+        api_client._request_unauthorized = _request_unauthorized
+        self._session = session
+        return dict(status, pooled=True, connect_timeout=Config.GEMINI_CONNECT_TIMEOUT, read_timeout=Config.GEMINI_READ_TIMEOUT)
+    
+    def _breaker(self, model: str) -> CircuitBreaker:
+        """Get (or create) the circuit breaker for a model"""
+        breaker = self.breakers.get(model)
+        if breaker is None:
+            breaker = self.breakers.setdefault(model, CircuitBreaker(model))
+        return breaker
+    
+    @property
+    def failed_models(self) -> set:
+        """Models currently taken out of rotation by an open circuit"""
+        return {m for m, b in self.breakers.items() if not b.is_available()}
+    
+    def get_available_models(self) -> List[str]:
+        """Fallback models whose circuit allows traffic (or will on the next probe)"""
+        return [m for m in self.fallback_models if self._breaker(m).is_available()]
     
     def _get_next_available_model(self) -> Optional[str]:
         """Get next available model that hasn't failed"""
-        available_models = [m for m in self.fallback_models if m not in self.failed_models]
+        available_models = self.get_available_models()
         return available_models[0] if available_models else None
     
+    def _models_to_try(self) -> List[str]:
+        """Current model first, then the remaining fallback models"""
+        return [self.current_model] + [m for m in self.fallback_models if m != self.current_model]
+    
+    def _handle_model_error(self, model: str, e: Exception) -> str:
+        """Classify a model failure, feed its circuit breaker, return error text"""
+        error_str = str(e) or type(e).__name__
+        breaker = self._breaker(model)
+        
+        # Check if it's a quota error
+        if "RESOURCE_EXHAUSTED" in error_str or "429" in error_str:
+            logger.warning("Quota exhausted for %s, trying next model", model,
+                           extra={"model": model, "outcome": "quota_exhausted", "error": error_str[:200]})
+            GEMINI_QUOTA_ERRORS.inc(model)
+            breaker.record_failure(error_str, trip=True)
+            return f"Quota exhausted: {error_str}"
+        elif "NOT_FOUND" in error_str or "404" in error_str:
+            logger.warning("Model %s not available, trying next model", model,
+                           extra={"model": model, "outcome": "not_found", "error": error_str[:200]})
+            breaker.record_failure(error_str, trip=True, cooldown_seconds=Config.CIRCUIT_MAX_COOLDOWN_SECONDS)
+            return f"Model not found: {error_str}"
+        else:
+            # Other errors (timeouts included), might be temporary - trip on failure rate
+            logger.warning("Model %s failed: %s", model, error_str[:100],
+                           extra={"model": model, "outcome": "error", "error": error_str[:200]})
+            breaker.record_failure(error_str)
+            return error_str
+    
+    def _all_models_failed(self, prompt: str, last_error: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Build the response used when every model failed"""
+        error_msg = f"All Gemini models failed. Last error: {last_error}"
+        GEMINI_FALLBACKS.inc("error_response")
+        logger.error(error_msg, extra={"outcome": "all_models_failed"})
+        annotate_request(model=None, gemini_outcome="all_models_failed")
+        
+        # Check if mock mode is enabled
+        if Config.MOCK_MODE:
+            return self._get_mock_response(prompt), None
+        
+        if Config.DEBUG_MODE:
+            return f"AI ERROR: {error_msg}", None
+        else:
+            return "AI service temporarily unavailable. Please try again later.", None
+    
     def generate_content(self, prompt: str, retry_on_quota_error: bool = True) -> str:
         """Generate content using Gemini API with automatic fallback"""
-        models_to_try = [self.current_model] + [m for m in self.fallback_models if m != self.current_model]
-        
+        response, _ = self.generate_content_with_model(prompt, retry_on_quota_error)
+        return response
+    
+    def generate_content_with_model(self, prompt: str, retry_on_quota_error: bool = True) -> Tuple[str, Optional[str]]:
+        """Generate content and report which model answered (None if served by the error/mock fallback)"""
         last_error = None
+        estimated_tokens = ModelRateLimiter.estimate_tokens(prompt)
         
-        for model in models_to_try:
-            if model in self.failed_models:
+        for model in self._models_to_try():
+            breaker = self._breaker(model)
+            if not breaker.allow_request():
+                continue
+            
+            try:
+                self.rate_limiter.try_acquire(model, estimated_tokens)
+            except RateLimitExceeded as e:
+                breaker.release_probe()
+                last_error = str(e)
                 continue
                 
             try:
-                print(f"🤖 Trying model: {model}")
+                logger.debug("Trying model %s", model, extra={"model": model})
                 result = self.client.models.generate_content(
                     model=model,
                     contents=prompt
                 )
                 
                 # Success! Update current model
+                breaker.record_success()
                 self.current_model = model
-                print(f"✅ Success with model: {model}")
-                return result.text
+                logger.info("Success with model %s", model, extra={"model": model, "outcome": "success"})
+                return result.text, model
                 
             except Exception as e:
-                error_str = str(e)
-                print(f"❌ Model {model} failed: {error_str[:100]}...")
-                
-                # Check if it's a quota error
-                if "RESOURCE_EXHAUSTED" in error_str or "429" in error_str:
-                    print(f"⚠️ Quota exhausted for {model}, trying next model...")
-                    self.failed_models.add(model)
-                    last_error = f"Quota exhausted: {error_str}"
-                    continue
-                elif "NOT_FOUND" in error_str or "404" in error_str:
-                    print(f"⚠️ Model {model} not available, trying next model...")
-                    self.failed_models.add(model)
-                    last_error = f"Model not found: {error_str}"
-                    continue
-                else:
-                    # Other errors, might be temporary
-                    last_error = error_str
-                    
+                last_error = self._handle_model_error(model, e)
+        
         # All models failed
-        error_msg = f"All Gemini models failed. Last error: {last_error}"
-        print(f"💥 {error_msg}")
+        return self._all_models_failed(prompt, last_error)
+    
+    async def generate_content_async(self, prompt: str) -> str:
+        """Async variant of generate_content for use inside FastAPI handlers"""
+        response, _ = await self.generate_content_with_model_async(prompt)
+        return response
+    
+    async def generate_content_with_model_async(
+        self,
+        prompt: str,
+        config: Optional[genai_types.GenerateContentConfig] = None,
+        system_instruction: Optional[str] = None
+    ) -> Tuple[str, Optional[str]]:
+        """Generate content without blocking the event loop; cancellable by the caller.
         
-        # Check if mock mode is enabled
-        if Config.MOCK_MODE:
-            return self._get_mock_response(prompt)
+        A static system_instruction is served from a Gemini context cache where the
+        model supports it, else sent inline. Raises RateLimitExceeded when every
+        usable model is over its client-side limits, so the API can answer 429
+        instead of queuing forever. Identical calls already in flight (same prompt,
+        system instruction and config) are joined instead of sent again.
+        """
+        key = hashlib.sha256("\x00".join((
+            prompt,
+            system_instruction or "",
+            config.model_dump_json(exclude_none=True) if config is not None else ""
+        )).encode("utf-8")).hexdigest()
+        return await self.in_flight.do(
+            key, lambda: self._generate_content_with_model_async(prompt, config, system_instruction)
+        )
+    
+    async def _generate_content_with_model_async(
+        self,
+        prompt: str,
+        config: Optional[genai_types.GenerateContentConfig],
+        system_instruction: Optional[str]
+    ) -> Tuple[str, Optional[str]]:
+        """The fallback cascade behind generate_content_with_model_async"""
+        state = _CallState(
+            estimated_tokens=ModelRateLimiter.estimate_tokens((system_instruction or "") + prompt),
+            config=config,
+            system_instruction=system_instruction
+        )
+        models = deque(self._models_to_try())
+        first_model = models[0]
         
-        if Config.DEBUG_MODE:
-            return f"AI ERROR: {error_msg}"
+        if Config.GEMINI_HEDGING_ENABLED:
+            response = await self._generate_hedged(prompt, models, state)
         else:
-            return "AI service temporarily unavailable. Please try again later."
+            response = await self._generate_sequential(prompt, models, state)
+        if response is not None:
+            if response[1] != first_model:
+                GEMINI_FALLBACKS.inc("model")
+            return response
+        
+        if state.rate_limited is not None and not state.attempted:
+            raise RateLimitExceeded(
+                f"All Gemini models are rate limited: {state.rate_limited}", state.rate_limited.retry_after
+            )
+        
+        # All models failed
+        if system_instruction:
+            prompt = f"{system_instruction}\n\n{prompt}"
+        return self._all_models_failed(prompt, state.last_error)
+    
+    def _request_config(
+        self, model: str, state: "_CallState", use_context_cache: bool
+    ) -> Tuple[Optional[genai_types.GenerateContentConfig], str, Optional[str]]:
+        """Per-model request config, prompt mode for token accounting, and the cached content used"""
+        if state.system_instruction is None:
+            return state.config, "inline", None
+        
+        base = state.config or genai_types.GenerateContentConfig()
+        cached_content = self.context_cache.lookup(model, state.system_instruction) if use_context_cache else None
+        if cached_content is not None:
+            return base.model_copy(update={"cached_content": cached_content}), "context_cache", cached_content
+        return base.model_copy(update={"system_instruction": state.system_instruction}), "system_instruction", None
+    
+    @staticmethod
+    def _rejects_cached_content(e: Exception, cached_content: str) -> bool:
+        """Whether a call failed because of its cached prefix (expired, deleted, not usable) rather than the model"""
+        if not isinstance(e, genai_errors.ClientError) or e.code not in (400, 403, 404):
+            return False
+        error_str = str(e)
+        lowered = error_str.lower()
+        return cached_content in error_str or "cachedcontent" in lowered or "cached content" in lowered
+    
+    def _next_model(self, models: deque) -> Optional[str]:
+        """Pop the next model whose circuit admits a call"""
+        while models:
+            model = models.popleft()
+            if self._breaker(model).allow_request():
+                return model
+        return None
+    
+    async def _attempt(
+        self, model: str, prompt: str, state: "_CallState", use_context_cache: bool = True
+    ) -> Optional[Tuple[str, str]]:
+        """One guarded call to a model; returns (text, model) or None after recording the failure"""
+        breaker = self._breaker(model)
+        config, mode, cached_content = self._request_config(model, state, use_context_cache)
+        started = None
+        try:
+            async with self.rate_limiter.acquire(model, state.estimated_tokens):
+                state.attempted = True
+                logger.debug("Trying model %s", model, extra={"model": model, "prompt_mode": mode})
+                started = time.monotonic()
+                result = await asyncio.wait_for(
+                    self.client.aio.models.generate_content(model=model, contents=prompt, config=config),
+                    timeout=self.call_timeout
+                )
+        except RateLimitExceeded as e:
+            # Local limit hit - skip this model without spending a round trip
+            breaker.release_probe()
+            if state.rate_limited is None or e.retry_after < state.rate_limited.retry_after:
+                state.rate_limited = e
+            return None
+        except asyncio.CancelledError:
+            # Lost a hedge race or the caller went away - not the model's fault
+            breaker.release_probe()
+            if started is not None:
+                GEMINI_CALL_SECONDS.observe(time.monotonic() - started, model, "cancelled")
+            raise
+        except asyncio.TimeoutError:
+            if started is not None:
+                GEMINI_CALL_SECONDS.observe(time.monotonic() - started, model, "timeout")
+            state.last_error = self._handle_model_error(model, TimeoutError(f"No response within {self.call_timeout:g}s"))
+            return None
+        except Exception as e:
+            if started is not None:
+                GEMINI_CALL_SECONDS.observe(time.monotonic() - started, model, "error")
+            if cached_content is not None and self._rejects_cached_content(e, cached_content):
+                # The cached prefix expired or was rejected - not the model's fault, retry it inline
+                logger.warning("Context cache %s rejected by %s, retrying inline: %s", cached_content, model, str(e)[:100],
+                               extra={"model": model, "outcome": "context_cache_rejected"})
+                self.context_cache.invalidate(model, state.system_instruction)
+                return await self._attempt(model, prompt, state, use_context_cache=False)
+            state.last_error = self._handle_model_error(model, e)
+            return None
+        
+        elapsed = time.monotonic() - started
+        self.latency_tracker.record(model, elapsed)
+        GEMINI_CALL_SECONDS.observe(elapsed, model, "success")
+        usage = TokenUsage.from_metadata(getattr(result, "usage_metadata", None))
+        if usage is not None:
+            self.token_usage.record(model, mode, usage)
+            GEMINI_TOKENS.inc(model, "prompt", amount=usage.prompt_tokens)
+            GEMINI_TOKENS.inc(model, "completion", amount=usage.completion_tokens)
+            GEMINI_TOKENS.inc(model, "cached", amount=usage.cached_tokens)
+            if usage.total_tokens:
+                self.rate_limiter.record_usage(model, state.estimated_tokens, usage.total_tokens)
+        
+        # Success! Update current model
+        breaker.record_success()
+        self.current_model = model
+        fields = {"model": model, "outcome": "success", "prompt_mode": mode, "duration_ms": round(elapsed * 1000, 1)}
+        if usage is not None:
+            fields.update(
+                prompt_tokens=usage.prompt_tokens,
+                cached_tokens=usage.cached_tokens,
+                completion_tokens=usage.completion_tokens
+            )
+        logger.info("Success with model %s", model, extra=fields)
+        annotate_request(model=model, gemini_outcome="success")
+        return result.text, model
+    
+    async def _generate_sequential(self, prompt: str, models: deque, state: "_CallState") -> Optional[Tuple[str, str]]:
+        """Try models one after another (the classic fallback cascade)"""
+        while True:
+            model = self._next_model(models)
+            if model is None:
+                return None
+            response = await self._attempt(model, prompt, state)
+            if response is not None:
+                return response
+    
+    async def _generate_hedged(self, prompt: str, models: deque, state: "_CallState") -> Optional[Tuple[str, str]]:
+        """Fallback cascade that also races the next healthy model when the current one is slow.
+        
+        Hedging buys latency with quota. The loser's task is cancelled, but its
+        HTTP request keeps running on its thread until it answers or hits
+        GEMINI_READ_TIMEOUT (see _install_pooled_transport). Gemini serves it and
+        bills it in full, and its RPM/TPM reservation is never refunded. Only its
+        GEMINI_MAX_IN_FLIGHT slot is freed early. Every hedge therefore adds a
+        whole extra call. Over time that is up to GEMINI_HEDGE_BUDGET_RATIO extra
+        calls per primary call, plus a burst of up to the budget's saved balance.
+        """
+        pending: Dict[asyncio.Task, str] = {}
+        hedges_left = Config.GEMINI_HEDGE_MAX_EXTRA_CALLS
+        latest_model = None
+        self.hedge_budget.record_primary()
+        
+        try:
+            while True:
+                if not pending:
+                    latest_model = self._next_model(models)
+                    if latest_model is None:
+                        return None
+                    pending[asyncio.ensure_future(self._attempt(latest_model, prompt, state))] = latest_model
+                
+                delay = hedge_delay(self.latency_tracker, latest_model) if hedges_left > 0 else None
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    # Hedge timer fired - fire a second request at the next healthy model
+                    hedge_model = self._next_model(models)
+                    if hedge_model is None:
+                        hedges_left = 0
+                        continue
+                    if not self.hedge_budget.try_spend():
+                        self._breaker(hedge_model).release_probe()
+                        models.appendleft(hedge_model)
+                        hedges_left = 0
+                        continue
+                    
+                    hedges_left -= 1
+                    logger.info("%s slower than %.1fs, hedging with %s", latest_model, delay, hedge_model,
+                                extra={"model": hedge_model, "outcome": "hedged"})
+                    latest_model = hedge_model
+                    pending[asyncio.ensure_future(self._attempt(hedge_model, prompt, state))] = hedge_model
+                    continue
+                
+                for task in done:
+                    pending.pop(task)
+                    response = task.result()
+                    if response is not None:
+                        return response
+        finally:
+            # Stop waiting for whoever lost the race (its HTTP request still runs to completion)
+            for task in pending:
+                task.cancel()
     
     def _get_mock_response(self, prompt: str) -> str:
         """Generate mock response for testing when all models are down"""
-        prompt_lower = prompt.lower()
+        hits = MOCK_PROMPT_KEYWORDS.scan(prompt)
         
         # CV Validation mock responses - Based on new criteria
-        if any(keyword in prompt_lower for keyword in [
-            "có phải cv", "có phải là cv", "curriculum vitae", "validate", 
-            "đánh giá xem", "cv/resume", "resume"
-        ]):
+        if hits.has("validation"):
             # Extract only the CV content between markers
             content_start = prompt.find("===== NỘI DUNG FILE =====")
             content_end = prompt.find("==========================")
             
             if content_start != -1 and content_end != -1:
                 # Extract only CV content
-                cv_content = prompt[content_start + len("===== NỘI DUNG FILE ====="):content_end].strip()
-                content_lower = cv_content.lower()
+                content = prompt[content_start + len("===== NỘI DUNG FILE ====="):content_end].strip()
             else:
                 # Fallback to full prompt if markers not found
-                content_lower = prompt_lower
-            
-            # Look for required elements: name + contact info
-            has_name = any(word in content_lower for word in ["tên", "name", "nguyễn", "trần", "lê", "phạm", "hoàng", "văn", "thị"])
-            has_contact = any(word in content_lower for word in ["email", "phone", "điện thoại", "@", "gmail", "yahoo", "hotmail"])
-            
-            # Look for professional elements (need 3 of 5) - More precise detection
-            professional_count = 0
-            
-            # 1. Experience - check for real work experience
-            if any(word in content_lower for word in ["kinh nghiệm", "experience", "làm việc", "intern", "developer", "engineer", "tại công ty", "năm developer", "năm làm"]):
-                professional_count += 1
-                
-            # 2. Skills - check for technical skills  
-            if any(word in content_lower for word in ["kỹ năng", "skills", "java", "python", "javascript", "react", "html", "css", "spring", "node.js", "sql"]):
-                professional_count += 1
-                
-            # 3. Projects - check for actual projects
-            if any(word in content_lower for word in ["dự án", "project", "phát triển", "xây dựng", "website", "app", "hệ thống"]):
-                professional_count += 1
-                
-            # 4. Education - check for formal education (not just "trường" alone)
-            if any(phrase in content_lower for phrase in ["học vấn", "education", "đại học", "university", "cử nhân", "thạc sĩ", "bằng cấp", "tốt nghiệp đại học"]):
-                professional_count += 1
-                
-            # 5. Achievements/Certificates
-            if any(word in content_lower for word in ["chứng chỉ", "certificate", "giải thưởng", "thành tích", "certify", "certified"]):
-                professional_count += 1
+                content = prompt
             
-            # Apply new validation criteria
-            if has_name and has_contact and professional_count >= 3:
-                elements = []
-                if has_name: elements.append("họ tên")
-                if has_contact: elements.append("thông tin liên lạc")
-                elements.append(f"{professional_count}/5 yếu tố chuyên môn")
-                return f"YES - CV hợp lệ. Có {' + '.join(elements)}"
-            elif has_name and has_contact and professional_count >= 1:
-                return f"NO - Thiếu yếu tố chuyên môn (chỉ có {professional_count}/3 yêu cầu)"
-            elif (has_name or has_contact) and professional_count >= 2:
-                missing = "thông tin liên lạc" if not has_contact else "họ tên"
-                return f"NO - Thiếu {missing}"
-            else:
-                # Check if clearly not a CV
-                non_cv_indicators = ["invoice", "hóa đơn", "contract", "hợp đồng", "report", "báo cáo"]
-                if any(indicator in content_lower for indicator in non_cv_indicators):
-                    return "NO - Đây không phải CV vì là tài liệu khác"
-                else:
-                    return "NO - Thiếu các yếu tố cơ bản của CV (họ tên, thông tin liên lạc, ít nhất 3 yếu tố chuyên môn)"
+            # Same keyword heuristic as the fast-path pre-classifier
+            return CVFeatures.extract(content).verdict(content.lower())
         
         # CV Information extraction mock
-        elif "trích xuất thông tin" in prompt_lower or "extract" in prompt_lower and "json" in prompt_lower:
+        elif hits.has("extraction") or hits.has("extract") and hits.has("json"):
             return '''
             {
                 "name": "John Smith",
@@ -157,7 +500,7 @@ class GeminiClient:
             '''
         
         # Job matching mock
-        elif "match score" in prompt_lower or "phù hợp" in prompt_lower:
+        elif hits.has("matching"):
             return '''
             {
                 "match_score": 85,
@@ -174,6 +517,40 @@ class GeminiClient:
         else:
             return "Mock AI response: Service is in testing mode. All Gemini models are currently unavailable due to quota limits."
     
+    async def generate_json_async(
+        self,
+        prompt: str,
+        response_schema: Optional[dict] = None,
+        response_model: Optional[Type[BaseModel]] = None,
+        attempts: int = 2
+    ) -> Tuple[Any, Optional[str]]:
+        """Ask for schema-constrained JSON; returns (data or response_model instance, model).
+        
+        Output that does not parse or validate is retried; model is None when the
+        data came from the error/mock fallback. Raises AIResponseError if nothing usable came back.
+        """
+        config = genai_types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema
+        )
+        error = None
+        
+        for _ in range(max(1, attempts)):
+            response, model = await self.generate_content_with_model_async(prompt, config)
+            try:
+                data = self.parse_json_response(response)
+                if response_model is not None:
+                    data = response_model.model_validate(data)
+                return data, model
+            except (ValueError, ValidationError) as e:
+                error = str(e)
+                if model is None:
+                    break
+                logger.warning("Unusable JSON from %s, retrying: %s", model, error[:100],
+                               extra={"model": model, "outcome": "invalid_json"})
+        
+        raise AIResponseError(f"AI returned no usable JSON: {(error or '')[:200]}")
+    
     def generate_json_content(self, prompt: str) -> Dict[Any, Any]:
         """Generate JSON content using Gemini API with fallback support"""
         try:
@@ -191,12 +568,10 @@ class GeminiClient:
                 return {"raw_response": response}
                 
         except json.JSONDecodeError as e:
-            if Config.DEBUG_MODE:
-                print(f"JSON Parse Error: {e}")
+            logger.debug("JSON parse error: %s", e)
             return {"error": "Invalid JSON response", "raw_response": response}
         except Exception as e:
-            if Config.DEBUG_MODE:
-                print(f"Gemini JSON API Error: {e}")
+            logger.debug("Gemini JSON API error: %s", e)
             return {"error": str(e)}
     
     def check_connection(self) -> bool:
@@ -206,7 +581,8 @@ class GeminiClient:
             test_prompt = "Reply with just 'OK'"
             
             for model in self.fallback_models:
-                if model in self.failed_models:
+                breaker = self._breaker(model)
+                if not breaker.allow_request():
                     continue
                     
                 try:
@@ -215,10 +591,11 @@ class GeminiClient:
                         contents=test_prompt
                     )
                     if result.text and len(result.text.strip()) > 0:
+                        breaker.record_success()
                         self.current_model = model
                         return True
-                except:
-                    self.failed_models.add(model)
+                except Exception as e:
+                    self._handle_model_error(model, e)
                     continue
             
             # If all models failed, check if API key is at least set
@@ -231,11 +608,41 @@ class GeminiClient:
         """Get detailed status information about model availability"""
         return {
             "current_model": self.current_model,
-            "available_models": [m for m in self.fallback_models if m not in self.failed_models],
+            "transport": self.transport,
+            "available_models": self.get_available_models(),
             "failed_models": list(self.failed_models),
+            "circuit_breakers": {m: b.get_status_info() for m, b in self.breakers.items()},
+            "hedging": dict(enabled=Config.GEMINI_HEDGING_ENABLED, **self.hedge_budget.get_status_info()),
+            "rate_limits": self.rate_limiter.get_status_info(),
+            "context_cache": self.context_cache.get_status_info(),
+            "token_usage": self.token_usage.get_status_info(),
+            "coalescing": self.in_flight.get_status_info(),
             "total_models": len(self.fallback_models)
         }
     
+    @staticmethod
+    def parse_json_response(response: str) -> Any:
+        """Extract the JSON object or array from a model response (tolerates ``` fences and chatter)"""
+        text = response.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            if text.lower().startswith("json"):
+                text = text[4:]
+        
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+        
+        starts = [i for i in (text.find('['), text.find('{')) if i != -1]
+        if not starts:
+            raise ValueError("No JSON found in response")
+        start = min(starts)
+        end = text.rfind(']' if text[start] == '[' else '}') + 1
+        if end <= start:
+            raise ValueError("Unterminated JSON in response")
+        return json.loads(text[start:end])
+    
     @staticmethod
     def parse_yes_no_response(response: str) -> tuple[bool, str]:
         """Parse YES/NO response from Gemini"""
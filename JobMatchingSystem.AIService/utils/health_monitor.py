@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any
+from config.config import Config
+from utils.gemini_client import GeminiClient, get_gemini_client
+
+logger = logging.getLogger(__name__)
+
+
+class ModelHealthMonitor:
+    """Probes Gemini in the background so health endpoints answer from a snapshot.
+
+    The probe is a model metadata lookup (no generation, no quota) against the
+    current model. Probe failures are only reported; they never feed the
+    circuit breakers, which keep tracking real traffic.
+    """
+
+    def __init__(self, gemini_client: GeminiClient = None, interval_seconds: float = None):
+        self.gemini_client = gemini_client or get_gemini_client()
+        self.interval_seconds = Config.HEALTH_PROBE_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot: Dict[str, Any] = {
+            "gemini_ai": "unknown",
+            "checked_at": None,
+            "probe_latency_ms": None,
+            "probed_model": None,
+            "last_error": None
+        }
+
+    def start(self) -> None:
+        """Start the probe loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the probe loop"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval_seconds)
+
+    async def probe(self) -> None:
+        """Check the current model once and replace the snapshot"""
+        model = self.gemini_client.current_model
+        if Config.GOOGLE_API_KEY == "YOUR_API_KEY_HERE":
+            self._update("disconnected", model, None, "GOOGLE_API_KEY not set")
+            return
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.to_thread(self.gemini_client.client.models.get, model=model),
+                timeout=Config.HEALTH_PROBE_TIMEOUT_SECONDS
+            )
+            self._update("connected", model, started, None)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._update("disconnected", model, started, f"Probe timed out after {Config.HEALTH_PROBE_TIMEOUT_SECONDS:g}s")
+        except Exception as e:
+            self._update("disconnected", model, started, str(e)[:200] or type(e).__name__)
+
+    def _update(self, status: str, model: str, started: Optional[float], error: Optional[str]) -> None:
+        if error and self._snapshot["gemini_ai"] != status:
+            logger.warning("Gemini health probe failed for %s: %s", model, error, extra={"model": model})
+        self._snapshot = {
+            "gemini_ai": status,
+            "checked_at": datetime.utcnow().isoformat(),
+            "probe_latency_ms": round((time.perf_counter() - started) * 1000, 1) if started is not None else None,
+            "probed_model": model,
+            "last_error": error
+        }
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Latest probe result plus live circuit breaker counts (no network I/O)"""
+        available_models = self.gemini_client.get_available_models()
+        return {
+            **self._snapshot,
+            "current_model": self.gemini_client.current_model,
+            "available_models": len(available_models),
+            "total_models": len(self.gemini_client.fallback_models)
+        }
+
+    def is_ready(self) -> bool:
+        """Ready when the last probe reached Gemini and at least one model is in rotation"""
+        return self._snapshot["gemini_ai"] == "connected" and bool(self.gemini_client.get_available_models())
+
+
+_health_monitor: Optional[ModelHealthMonitor] = None
+
+
+def get_health_monitor() -> ModelHealthMonitor:
+    """Get singleton health monitor instance"""
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = ModelHealthMonitor()
+    return _health_monitor
@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+from typing import Dict, Optional
+from config.config import Config
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies per model"""
+
+    def __init__(self, window_size: int = 200):
+        self.window_size = window_size
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = self._samples[model] = deque(maxlen=self.window_size)
+            samples.append(seconds)
+
+    def percentile(self, model: str, percentile: float) -> Optional[float]:
+        """Latency at the given percentile (0-1), or None without enough samples"""
+        with self._lock:
+            samples = self._samples.get(model)
+            if not samples or len(samples) < Config.GEMINI_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(percentile * len(ordered)))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """Caps hedged calls to a fraction of primary calls (earn `ratio` per call, spend 1 per hedge).
+
+    A hedge is a full extra Gemini call even when it loses (cancelling does not
+    stop the request), so `ratio` is also the extra quota hedging may use.
+    """
+
+    def __init__(self, ratio: float = None, max_balance: float = 10.0):
+        self.ratio = Config.GEMINI_HEDGE_BUDGET_RATIO if ratio is None else ratio
+        self.max_balance = max_balance
+        self._balance = 0.0
+        self.primary_calls = 0
+        self.hedged_calls = 0
+        self._lock = threading.Lock()
+
+    def record_primary(self) -> None:
+        with self._lock:
+            self.primary_calls += 1
+            self._balance = min(self.max_balance, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._balance < 1.0:
+                return False
+            self._balance -= 1.0
+            self.hedged_calls += 1
+            return True
+
+    def get_status_info(self) -> dict:
+        return {
+            "ratio": self.ratio,
+            "primary_calls": self.primary_calls,
+            "hedged_calls": self.hedged_calls,
+            "balance": round(self._balance, 2)
+        }
+
+
+def hedge_delay(tracker: LatencyTracker, model: str) -> float:
+    """Delay before hedging a call to `model`, derived from its latency percentile"""
+    observed = tracker.percentile(model, Config.GEMINI_HEDGE_PERCENTILE)
+    if observed is None:
+        return Config.GEMINI_HEDGE_DEFAULT_DELAY_SECONDS
+    return max(Config.GEMINI_HEDGE_MIN_DELAY_SECONDS, observed)
@@ -0,0 +1,469 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple, Type
+from urllib.parse import urlsplit
+from config.config import Config
+from utils.result_cache import SERVICE_ROOT
+from utils.log import bind_request, reset_request, current_request, annotate_request
+from utils.metrics import ASYNC_JOBS, JOB_QUEUE_WAIT_SECONDS, JOB_CALLBACKS
+
+logger = logging.getLogger(__name__)
+
+
+# Job states; queued and running jobs count against the pending limit
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+# Callback delivery states (NULL: no callback URL)
+CALLBACK_PENDING, CALLBACK_DELIVERED, CALLBACK_FAILED = "pending", "delivered", "failed"
+# JOB_CALLBACK_ALLOWED_HOSTS entry admitting any host that resolves only to public addresses
+ANY_PUBLIC_HOST = "*"
+
+JobHandler = Callable[[bytes, str], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are waiting; the caller should retry later"""
+
+
+class InvalidCallbackUrl(ValueError):
+    """Callback URL is malformed or its host is not allowed"""
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Treat 3xx as a failed delivery instead of following it to a host nobody checked"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_CALLBACK_OPENER = urllib.request.build_opener(_NoRedirectHandler)
+
+
+def _resolves_to_public_addresses(hostname: str) -> bool:
+    """True when every address the host resolves to is globally routable (no loopback, private, link-local)"""
+    try:
+        infos = socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return False
+    addresses = {info[4][0].split("%", 1)[0] for info in infos}
+    return bool(addresses) and all(ipaddress.ip_address(address).is_global for address in addresses)
+
+
+class JobQueue:
+    """Durable queue of background jobs (SQLite) drained by a bounded pool of asyncio workers.
+
+    Uploads are stored with the job and dropped once it finishes, so a restart
+    loses nothing: jobs that were running are queued again, callbacks that were
+    not yet delivered are retried. Handlers are registered per job kind; a
+    handler raising one of its retryable exceptions (rate limit, full
+    extraction queue) puts the job back with a delay instead of failing it.
+    A job found running at startup JOB_MAX_ATTEMPTS times (it keeps taking
+    the process down) is failed. The database must not be shared between
+    service processes.
+    """
+
+    # Seconds between sweeps for finished jobs past JOB_RESULT_TTL_SECONDS
+    PURGE_INTERVAL_SECONDS = 300
+    # Idle workers re-check for delayed jobs this often
+    POLL_INTERVAL_SECONDS = 1.0
+
+    def __init__(self, db_path: str = None, workers: int = None, max_pending: int = None, max_attempts: int = None):
+        db_path = Config.JOB_DB_PATH if db_path is None else db_path
+        self.workers = Config.JOB_WORKERS if workers is None else workers
+        self.max_pending = Config.JOB_QUEUE_MAX_PENDING if max_pending is None else max_pending
+        self.max_attempts = Config.JOB_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.allowed_callback_hosts = {host.lower() for host in Config.JOB_CALLBACK_ALLOWED_HOSTS}
+
+        self._handlers: Dict[str, Tuple[JobHandler, Tuple[Type[BaseException], ...]]] = {}
+        self._lock = threading.Lock()
+        self._db = self._open_db(db_path)
+        self.db_path = db_path or None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: list = []
+        self._callbacks: set = set()
+
+    @staticmethod
+    def _open_db(db_path: str) -> sqlite3.Connection:
+        """Open (or create) the job table; an empty path keeps jobs in memory only"""
+        if db_path:
+            if not os.path.isabs(db_path):
+                db_path = os.path.join(SERVICE_ROOT, db_path)
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        db = sqlite3.connect(db_path or ":memory:", check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                filename TEXT,
+                payload BLOB,
+                request_id TEXT,
+                callback_url TEXT,
+                callback_status TEXT,
+                callback_attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                available_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )"""
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, available_at)")
+        return db
+
+    def register(self, kind: str, handler: JobHandler, retryable: Tuple[Type[BaseException], ...] = ()) -> None:
+        """Set the coroutine that processes jobs of a kind (payload, filename) -> JSON-serializable result"""
+        self._handlers[kind] = (handler, tuple(retryable))
+
+    def check_callback_url(self, url: Optional[str]) -> Optional[str]:
+        """Normalize an optional callback URL, rejecting non-HTTP(S) and disallowed hosts.
+
+        Deny by default: with JOB_CALLBACK_ALLOWED_HOSTS empty no callback is
+        accepted. Listed hosts are trusted as configured; "*" admits any other
+        host only if it resolves to public addresses (blocking, may do DNS).
+        """
+        if not url:
+            return None
+        parts = urlsplit(url.strip())
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise InvalidCallbackUrl("callback_url must be an absolute http(s) URL")
+        if not self.allowed_callback_hosts:
+            raise InvalidCallbackUrl("Callbacks are disabled (JOB_CALLBACK_ALLOWED_HOSTS is not set); poll the status URL")
+        hostname = parts.hostname.lower()
+        if hostname in self.allowed_callback_hosts:
+            return url.strip()
+        if ANY_PUBLIC_HOST in self.allowed_callback_hosts and _resolves_to_public_addresses(hostname):
+            return url.strip()
+        raise InvalidCallbackUrl(f"callback_url host {parts.hostname} is not allowed")
+
+    # --- Producer side ---
+
+    def submit(self, kind: str, payload: bytes, filename: str, callback_url: Optional[str] = None) -> Dict[str, Any]:
+        """Store a job and wake a worker (blocking: call via asyncio.to_thread)"""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind}")
+        job_id = uuid.uuid4().hex
+        context = current_request()
+        now = time.time()
+        with self._lock:
+            pending = self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                ASYNC_JOBS.inc(kind, "rejected")
+                raise JobQueueFull(f"Job queue is full ({self.max_pending} pending), retry shortly")
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, filename, payload, request_id, callback_url, created_at, available_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, filename, payload, context.request_id if context else None, callback_url, now, now)
+            )
+        ASYNC_JOBS.inc(kind, "submitted")
+        self._notify()
+        return {"job_id": job_id, "status": QUEUED, "created_at": _iso(now)}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Public view of a job, None when unknown or already purged (blocking: call via asyncio.to_thread)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, status, filename, attempts, created_at, started_at, finished_at, result, error, "
+                "callback_url, callback_status FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "filename": row[3],
+            "attempts": row[4],
+            "created_at": _iso(row[5]),
+            "started_at": _iso(row[6]),
+            "finished_at": _iso(row[7]),
+            "result": json.loads(row[8]) if row[8] else None,
+            "error": row[9],
+            "callback_status": row[11] if row[10] else None
+        }
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # --- Worker side ---
+
+    def _claim(self) -> Optional[Tuple[str, str, str, bytes, Optional[str], int, float]]:
+        """Mark the oldest due job running and return it"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, filename, payload, request_id, attempts, available_at FROM jobs "
+                "WHERE status = ? AND available_at <= ? ORDER BY available_at, created_at LIMIT 1",
+                (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, now, row[0])
+            )
+        return row[0], row[1], row[2], row[3], row[4], row[5] + 1, row[6]
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]) -> bool:
+        """Record the outcome and drop the payload; True when a callback is due"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, finished_at = ?, "
+                "callback_status = CASE WHEN callback_url IS NULL THEN NULL ELSE ? END WHERE id = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error,
+                 time.time(), CALLBACK_PENDING, job_id)
+            )
+            row = self._db.execute("SELECT callback_url FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def _requeue(self, job_id: str, delay: float, refund_attempt: bool = False) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, started_at = NULL, attempts = attempts - ? WHERE id = ?",
+                (QUEUED, time.time() + delay, 1 if refund_attempt else 0, job_id)
+            )
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self._claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # There may be more due jobs; let another idle worker look
+            self._wakeup.set()
+            await self._process(*job)
+
+    async def _process(self, job_id: str, kind: str, filename: str, payload: bytes,
+                       request_id: Optional[str], attempt: int, available_at: float) -> None:
+        handler, retryable = self._handlers[kind]
+        JOB_QUEUE_WAIT_SECONDS.observe(time.time() - available_at, kind)
+
+        # Logs carry the submitting request's id, so a job can be traced back to its POST
+        token = bind_request(request_id or job_id)
+        annotate_request(job_id=job_id, job_kind=kind, attempt=attempt)
+        started = time.perf_counter()
+        outcome = SUCCEEDED
+        try:
+            result = await handler(payload, filename)
+            callback_due = await asyncio.to_thread(self._finish, job_id, SUCCEEDED, result, None)
+        except asyncio.CancelledError:
+            # Shutdown: the job runs again after the restart
+            await asyncio.shield(asyncio.to_thread(self._requeue, job_id, 0.0, True))
+            reset_request(token)
+            raise
+        except retryable as e:
+            # Back pressure, not a failure: wait it out (the pending limit bounds the backlog)
+            delay = max(getattr(e, "retry_after", 0.0) or 0.0, 1.0)
+            await asyncio.to_thread(self._requeue, job_id, delay, True)
+            outcome, callback_due = "deferred", False
+            logger.info("Job %s deferred %.1fs: %s", job_id, delay, e)
+        except Exception as e:
+            outcome = FAILED
+            logger.error("Job %s failed: %s", job_id, e, exc_info=e)
+            callback_due = await asyncio.to_thread(self._finish, job_id, FAILED, None, str(e))
+
+        ASYNC_JOBS.inc(kind, outcome)
+        context = current_request()
+        logger.info("Job %s (%s) -> %s", job_id, kind, outcome, extra={
+            "outcome": outcome,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "stages_ms": {stage: round(ms, 2) for stage, ms in context.stages_ms.items()},
+            **context.fields
+        })
+        reset_request(token)
+        if callback_due:
+            self._schedule_callback(job_id)
+
+    # --- Callbacks ---
+
+    def _schedule_callback(self, job_id: str) -> None:
+        task = asyncio.create_task(self._deliver(job_id))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    def _post_callback(self, url: str, body: bytes) -> int:
+        """POST the job JSON once; returns the HTTP status (0 on connection errors)"""
+        headers = {"Content-Type": "application/json"}
+        if Config.JOB_CALLBACK_SECRET:
+            signature = hmac.new(Config.JOB_CALLBACK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Signature"] = f"sha256={signature}"
+        request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        try:
+            with _CALLBACK_OPENER.open(request, timeout=Config.JOB_CALLBACK_TIMEOUT_SECONDS) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except (urllib.error.URLError, OSError) as e:
+            logger.debug("Callback connection error: %s", e)
+            return 0
+
+    def _pending_callback(self, job_id: str) -> Optional[Tuple[str, int, bytes]]:
+        """URL, attempts so far and JSON body of an undelivered callback (blocking)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT callback_url, callback_attempts FROM jobs WHERE id = ? AND callback_status = ?",
+                (job_id, CALLBACK_PENDING)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.dumps(self.get(job_id), ensure_ascii=False).encode("utf-8")
+
+    def _set_callback_status(self, job_id: str, status: str, attempts: Optional[int] = None) -> None:
+        """Record a delivery attempt and/or the callback's final state (blocking)"""
+        with self._lock:
+            if attempts is None:
+                self._db.execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (status, job_id))
+            else:
+                self._db.execute(
+                    "UPDATE jobs SET callback_attempts = ?, callback_status = ? WHERE id = ?",
+                    (attempts, status, job_id)
+                )
+
+    async def _deliver(self, job_id: str) -> None:
+        """Push the finished job to its callback URL, retrying with exponential backoff"""
+        pending = await asyncio.to_thread(self._pending_callback, job_id)
+        if pending is None:
+            return
+        url, attempts, body = pending
+
+        while attempts < Config.JOB_CALLBACK_MAX_ATTEMPTS:
+            if attempts:
+                await asyncio.sleep(min(2.0 ** attempts, 300.0))
+            try:
+                # Re-checked per attempt: the allow-list may have changed since submit, and DNS may now differ
+                await asyncio.to_thread(self.check_callback_url, url)
+            except InvalidCallbackUrl as e:
+                logger.error("Dropping callback for job %s: %s", job_id, e)
+                break
+            attempts += 1
+            status = await asyncio.to_thread(self._post_callback, url, body)
+            delivered = 200 <= status < 300
+            await asyncio.to_thread(
+                self._set_callback_status, job_id, CALLBACK_DELIVERED if delivered else CALLBACK_PENDING, attempts
+            )
+            if delivered:
+                JOB_CALLBACKS.inc("delivered")
+                return
+            JOB_CALLBACKS.inc("retried")
+            logger.warning("Callback for job %s failed (HTTP %s, attempt %d)", job_id, status or "error", attempts)
+
+        await asyncio.to_thread(self._set_callback_status, job_id, CALLBACK_FAILED)
+        JOB_CALLBACKS.inc("failed")
+        logger.error("Giving up on callback for job %s after %d attempts", job_id, attempts)
+
+    # --- Lifecycle ---
+
+    def _recover(self) -> Tuple[int, list]:
+        """Requeue jobs interrupted by a restart; returns (requeued, jobs with undelivered callbacks)"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, payload = NULL, error = ?, finished_at = ?, "
+                "callback_status = CASE WHEN callback_url IS NULL THEN NULL ELSE ? END "
+                "WHERE status = ? AND attempts >= ?",
+                (FAILED, "Interrupted too many times", now, CALLBACK_PENDING, RUNNING, self.max_attempts)
+            )
+            requeued = self._db.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, started_at = NULL WHERE status = ?",
+                (QUEUED, now, RUNNING)
+            ).rowcount
+            pending_callbacks = [row[0] for row in self._db.execute(
+                "SELECT id FROM jobs WHERE callback_status = ?", (CALLBACK_PENDING,)
+            )]
+        return requeued, pending_callbacks
+
+    def purge(self) -> int:
+        """Delete finished jobs older than JOB_RESULT_TTL_SECONDS"""
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ? AND "
+                "(callback_status IS NULL OR callback_status != ?)",
+                (SUCCEEDED, FAILED, time.time() - Config.JOB_RESULT_TTL_SECONDS, CALLBACK_PENDING)
+            ).rowcount
+
+    async def _purge_loop(self) -> None:
+        while True:
+            removed = await asyncio.to_thread(self.purge)
+            if removed:
+                logger.info("Purged %d finished jobs", removed)
+            await asyncio.sleep(self.PURGE_INTERVAL_SECONDS)
+
+    async def start(self) -> None:
+        """Recover interrupted jobs and start the workers on the running event loop"""
+        if self._tasks:
+            return
+        requeued, pending_callbacks = await asyncio.to_thread(self._recover)
+        if requeued or pending_callbacks:
+            logger.info("Job queue recovered %d interrupted jobs and %d undelivered callbacks",
+                        requeued, len(pending_callbacks))
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+        for job_id in pending_callbacks:
+            self._schedule_callback(job_id)
+
+    async def stop(self) -> None:
+        """Cancel workers (running jobs go back to the queue) and pending callback deliveries"""
+        tasks = self._tasks + list(self._callbacks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """Job counts by state for status endpoints (blocking: call via asyncio.to_thread)"""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            callbacks = self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE callback_status = ?", (CALLBACK_PENDING,)
+            ).fetchone()[0]
+        return {
+            "workers": self.workers,
+            "running": bool(self._tasks),
+            "max_pending": self.max_pending,
+            "jobs": counts,
+            "pending_callbacks": callbacks,
+            "db_path": self.db_path
+        }
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp is not None else None
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get singleton job queue instance"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
@@ -0,0 +1,295 @@
+import io
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config.config import Config
+from utils.result_cache import ResultCache, SERVICE_ROOT
+from utils.text_matching import SKILL_ALIASES, STOPWORDS, tokenize, extract_skills
+
+logger = logging.getLogger(__name__)
+
+# (title, description) kept per posting for Gemini re-ranking
+StoredJob = Tuple[Optional[str], str]
+
+
+@dataclass
+class _JobVector:
+    """Hashed term frequencies of one posting (before IDF weighting)"""
+    features: np.ndarray  # int32 feature ids, unique
+    counts: np.ndarray  # float32 term frequencies
+
+
+class JobVectorIndex:
+    """Hashed TF-IDF vectors of job postings, scored against a CV in one vectorised pass.
+
+    Postings live in a column-major (CSC-like) matrix: for every feature the rows
+    of the jobs containing it, so scoring a CV is a gather over the CV's features
+    plus one np.bincount. Upserts and deletes go to a small delta set (scored
+    directly) and a deleted-row mask; the matrix is rebuilt once the delta
+    grows past JOB_INDEX_REBUILD_THRESHOLD, and lazily before ranking once the
+    delta is more than JOB_INDEX_REBUILD_FRACTION of all postings (IDF comes
+    from the last rebuild, so it must not lag far behind a small corpus).
+    Snapshots store the term frequencies and stored (title, description) per
+    posting in an .npz file; restoring needs no re-tokenizing, only one rebuild.
+    """
+
+    SNAPSHOT_FORMAT = 1
+
+    def __init__(self, n_features: int = None, skill_weight: float = None, rebuild_threshold: int = None,
+                 rebuild_fraction: float = None, snapshot_path: str = None):
+        self.n_features = Config.JOB_INDEX_FEATURES if n_features is None else n_features
+        self.skill_weight = Config.JOB_INDEX_SKILL_WEIGHT if skill_weight is None else skill_weight
+        self.rebuild_threshold = Config.JOB_INDEX_REBUILD_THRESHOLD if rebuild_threshold is None else rebuild_threshold
+        self.rebuild_fraction = Config.JOB_INDEX_REBUILD_FRACTION if rebuild_fraction is None else rebuild_fraction
+        path = Config.JOB_INDEX_SNAPSHOT_PATH if snapshot_path is None else snapshot_path
+        if path and not os.path.isabs(path):
+            path = os.path.join(SERVICE_ROOT, path)
+        self.snapshot_path = path
+
+        self._vectors: Dict[str, _JobVector] = {}
+        self._stored: Dict[str, StoredJob] = {}
+        self._lock = threading.RLock()
+        self._changes_since_snapshot = 0
+        self._last_snapshot_at: Optional[float] = None
+
+        # Built matrix (immutable between rebuilds)
+        self._row_ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._indptr = np.zeros(self.n_features + 1, dtype=np.int64)
+        self._rows = np.zeros(0, dtype=np.int32)
+        self._data = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._idf = np.ones(self.n_features, dtype=np.float32)
+
+        # Changes since the last rebuild
+        self._delta: Dict[str, np.ndarray] = {}
+
+    def vectorize(self, text: str, skills: Optional[List[str]] = None) -> _JobVector:
+        """Hash words and (boosted) canonical skills into sparse term frequencies"""
+        counts = Counter(zlib.crc32(token.encode("utf-8")) % self.n_features for token in tokenize(text))
+        for skill in set(skills or []) | extract_skills(text):
+            feature = zlib.crc32(f"skill:{skill.lower()}".encode("utf-8")) % self.n_features
+            counts[feature] += self.skill_weight
+
+        features = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        order = np.argsort(features)
+        return _JobVector(features[order], values[order])
+
+    def _weigh(self, vector: _JobVector) -> np.ndarray:
+        """TF-IDF weights of a vector, L2-normalised"""
+        weights = (1.0 + np.log(vector.counts)) * self._idf[vector.features]
+        norm = np.linalg.norm(weights)
+        return weights / norm if norm else weights
+
+    def upsert(self, job_id: str, text: str, skills: Optional[List[str]] = None, stored: Optional[StoredJob] = None) -> None:
+        """Add or replace a posting"""
+        self.upsert_many([(job_id, text, skills)], {job_id: stored} if stored else None)
+
+    def upsert_many(self, jobs: List[Tuple[str, str, Optional[List[str]]]],
+                    stored: Optional[Dict[str, StoredJob]] = None) -> None:
+        """Add or replace postings (with their stored title/description), rebuilding at most once"""
+        vectors = [(job_id, self.vectorize(text, skills)) for job_id, text, skills in jobs]
+        with self._lock:
+            for job_id, vector in vectors:
+                self._vectors[job_id] = vector
+                self._stored[job_id] = (stored or {}).get(job_id) or (None, "")
+                self._delta[job_id] = self._weigh(vector)
+                row = self._row_of.get(job_id)
+                if row is not None:
+                    self._alive[row] = False
+            self._changes_since_snapshot += len(vectors)
+            if len(self._delta) > self.rebuild_threshold:
+                self.rebuild()
+
+    def delete(self, job_id: str) -> bool:
+        """Remove a posting; False if it was not indexed"""
+        with self._lock:
+            if self._vectors.pop(job_id, None) is None:
+                return False
+            self._stored.pop(job_id, None)
+            self._delta.pop(job_id, None)
+            row = self._row_of.get(job_id)
+            if row is not None:
+                self._alive[row] = False
+            self._changes_since_snapshot += 1
+            return True
+
+    def stored(self, job_id: str) -> Optional[StoredJob]:
+        """(title, description) of an indexed posting, None once it is deleted"""
+        return self._stored.get(job_id)
+
+    def rebuild(self) -> None:
+        """Recompute IDF and the column-major matrix from all current postings"""
+        with self._lock:
+            row_ids = list(self._vectors)
+            vectors = [self._vectors[job_id] for job_id in row_ids]
+            n_jobs = len(row_ids)
+
+            if n_jobs:
+                features = np.concatenate([v.features for v in vectors])
+                lengths = np.fromiter((len(v.features) for v in vectors), dtype=np.int64, count=n_jobs)
+                document_frequency = np.bincount(features, minlength=self.n_features)
+                self._idf = (np.log((1 + n_jobs) / (1 + document_frequency)) + 1).astype(np.float32)
+
+                data = np.concatenate([self._weigh(v) for v in vectors]).astype(np.float32)
+                rows = np.repeat(np.arange(n_jobs, dtype=np.int32), lengths)
+                order = np.argsort(features, kind="stable")
+                self._rows = rows[order]
+                self._data = data[order]
+                self._indptr = np.concatenate(([0], np.cumsum(np.bincount(features, minlength=self.n_features))))
+            else:
+                self._rows = np.zeros(0, dtype=np.int32)
+                self._data = np.zeros(0, dtype=np.float32)
+                self._indptr = np.zeros(self.n_features + 1, dtype=np.int64)
+
+            self._row_ids = row_ids
+            self._row_of = {job_id: row for row, job_id in enumerate(row_ids)}
+            self._alive = np.ones(n_jobs, dtype=bool)
+            self._delta = {}
+
+    def rank(self, text: str, top_k: int, skills: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """Top-k (job_id, cosine similarity) for a CV, best first"""
+        query = self.vectorize(text, skills)
+        with self._lock:
+            if self._delta and len(self._delta) > self.rebuild_fraction * len(self._vectors):
+                self.rebuild()
+            weights = self._weigh(query)
+            candidates: List[Tuple[str, float]] = []
+
+            if self._row_ids:
+                # Gather the postings of the CV's features and accumulate per job
+                starts = self._indptr[query.features]
+                ends = self._indptr[query.features + 1]
+                sizes = ends - starts
+                if sizes.sum():
+                    positions = np.repeat(ends - sizes.cumsum(), sizes) + np.arange(sizes.sum())
+                    rows = self._rows[positions]
+                    values = self._data[positions] * np.repeat(weights, sizes)
+                    scores = np.bincount(rows, weights=values, minlength=len(self._row_ids))
+                    scores[~self._alive] = 0.0
+
+                    k = min(top_k, len(scores))
+                    top = np.argpartition(-scores, k - 1)[:k]
+                    candidates = [(self._row_ids[row], float(scores[row])) for row in top if scores[row] > 0]
+
+            # Postings changed since the last rebuild are few - score them directly
+            for job_id, job_weights in self._delta.items():
+                vector = self._vectors[job_id]
+                common, query_pos, job_pos = np.intersect1d(
+                    query.features, vector.features, assume_unique=True, return_indices=True
+                )
+                if len(common):
+                    candidates.append((job_id, float(np.dot(weights[query_pos], job_weights[job_pos]))))
+
+        candidates.sort(key=lambda item: item[1], reverse=True)
+        return candidates[:top_k]
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def job_ids(self) -> List[str]:
+        """Ids of all indexed postings"""
+        with self._lock:
+            return list(self._vectors)
+
+    @property
+    def unsaved_changes(self) -> int:
+        return self._changes_since_snapshot
+
+    def fingerprint(self) -> str:
+        """Hashing/tokenizer version; snapshots written under another one are discarded"""
+        return ResultCache.make_version(
+            json.dumps(SKILL_ALIASES, sort_keys=True, ensure_ascii=False),
+            ",".join(sorted(STOPWORDS)),
+            f"features={self.n_features}:skill_weight={self.skill_weight}"
+        )
+
+    def snapshot(self) -> bool:
+        """Atomically write term frequencies and stored texts to JOB_INDEX_SNAPSHOT_PATH"""
+        if not self.snapshot_path:
+            return False
+        # Vectors are replaced, never mutated, so copying the dicts is a consistent view
+        with self._lock:
+            vectors = dict(self._vectors)
+            stored = dict(self._stored)
+            changes = self._changes_since_snapshot
+
+        job_ids = list(vectors)
+        meta = {
+            "format": self.SNAPSHOT_FORMAT,
+            "fingerprint": self.fingerprint(),
+            "ids": job_ids,
+            "stored": [list(stored.get(job_id, (None, ""))) for job_id in job_ids]
+        }
+        arrays = {
+            "lengths": np.fromiter((len(vectors[job_id].features) for job_id in job_ids), dtype=np.int64, count=len(job_ids)),
+            "features": np.concatenate([vectors[job_id].features for job_id in job_ids]) if job_ids else np.zeros(0, dtype=np.int32),
+            "counts": np.concatenate([vectors[job_id].counts for job_id in job_ids]) if job_ids else np.zeros(0, dtype=np.float32),
+            "meta": np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+        }
+
+        temp_path = f"{self.snapshot_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+            with open(temp_path, "wb") as f:
+                f.write(buffer.getbuffer())
+            os.replace(temp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning("Job index snapshot failed (%s): %s", self.snapshot_path, e)
+            return False
+
+        with self._lock:
+            self._changes_since_snapshot -= changes
+            self._last_snapshot_at = time.time()
+        return True
+
+    def restore(self) -> bool:
+        """Load the last snapshot and rebuild the matrix from it, without re-tokenizing any posting"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                lengths, features, counts = data["lengths"], data["features"], data["counts"]
+        except Exception as e:
+            logger.warning("Job index snapshot unreadable (%s): %s", self.snapshot_path, e)
+            return False
+        if meta.get("format") != self.SNAPSHOT_FORMAT or meta.get("fingerprint") != self.fingerprint():
+            logger.warning("Job index snapshot was written by another tokenizer/hashing version, ignoring it")
+            return False
+
+        splits = np.cumsum(lengths)[:-1]
+        vectors = {
+            job_id: _JobVector(job_features, job_counts)
+            for job_id, job_features, job_counts in zip(meta["ids"], np.split(features, splits), np.split(counts, splits))
+        }
+        with self._lock:
+            self._vectors = vectors
+            self._stored = {job_id: (title, text) for job_id, (title, text) in zip(meta["ids"], meta["stored"])}
+            self.rebuild()
+            self._changes_since_snapshot = 0
+            self._last_snapshot_at = os.path.getmtime(self.snapshot_path)
+        return True
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """Index size and snapshot state for status endpoints"""
+        with self._lock:
+            return {
+                "jobs": len(self._vectors),
+                "pending_changes": len(self._delta),
+                "nonzeros": int(len(self._data)),
+                "features": self.n_features,
+                "unsaved_changes": self._changes_since_snapshot,
+                "last_snapshot_at": self._last_snapshot_at,
+                "snapshot_path": self.snapshot_path or None
+            }
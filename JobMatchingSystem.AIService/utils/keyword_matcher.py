@@ -0,0 +1,115 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+def _build_fold_table() -> Dict[int, str]:
+    """Precomposed Latin letters -> base letter (ệ -> e, Ư -> U), plus đ/Đ which do not decompose"""
+    table = {ord("đ"): "d", ord("Đ"): "D"}
+    for code in range(0xC0, 0x1F00):
+        base = unicodedata.normalize("NFD", chr(code))[0]
+        if base != chr(code) and base.isascii() and base.isalpha():
+            table[code] = base
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold_diacritics(text: str) -> str:
+    """Strip Vietnamese (and other Latin) diacritics; one translate pass, length preserved"""
+    return text.translate(_FOLD_TABLE)
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation shaped as a trie, so each position is tested against a shared prefix
+    tree instead of every keyword, and the longest keyword starting there wins"""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+@dataclass(frozen=True)
+class KeywordHits:
+    """Keywords found in one text and, per category, how many distinct ones matched"""
+    keywords: FrozenSet[str]
+    counts: Dict[str, int]
+
+    def has(self, category: str) -> bool:
+        return self.counts.get(category, 0) > 0
+
+    def count(self, category: str) -> int:
+        return self.counts.get(category, 0)
+
+
+class KeywordMatcher:
+    """Finds which keyword categories occur in a text in a single regex pass.
+
+    Matching has the same meaning as `keyword in text.lower()` for every
+    keyword: the compiled trie finds the longest keyword at each hit, keywords
+    contained in it are credited along with it, and scanning resumes where a
+    longer keyword could still start inside the hit. With fold_diacritics,
+    keywords and text are compared without Vietnamese tone/vowel marks
+    ("kinh nghiem" matches "kinh nghiệm").
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], fold_diacritics: bool = False):
+        self.fold_diacritics = fold_diacritics
+        categories_of: Dict[str, List[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                categories_of.setdefault(self.normalize(keyword), []).append(category)
+        self.categories = tuple(categories)
+        self._categories_of: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(dict.fromkeys(cats)) for keyword, cats in categories_of.items()
+        }
+
+        keywords = list(self._categories_of)
+        self._pattern = re.compile(_trie_pattern(keywords))
+        # Keywords occurring inside each keyword (itself included) - found whenever it is
+        self._implied: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(other for other in keywords if other in keyword) for keyword in keywords
+        }
+        # Offset after a hit's start where another keyword may begin and run past the hit
+        self._resume: Dict[str, int] = {
+            keyword: next(
+                (offset for offset in range(1, len(keyword))
+                 if any(len(other) > len(keyword) - offset and other.startswith(keyword[offset:]) for other in keywords)),
+                len(keyword)
+            )
+            for keyword in keywords
+        }
+
+    def normalize(self, text: str) -> str:
+        text = text.lower()
+        return fold_diacritics(text) if self.fold_diacritics else text
+
+    def scan(self, text: str) -> KeywordHits:
+        """All keywords present in text, with distinct-keyword counts per category"""
+        text = self.normalize(text)
+        found = set()
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            keyword = match.group()
+            found.update(self._implied[keyword])
+            match = search(text, match.start() + self._resume[keyword])
+
+        counts: Dict[str, int] = {}
+        for keyword in found:
+            for category in self._categories_of[keyword]:
+                counts[category] = counts.get(category, 0) + 1
+        return KeywordHits(frozenset(found), counts)
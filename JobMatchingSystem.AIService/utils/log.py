@@ -0,0 +1,136 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import traceback
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from config.config import Config
+
+
+@dataclass
+class _RequestContext:
+    """Per-request fields attached to every record logged while handling it"""
+    request_id: str
+    fields: Dict[str, Any] = field(default_factory=dict)
+    stages_ms: Dict[str, float] = field(default_factory=dict)
+
+
+_request_context: ContextVar[Optional[_RequestContext]] = ContextVar("request_context", default=None)
+
+
+def bind_request(request_id: str):
+    """Start a request context (returns a token for reset_request)"""
+    return _request_context.set(_RequestContext(request_id))
+
+
+def reset_request(token) -> None:
+    _request_context.reset(token)
+
+
+def current_request() -> Optional[_RequestContext]:
+    return _request_context.get()
+
+
+def annotate_request(**fields: Any) -> None:
+    """Attach fields (e.g. the answering model) to the current request's completion record"""
+    context = _request_context.get()
+    if context is not None:
+        context.fields.update(fields)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Add a stage duration to the current request (repeated stages are summed)"""
+    context = _request_context.get()
+    if context is not None:
+        context.stages_ms[stage] = context.stages_ms.get(stage, 0.0) + seconds * 1000
+
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RequestQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread; only the cheap parts run on the caller's thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Message interpolation and traceback capture must happen here (args and frames may
+        # change once we return); JSON encoding and the write are left to the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        context = _request_context.get()
+        if context is not None and "request_id" not in record.__dict__:
+            record.request_id = context.request_id
+        return record
+
+
+# Service loggers follow LOG_LEVEL; third-party libraries (httpx, google-genai) stay at WARNING
+# unless raised through LOG_LEVELS
+APP_LOGGERS = ("ai_service", "config", "services", "utils")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """'utils.gemini_client=DEBUG,utils.result_cache=WARNING' -> {module: level}"""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> None:
+    """Route all logging through a queue to a background writer thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [_RequestQueueHandler(log_queue)]
+    root.setLevel(logging.WARNING)
+    for name in APP_LOGGERS:
+        logging.getLogger(name).setLevel(Config.LOG_LEVEL.upper())
+    for name, level in _parse_levels(Config.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
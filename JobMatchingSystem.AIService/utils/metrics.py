@@ -0,0 +1,205 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.log import record_stage
+
+
+# Request/stage latencies in seconds: 1ms .. 60s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """Base for metrics with a fixed set of label names; label values are passed positionally"""
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, label_values: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {label_values}")
+        return label_values
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_number(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram (one bisect and three additions per observation).
+
+    Histograms given a `stage` name also add each observation to the current
+    request's stage timings, which end up in its completion log record.
+    """
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, stage: Optional[str] = None):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.stage = stage
+        # label values -> [per-bucket counts (last = +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        key = self._key(label_values)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+        if self.stage is not None:
+            record_stage(self.stage, value)
+
+    @contextmanager
+    def time(self, *label_values: str):
+        """Observe the duration of the with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                bucket_labels = _format_labels(self.label_names, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """All metrics of the process, rendered in the Prometheus text format"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Stage latencies
+REQUEST_SECONDS = Histogram(
+    "ai_service_request_duration_seconds", "Total request time by endpoint", ["handler", "status"]
+)
+UPLOAD_READ_SECONDS = Histogram(
+    "ai_service_upload_read_seconds", "Time to stream one upload into memory", stage="upload_read"
+)
+TEXT_EXTRACTION_SECONDS = Histogram(
+    "ai_service_text_extraction_seconds", "Document text extraction time (queue wait included)", ["file_type"],
+    stage="text_extraction"
+)
+PROMPT_BUILD_SECONDS = Histogram(
+    "ai_service_prompt_build_seconds", "Time to build a Gemini prompt", ["prompt"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05), stage="prompt_build"
+)
+GEMINI_CALL_SECONDS = Histogram(
+    "ai_service_gemini_call_seconds", "Gemini generate call time by model and outcome", ["model", "outcome"],
+    stage="gemini_call"
+)
+CONFIDENCE_SCORING_SECONDS = Histogram(
+    "ai_service_confidence_scoring_seconds", "Time to score the confidence of a validation verdict",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005),
+    stage="confidence_scoring"
+)
+JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "ai_service_job_queue_wait_seconds", "Time a due async job waited for a free worker", ["kind"]
+)
+
+# Counters
+GEMINI_FALLBACKS = Counter(
+    "ai_service_gemini_fallbacks_total",
+    "Requests not answered by the first model tried (kind=model: a fallback model answered, "
+    "kind=error_response: every model failed)",
+    ["kind"]
+)
+GEMINI_QUOTA_ERRORS = Counter("ai_service_gemini_quota_errors_total", "Quota (429) errors by model", ["model"])
+GEMINI_TOKENS = Counter(
+    "ai_service_gemini_tokens_total", "Gemini tokens by model and type (prompt, completion, cached)", ["model", "type"]
+)
+CACHE_REQUESTS = Counter(
+    "ai_service_cache_requests_total", "Result cache lookups by namespace and result (hit, miss)", ["namespace", "result"]
+)
+FAST_PATH_DECISIONS = Counter(
+    "ai_service_fast_path_decisions_total",
+    "Pre-classifier outcomes (local: answered without Gemini, shadow: decided but re-checked, model: undecided)",
+    ["decision"]
+)
+COALESCED_CALLS = Counter(
+    "ai_service_coalesced_calls_total", "Calls that joined an identical call already in flight, by scope", ["scope"]
+)
+ASYNC_JOBS = Counter(
+    "ai_service_async_jobs_total",
+    "Async jobs by kind and outcome (submitted, rejected, succeeded, failed, deferred)",
+    ["kind", "outcome"]
+)
+JOB_CALLBACKS = Counter(
+    "ai_service_job_callbacks_total", "Job callback deliveries (delivered, retried, failed)", ["outcome"]
+)
@@ -1,42 +1,42 @@
-import tempfile
-import os
+import io
+import logging
 from typing import Optional, Tuple
 import PyPDF2
 from config.config import Config
 
+logger = logging.getLogger(__name__)
+
 
 class PDFProcessor:
     """Utility class for PDF processing"""
     
     @staticmethod
-    def extract_text_from_bytes(pdf_bytes: bytes) -> str:
-        """Extract text from PDF bytes"""
+    def extract_text_from_bytes(pdf_bytes: bytes, max_chars: Optional[int] = None) -> str:
+        """Extract text from PDF bytes (stopping once `max_chars` are collected)"""
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                tmp.write(pdf_bytes)
-                tmp_path = tmp.name
-
-            reader = PyPDF2.PdfReader(tmp_path)
-            text = ""
-            
-            for page in reader.pages:
-                try:
-                    extracted = page.extract_text()
-                    if extracted:
-                        text += extracted + "\n"
-                except Exception as e:
-                    print(f"Error extracting text from page: {e}")
-                    continue
-            
-            # Clean up temp file
-            os.unlink(tmp_path)
-            
-            return text.strip()
-            
+            return PDFProcessor._extract_text(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)), max_chars)
         except Exception as e:
-            print(f"Error processing PDF: {e}")
+            logger.warning("Error processing PDF: %s", e)
             return ""
     
+    @staticmethod
+    def _extract_text(reader: PyPDF2.PdfReader, max_chars: Optional[int] = None) -> str:
+        """Extract text from an already opened PDF reader, page by page"""
+        text = ""
+        
+        for page in reader.pages:
+            try:
+                extracted = page.extract_text()
+                if extracted:
+                    text += extracted + "\n"
+            except Exception as e:
+                logger.warning("Error extracting text from page: %s", e)
+                continue
+            if max_chars is not None and len(text.rstrip()) >= max_chars:
+                break
+        
+        return text.strip()
+    
     @staticmethod
     def validate_pdf_file(file_content: bytes, filename: str) -> Tuple[bool, Optional[str]]:
         """Validate PDF file size, type, and content"""
@@ -56,7 +56,8 @@ class PDFProcessor:
         
         # Try to extract text to verify it's a valid PDF
         try:
-            text = PDFProcessor.extract_text_from_bytes(file_content)
+            # Only the minimum length matters here - stop extracting once it is reached
+            text = PDFProcessor.extract_text_from_bytes(file_content, Config.PDF_MIN_TEXT_LENGTH)
             if len(text) < Config.PDF_MIN_TEXT_LENGTH:
                 return False, f"PDF contains insufficient text content (minimum {Config.PDF_MIN_TEXT_LENGTH} characters required)"
         except Exception as e:
@@ -68,11 +69,8 @@ class PDFProcessor:
     def get_pdf_info(file_content: bytes, filename: str) -> dict:
         """Get basic information about the PDF file"""
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                tmp.write(file_content)
-                tmp_path = tmp.name
-
-            reader = PyPDF2.PdfReader(tmp_path)
+            # Parse straight from memory - no temp file round trip
+            reader = PyPDF2.PdfReader(io.BytesIO(file_content))
             
             info = {
                 "filename": filename,
@@ -82,9 +80,8 @@ class PDFProcessor:
                 "has_metadata": False
             }
             
-            # Extract text length
-            text = PDFProcessor.extract_text_from_bytes(file_content)
-            info["text_length"] = len(text)
+            # Extract text length (reusing the open reader)
+            info["text_length"] = len(PDFProcessor._extract_text(reader))
             
             # Check for metadata
             if reader.metadata:
@@ -95,9 +92,6 @@ class PDFProcessor:
                     "creator": reader.metadata.get('/Creator', '')
                 }
             
-            # Clean up
-            os.unlink(tmp_path)
-            
             return info
             
         except Exception as e:
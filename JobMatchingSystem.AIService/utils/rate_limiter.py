@@ -0,0 +1,182 @@
+import asyncio
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any
+from config.config import Config
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted within the allowed wait"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds (at least 1)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """Thread-safe token bucket that supports reservations (tokens may go negative)"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    def reserve(self, amount: float, max_wait: float) -> Optional[float]:
+        """Reserve tokens; return seconds to wait before using them, or None if above max_wait"""
+        with self._lock:
+            self._refill()
+            wait = self._wait_for(amount)
+            if wait > max_wait:
+                return None
+            self._tokens -= amount
+            return wait
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens would be available"""
+        with self._lock:
+            self._refill()
+            return self._wait_for(amount)
+
+    def refund(self, amount: float) -> None:
+        """Give back (or, with a negative amount, take) tokens after the fact"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def _wait_for(self, amount: float) -> float:
+        if self._tokens >= amount:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return math.inf
+        return (amount - self._tokens) / self.refill_per_second
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class _ModelLimits:
+    """Buckets and concurrency cap for a single model"""
+
+    def __init__(self, rpm: int, tpm: int, max_in_flight: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0)
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.rejected = 0
+
+
+class ModelRateLimiter:
+    """Client-side RPM/TPM token buckets and max-in-flight semaphore per Gemini model"""
+
+    def __init__(self):
+        self._limits: Dict[str, _ModelLimits] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, model: str) -> _ModelLimits:
+        with self._lock:
+            limits = self._limits.get(model)
+            if limits is None:
+                override = Config.GEMINI_MODEL_RATE_LIMITS.get(model, {})
+                limits = _ModelLimits(
+                    rpm=int(override.get("rpm", Config.GEMINI_RPM_LIMIT)),
+                    tpm=int(override.get("tpm", Config.GEMINI_TPM_LIMIT)),
+                    max_in_flight=int(override.get("max_in_flight", Config.GEMINI_MAX_IN_FLIGHT))
+                )
+                self._limits[model] = limits
+            return limits
+
+    @staticmethod
+    def estimate_tokens(prompt: str) -> int:
+        """Rough token estimate for a prompt plus the expected completion"""
+        return len(prompt) // 4 + Config.GEMINI_ESTIMATED_OUTPUT_TOKENS
+
+    def _reserve(self, model: str, limits: _ModelLimits, tokens: int, max_wait: float) -> float:
+        """Reserve one request and `tokens` tokens or raise RateLimitExceeded"""
+        request_wait = limits.requests.reserve(1, max_wait)
+        if request_wait is None:
+            limits.rejected += 1
+            raise RateLimitExceeded(
+                f"RPM limit reached for {model}", limits.requests.wait_time(1)
+            )
+
+        token_wait = limits.tokens.reserve(tokens, max_wait)
+        if token_wait is None:
+            limits.requests.refund(1)
+            limits.rejected += 1
+            raise RateLimitExceeded(
+                f"TPM limit reached for {model}", limits.tokens.wait_time(tokens)
+            )
+
+        return max(request_wait, token_wait)
+
+    @asynccontextmanager
+    async def acquire(self, model: str, tokens: int, max_wait: float = None):
+        """Admit one call to `model`, waiting at most `max_wait` seconds in total"""
+        max_wait = Config.GEMINI_RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        limits = self._get(model)
+        deadline = time.monotonic() + max_wait
+
+        if limits.semaphore is None:
+            limits.semaphore = asyncio.Semaphore(limits.max_in_flight)
+        try:
+            await asyncio.wait_for(limits.semaphore.acquire(), timeout=max_wait)
+        except asyncio.TimeoutError:
+            limits.rejected += 1
+            raise RateLimitExceeded(f"Too many in-flight requests for {model}", max_wait)
+
+        try:
+            wait = self._reserve(model, limits, tokens, max(0.0, deadline - time.monotonic()))
+            if wait > 0:
+                await asyncio.sleep(wait)
+            limits.in_flight += 1
+            try:
+                yield
+            finally:
+                limits.in_flight -= 1
+        finally:
+            limits.semaphore.release()
+
+    def try_acquire(self, model: str, tokens: int) -> None:
+        """Non-blocking admission for the synchronous code path"""
+        self._reserve(model, self._get(model), tokens, 0.0)
+
+    def record_usage(self, model: str, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the TPM bucket once the real token usage is known"""
+        self._get(model).tokens.refund(estimated_tokens - actual_tokens)
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """Get current bucket levels per model"""
+        with self._lock:
+            limits = dict(self._limits)
+        return {
+            model: {
+                "rpm": l.rpm,
+                "tpm": l.tpm,
+                "max_in_flight": l.max_in_flight,
+                "requests_available": round(l.requests.available, 2),
+                "tokens_available": round(l.tokens.available),
+                "in_flight": l.in_flight,
+                "rejected": l.rejected
+            }
+            for model, l in limits.items()
+        }
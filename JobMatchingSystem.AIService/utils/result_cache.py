@@ -0,0 +1,289 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Set
+from config.config import Config
+from utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Disk writes between size checks (the SQLite tier may overshoot its bound by this much)
+EVICT_EVERY_WRITES = 100
+
+
+class ResultCache:
+    """Two-tier (in-memory LRU + SQLite) cache for AI results keyed by content hash.
+    
+    The memory tier is served on the event loop. The SQLite tier is attached by
+    open() (from the app lifespan, not at import) and every query on it runs in
+    a worker thread: reads are awaited, writes are written behind.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        version: str,
+        ttl_seconds: int = None,
+        memory_max_entries: int = None,
+        db_path: Optional[str] = None,
+        db_max_entries: int = None
+    ):
+        self.namespace = namespace
+        self.version = version
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.CACHE_TTL_SECONDS
+        self.memory_max_entries = memory_max_entries if memory_max_entries is not None else Config.CACHE_MEMORY_MAX_ENTRIES
+        self.db_max_entries = db_max_entries if db_max_entries is not None else Config.CACHE_DB_MAX_ENTRIES
+
+        self.db_path = Config.CACHE_DB_PATH if db_path is None else db_path
+
+        self._memory: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # The SQLite connection is only used from worker threads, under its own lock
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_entries = 0
+        self._writes_since_evict = 0
+        self._pending_writes: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_bytes(content: bytes) -> str:
+        """SHA-256 hex digest used as the content-addressed cache key"""
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def make_version(*parts: str) -> str:
+        """Build a short version fingerprint (prompt, model, ...) for invalidation"""
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def open(self) -> None:
+        """Attach the SQLite tier and drop entries written under another version (blocking)"""
+        db_path = self.db_path
+        if not db_path or self._db is not None:
+            return
+        try:
+            if not os.path.isabs(db_path):
+                db_path = os.path.join(SERVICE_ROOT, db_path)
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+            db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS result_cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_result_cache_accessed ON result_cache (namespace, accessed_at)"
+            )
+
+            # Prompt/model changed since these rows were written - invalidate them
+            db.execute(
+                "DELETE FROM result_cache WHERE namespace = ? AND (version != ? OR expires_at < ?)",
+                (self.namespace, self.version, time.time())
+            )
+            disk_entries = db.execute(
+                "SELECT COUNT(*) FROM result_cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+        except Exception as e:
+            logger.warning("Result cache disk tier disabled (%s): %s", db_path, e)
+            return
+
+        with self._db_lock:
+            self._db = db
+            self._disk_entries = disk_entries
+            self._writes_since_evict = 0
+
+    async def close(self) -> None:
+        """Finish pending disk writes and detach the SQLite tier"""
+        await self.flush()
+        with self._db_lock:
+            db, self._db = self._db, None
+        if db is not None:
+            db.close()
+
+    async def flush(self) -> None:
+        """Wait for the writes still running behind set()/invalidate()"""
+        while self._pending_writes:
+            await asyncio.gather(*list(self._pending_writes), return_exceptions=True)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result, promoting disk hits into memory"""
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    CACHE_REQUESTS.inc(self.namespace, "hit")
+                    return value
+                del self._memory[key]
+
+        row = await asyncio.to_thread(self._disk_get, key, now) if self._db is not None else None
+
+        with self._lock:
+            if row is not None:
+                value, expires_at = row
+                self._memory_put(key, value, expires_at)
+                self.hits += 1
+                CACHE_REQUESTS.inc(self.namespace, "hit")
+                return value
+
+            self.misses += 1
+            CACHE_REQUESTS.inc(self.namespace, "miss")
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result in memory now and on disk in the background, evicting least recently used entries"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+
+        with self._lock:
+            self._memory_put(key, value, expires_at)
+
+        if self._db is not None:
+            self._write_behind(self._disk_set, key, json.dumps(value, ensure_ascii=False), expires_at, now)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Remove one key, or the whole namespace when key is None"""
+        with self._lock:
+            if key is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(key, None)
+
+        if self._db is not None:
+            self._write_behind(self._disk_delete, key)
+
+    def _write_behind(self, func, *args) -> None:
+        """Run a disk write in a worker thread (inline when no event loop is running)"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            func(*args)
+            return
+        task = loop.create_task(asyncio.to_thread(func, *args))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        """Read one row from the SQLite tier (worker thread)"""
+        with self._db_lock:
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM result_cache WHERE namespace = ? AND key = ? AND version = ?",
+                    (self.namespace, key, self.version)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] >= now:
+                    self._db.execute(
+                        "UPDATE result_cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                        (now, self.namespace, key)
+                    )
+                    return json.loads(row[0]), row[1]
+                self._db.execute(
+                    "DELETE FROM result_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                )
+                self._disk_entries -= 1
+            except Exception as e:
+                logger.warning("Result cache read error: %s", e)
+            return None
+
+    def _disk_set(self, key: str, value_json: str, expires_at: float, now: float) -> None:
+        """Write one row to the SQLite tier (worker thread)"""
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO result_cache (namespace, key, version, value, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, self.version, value_json, expires_at, now)
+                )
+                # Upper bound until the next eviction pass recounts (replacements are counted too)
+                self._disk_entries += 1
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= EVICT_EVERY_WRITES:
+                    self._evict_disk()
+            except Exception as e:
+                logger.warning("Result cache write error: %s", e)
+
+    def _disk_delete(self, key: Optional[str]) -> None:
+        """Delete one key, or the whole namespace, from the SQLite tier (worker thread)"""
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                if key is None:
+                    self._db.execute("DELETE FROM result_cache WHERE namespace = ?", (self.namespace,))
+                    self._disk_entries = 0
+                else:
+                    deleted = self._db.execute(
+                        "DELETE FROM result_cache WHERE namespace = ? AND key = ?",
+                        (self.namespace, key)
+                    ).rowcount
+                    self._disk_entries -= max(deleted, 0)
+            except Exception as e:
+                logger.warning("Result cache invalidate error: %s", e)
+
+    def _memory_put(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        """Insert into the LRU tier (caller holds the lock)"""
+        if self.memory_max_entries <= 0:
+            return
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        """Recount and trim the SQLite tier to its size bound (caller holds the db lock)"""
+        self._writes_since_evict = 0
+        count = self._db.execute(
+            "SELECT COUNT(*) FROM result_cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        overflow = count - self.db_max_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM result_cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM result_cache WHERE namespace = ? ORDER BY accessed_at ASC LIMIT ?)",
+                (self.namespace, self.namespace, overflow)
+            )
+            count -= overflow
+        self._disk_entries = count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes (disk size as of the last write, no query)"""
+        disk_entries = self._disk_entries if self._db is not None else None
+
+        return {
+            "namespace": self.namespace,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "disk_entries": disk_entries
+        }
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, TypeVar
+from config.config import Config
+from utils.log import annotate_request
+from utils.metrics import COALESCED_CALLS
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One in-flight call and the number of callers awaiting it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight task.
+
+    The first caller (leader) starts the work; identical calls arriving before it
+    finishes await the same task and get its result or exception. The work runs
+    in the leader's context (its request id and stage timings). A caller that is
+    cancelled (client disconnected) stops waiting without disturbing the others;
+    the work itself is cancelled only once nobody waits for it any more.
+    """
+
+    def __init__(self, scope: str, enabled: bool = None):
+        self.scope = scope
+        self.enabled = Config.COALESCING_ENABLED if enabled is None else enabled
+        self._flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await factory(), or the identical call already in flight for key"""
+        if not self.enabled:
+            return await factory()
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            COALESCED_CALLS.inc(self.scope)
+            annotate_request(coalesced=self.scope)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Last caller gone; later callers must not join a cancelled flight
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """In-flight keys and leader/follower counts for status endpoints"""
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "followers": self.followers
+        }
@@ -0,0 +1,371 @@
+import io
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, List, Set, Tuple
+import numpy as np
+from config.config import Config
+from utils.result_cache import ResultCache, SERVICE_ROOT
+from utils.text_matching import SKILL_ALIASES, STOPWORDS, tokenize, extract_skills
+
+logger = logging.getLogger(__name__)
+
+
+KINDS = ("job", "cv")
+
+# Token prefix separating canonical skills from plain keywords
+SKILL_PREFIX = "skill:"
+
+
+class _KindIndex:
+    """Postings of one document kind (jobs or CVs), keyed by integer token and slot ids"""
+
+    def __init__(self):
+        self.slot_of: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []  # slot -> document id (None = free)
+        self.doc_tokens: List[Optional[np.ndarray]] = []  # slot -> sorted token ids (forward index)
+        self.free: List[int] = []
+
+        # Compacted postings: slots of token t are base_slots[base_indptr[t]:base_indptr[t + 1]]
+        self.base_indptr = np.zeros(1, dtype=np.int64)
+        self.base_slots = np.zeros(0, dtype=np.int32)
+        self.stale = np.zeros(0, dtype=bool)  # Slot changed since compaction - ignore its base postings
+
+        # Documents changed since compaction
+        self.delta: Dict[int, Set[int]] = {}
+        self.delta_slots: Set[int] = set()
+        self.pending_changes = 0
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def _forget_delta(self, slot: int) -> None:
+        if slot in self.delta_slots:
+            for token in self.doc_tokens[slot]:
+                self.delta[int(token)].discard(slot)
+            self.delta_slots.discard(slot)
+
+    def upsert(self, doc_id: str, tokens: np.ndarray) -> None:
+        slot = self.slot_of.get(doc_id)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+                self.ids[slot] = doc_id
+            else:
+                slot = len(self.ids)
+                self.ids.append(doc_id)
+                self.doc_tokens.append(None)
+            self.slot_of[doc_id] = slot
+        else:
+            self._forget_delta(slot)
+
+        if slot < len(self.stale):
+            self.stale[slot] = True
+        self.doc_tokens[slot] = tokens
+        for token in tokens:
+            self.delta.setdefault(int(token), set()).add(slot)
+        self.delta_slots.add(slot)
+        self.pending_changes += 1
+
+    def delete(self, doc_id: str) -> bool:
+        slot = self.slot_of.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._forget_delta(slot)
+        if slot < len(self.stale):
+            self.stale[slot] = True
+        self.ids[slot] = None
+        self.doc_tokens[slot] = None
+        self.free.append(slot)
+        self.pending_changes += 1
+        return True
+
+    def compact(self, vocab_size: int) -> None:
+        """Fold the delta into the base postings (one argsort over all document tokens)"""
+        live = [(slot, tokens) for slot, tokens in enumerate(self.doc_tokens) if tokens is not None]
+        if live:
+            lengths = np.fromiter((len(tokens) for _, tokens in live), dtype=np.int64, count=len(live))
+            tokens = np.concatenate([tokens for _, tokens in live])
+            slots = np.repeat(np.fromiter((slot for slot, _ in live), dtype=np.int32, count=len(live)), lengths)
+            order = np.argsort(tokens, kind="stable")
+            self.base_slots = slots[order]
+            self.base_indptr = np.concatenate(([0], np.cumsum(np.bincount(tokens, minlength=vocab_size))))
+        else:
+            self.base_slots = np.zeros(0, dtype=np.int32)
+            self.base_indptr = np.zeros(vocab_size + 1, dtype=np.int64)
+        self.stale = np.zeros(len(self.ids), dtype=bool)
+        self.delta = {}
+        self.delta_slots = set()
+        self.pending_changes = 0
+
+    def document_frequencies(self, tokens: np.ndarray) -> np.ndarray:
+        """Number of documents containing each token"""
+        known = np.minimum(tokens, len(self.base_indptr) - 2)
+        frequencies = np.where(
+            tokens + 1 < len(self.base_indptr), self.base_indptr[known + 1] - self.base_indptr[known], 0
+        )
+        if self.delta:
+            frequencies += np.fromiter((len(self.delta.get(int(t), ())) for t in tokens), dtype=np.int64, count=len(tokens))
+        return frequencies
+
+    def hits(self, tokens: List[int]) -> np.ndarray:
+        """Per slot, how many of the tokens the document contains"""
+        counts = np.zeros(len(self.ids), dtype=np.int32)
+        base_tokens = np.array([t for t in tokens if t + 1 < len(self.base_indptr)], dtype=np.int64)
+        if len(base_tokens):
+            starts = self.base_indptr[base_tokens]
+            sizes = self.base_indptr[base_tokens + 1] - starts
+            total = int(sizes.sum())
+            if total:
+                positions = np.repeat(starts + sizes - sizes.cumsum(), sizes) + np.arange(total)
+                base = np.bincount(self.base_slots[positions], minlength=len(self.stale))
+                base[self.stale] = 0
+                counts[:len(base)] += base.astype(np.int32)
+        for token in tokens:
+            for slot in self.delta.get(token, ()):
+                counts[slot] += 1
+        return counts
+
+
+class SkillIndex:
+    """In-process inverted index from skill/keyword tokens to job and CV ids.
+
+    Tokens and documents are interned to integers. Postings are compacted into
+    one sorted array per kind (a query is a gather plus np.bincount); documents
+    added, changed or deleted since the last compaction are masked there and
+    kept in small per-token sets instead. Compaction runs once
+    SKILL_INDEX_REBUILD_THRESHOLD changes pile up: inline in upserts (which run
+    off the event loop), and from the background task via compact_pending() for
+    deletes, which only mask the document. Snapshots store the forward
+    index (token ids per document) in an .npz file; restoring needs no
+    re-tokenizing, only one compaction.
+    """
+
+    SNAPSHOT_FORMAT = 1
+
+    def __init__(self, snapshot_path: str = None, max_keyword_df: float = None, rebuild_threshold: int = None):
+        path = Config.SKILL_INDEX_SNAPSHOT_PATH if snapshot_path is None else snapshot_path
+        if path and not os.path.isabs(path):
+            path = os.path.join(SERVICE_ROOT, path)
+        self.snapshot_path = path
+        self.max_keyword_df = Config.SKILL_INDEX_MAX_KEYWORD_DF if max_keyword_df is None else max_keyword_df
+        self.rebuild_threshold = Config.SKILL_INDEX_REBUILD_THRESHOLD if rebuild_threshold is None else rebuild_threshold
+
+        self._vocab: Dict[str, int] = {}
+        self._tokens: List[str] = []
+        self._kinds: Dict[str, _KindIndex] = {kind: _KindIndex() for kind in KINDS}
+        self._lock = threading.RLock()
+        self._changes_since_snapshot = 0
+        self._last_snapshot_at: Optional[float] = None
+
+    @staticmethod
+    def tokens_for(text: Optional[str], skills: Optional[List[str]] = None) -> Set[str]:
+        """Normalized tokens of a document: canonical skills plus distinct keywords"""
+        text = text or ""
+        tokens = {SKILL_PREFIX + skill.lower() for skill in extract_skills(text)}
+        for skill in skills or []:
+            canonical = extract_skills(skill) or {skill.strip()}
+            tokens.update(SKILL_PREFIX + name.lower() for name in canonical if name)
+        tokens.update(token for token in tokenize(text) if len(token) > 1)
+        return tokens
+
+    @staticmethod
+    def fingerprint() -> str:
+        """Tokenizer version; snapshots written under another one are discarded"""
+        return ResultCache.make_version(
+            json.dumps(SKILL_ALIASES, sort_keys=True, ensure_ascii=False),
+            ",".join(sorted(STOPWORDS))
+        )
+
+    def _intern(self, tokens: Set[str]) -> np.ndarray:
+        ids = []
+        for token in tokens:
+            token_id = self._vocab.get(token)
+            if token_id is None:
+                token_id = self._vocab[token] = len(self._tokens)
+                self._tokens.append(token)
+            ids.append(token_id)
+        return np.sort(np.array(ids, dtype=np.int32))
+
+    def upsert(self, kind: str, doc_id: str, text: Optional[str], skills: Optional[List[str]] = None) -> None:
+        """Add or replace a document"""
+        self.upsert_many(kind, [(doc_id, text, skills)])
+
+    def upsert_many(self, kind: str, documents: List[Tuple[str, Optional[str], Optional[List[str]]]]) -> None:
+        """Add or replace documents, tokenizing outside the lock and compacting at most once"""
+        tokenized = [(doc_id, self.tokens_for(text, skills)) for doc_id, text, skills in documents]
+        with self._lock:
+            index = self._kinds[kind]
+            for doc_id, tokens in tokenized:
+                index.upsert(doc_id, self._intern(tokens))
+            self._changes_since_snapshot += len(tokenized)
+            if index.pending_changes > self.rebuild_threshold:
+                index.compact(len(self._tokens))
+
+    def delete(self, kind: str, doc_id: str) -> bool:
+        """Remove a document (masked until the next compaction); False if it was not indexed"""
+        with self._lock:
+            if not self._kinds[kind].delete(doc_id):
+                return False
+            self._changes_since_snapshot += 1
+            return True
+
+    def compact_pending(self) -> int:
+        """Compact kinds with more than rebuild_threshold pending changes (blocking: call via asyncio.to_thread)"""
+        with self._lock:
+            compacted = 0
+            for index in self._kinds.values():
+                if index.pending_changes > self.rebuild_threshold:
+                    index.compact(len(self._tokens))
+                    compacted += 1
+            return compacted
+
+    def query(self, kind: str, text: Optional[str] = None, skills: Optional[List[str]] = None,
+              limit: int = 50) -> List[Tuple[str, int, int]]:
+        """Candidate (id, shared skills, shared keywords) of one kind, most shared skills first.
+
+        Documents sharing a skill are candidates; keywords only break ties. When the
+        query has no recognisable skill, documents sharing a keyword are candidates.
+        Keywords present in more than SKILL_INDEX_MAX_KEYWORD_DF of the documents
+        carry no signal and are skipped.
+        """
+        tokens = self.tokens_for(text, skills)
+        with self._lock:
+            index = self._kinds[kind]
+            skill_tokens: List[int] = []
+            keyword_tokens: List[int] = []
+            for token in tokens:
+                token_id = self._vocab.get(token)
+                if token_id is not None:
+                    (skill_tokens if token.startswith(SKILL_PREFIX) else keyword_tokens).append(token_id)
+            if keyword_tokens:
+                keyword_ids = np.array(keyword_tokens, dtype=np.int64)
+                max_df = max(1, int(self.max_keyword_df * len(index)))
+                keyword_tokens = keyword_ids[index.document_frequencies(keyword_ids) <= max_df].tolist()
+
+            skill_hits = index.hits(skill_tokens)
+            keyword_hits = index.hits(keyword_tokens)
+            candidates = np.flatnonzero(skill_hits)
+            if not len(candidates):
+                candidates = np.flatnonzero(keyword_hits)
+
+            scores = skill_hits[candidates].astype(np.int64) * (len(keyword_tokens) + 1) + keyword_hits[candidates]
+            if len(candidates) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                candidates, scores = candidates[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            return [
+                (index.ids[slot], int(skill_hits[slot]), int(keyword_hits[slot]))
+                for slot in candidates[order]
+            ]
+
+    def count(self, kind: str) -> int:
+        """Number of indexed documents of one kind"""
+        return len(self._kinds[kind])
+
+    def ids(self, kind: str) -> List[str]:
+        """Ids of all indexed documents of one kind"""
+        with self._lock:
+            return list(self._kinds[kind].slot_of)
+
+    @property
+    def unsaved_changes(self) -> int:
+        return self._changes_since_snapshot
+
+    def snapshot(self) -> bool:
+        """Atomically write the forward index to SKILL_INDEX_SNAPSHOT_PATH"""
+        if not self.snapshot_path:
+            return False
+        # Token arrays are replaced, never mutated, so copying the lists is a consistent view
+        with self._lock:
+            tokens = list(self._tokens)
+            documents = {kind: (list(index.ids), list(index.doc_tokens)) for kind, index in self._kinds.items()}
+            changes = self._changes_since_snapshot
+
+        meta = {"format": self.SNAPSHOT_FORMAT, "fingerprint": self.fingerprint(), "tokens": tokens, "ids": {}}
+        arrays = {}
+        for kind, (ids, doc_tokens) in documents.items():
+            live = [(doc_id, token_ids) for doc_id, token_ids in zip(ids, doc_tokens) if doc_id is not None]
+            meta["ids"][kind] = [doc_id for doc_id, _ in live]
+            arrays[f"{kind}_lengths"] = np.fromiter((len(t) for _, t in live), dtype=np.int64, count=len(live))
+            arrays[f"{kind}_tokens"] = np.concatenate([t for _, t in live]) if live else np.zeros(0, dtype=np.int32)
+        arrays["meta"] = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+        temp_path = f"{self.snapshot_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+            with open(temp_path, "wb") as f:
+                f.write(buffer.getbuffer())
+            os.replace(temp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning("Skill index snapshot failed (%s): %s", self.snapshot_path, e)
+            return False
+
+        with self._lock:
+            self._changes_since_snapshot -= changes
+            self._last_snapshot_at = time.time()
+        return True
+
+    def restore(self) -> bool:
+        """Load the last snapshot and compact it, without re-tokenizing any document"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                arrays = {name: data[name] for name in data.files if name != "meta"}
+        except Exception as e:
+            logger.warning("Skill index snapshot unreadable (%s): %s", self.snapshot_path, e)
+            return False
+        if meta.get("format") != self.SNAPSHOT_FORMAT or meta.get("fingerprint") != self.fingerprint():
+            logger.warning("Skill index snapshot was written by another tokenizer version, ignoring it")
+            return False
+
+        vocab_size = len(meta["tokens"])
+        kinds = {}
+        for kind in KINDS:
+            index = _KindIndex()
+            ids = meta["ids"].get(kind, [])
+            if ids:
+                lengths = arrays[f"{kind}_lengths"]
+                index.ids = list(ids)
+                index.slot_of = {doc_id: slot for slot, doc_id in enumerate(ids)}
+                index.doc_tokens = np.split(arrays[f"{kind}_tokens"], np.cumsum(lengths)[:-1])
+            index.compact(vocab_size)
+            kinds[kind] = index
+
+        with self._lock:
+            self._tokens = meta["tokens"]
+            self._vocab = {token: token_id for token_id, token in enumerate(self._tokens)}
+            self._kinds = kinds
+            self._changes_since_snapshot = 0
+            self._last_snapshot_at = os.path.getmtime(self.snapshot_path)
+        return True
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """Index size and snapshot state for status endpoints"""
+        with self._lock:
+            return {
+                "jobs": len(self._kinds["job"]),
+                "cvs": len(self._kinds["cv"]),
+                "tokens": len(self._tokens),
+                "pending_changes": {kind: index.pending_changes for kind, index in self._kinds.items()},
+                "unsaved_changes": self._changes_since_snapshot,
+                "last_snapshot_at": self._last_snapshot_at,
+                "snapshot_path": self.snapshot_path or None
+            }
+
+
+_skill_index: Optional[SkillIndex] = None
+
+
+def get_skill_index() -> SkillIndex:
+    """Get singleton skill index instance"""
+    global _skill_index
+    if _skill_index is None:
+        _skill_index = SkillIndex()
+    return _skill_index
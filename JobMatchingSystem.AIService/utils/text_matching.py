@@ -0,0 +1,138 @@
+import re
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+
+# Canonical skill -> aliases as they appear in CVs and job descriptions (lower-case).
+# Skills named by a common English word (swift, node, express, spring, rest, excel)
+# are only listed in tech forms, so "excel at", "express interest" or "rest of the
+# team" are not skills.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "Python": ["python"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js", "es6"],
+    "TypeScript": ["typescript", "ts"],
+    "C#": ["c#", "csharp"],
+    "C++": ["c++", "cpp"],
+    ".NET": [".net", "asp.net", "dotnet", ".net core", "asp.net core"],
+    "PHP": ["php"],
+    "Go": ["golang"],
+    "Ruby": ["ruby", "rails", "ruby on rails"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swiftui", "swift ui", "swift 5", "swift ios", "ios swift", "swift language", "swift programming"],
+    "Dart": ["dart"],
+    "Rust": ["rust"],
+    "React": ["react", "reactjs", "react.js"],
+    "React Native": ["react native"],
+    "Angular": ["angular", "angularjs"],
+    "Vue": ["vue", "vuejs", "vue.js"],
+    "Node.js": ["node.js", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "Next.js": ["next.js", "nextjs"],
+    "Spring": ["spring boot", "springboot", "spring framework", "spring mvc", "spring cloud", "spring data",
+               "spring security"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Laravel": ["laravel"],
+    "Flutter": ["flutter"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "scss", "sass", "tailwind"],
+    "SQL": ["sql", "t-sql", "pl/sql"],
+    "MySQL": ["mysql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "SQL Server": ["sql server", "mssql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch"],
+    "Kafka": ["kafka"],
+    "RabbitMQ": ["rabbitmq"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure"],
+    "GCP": ["gcp", "google cloud"],
+    "Linux": ["linux", "ubuntu"],
+    "Git": ["git", "github", "gitlab"],
+    "CI/CD": ["ci/cd", "jenkins", "github actions"],
+    "REST API": ["restful", "rest api", "rest apis", "rest service", "rest services", "web api"],
+    "GraphQL": ["graphql"],
+    "Microservices": ["microservices", "microservice"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["ms excel", "microsoft excel", "excel vba", "advanced excel", "excel macros"],
+    "Figma": ["figma"],
+    "Photoshop": ["photoshop"],
+    "Agile": ["agile", "scrum", "kanban"],
+    "Testing": ["unit test", "unit testing", "selenium", "jest", "junit", "kiểm thử", "tester"],
+    "English": ["english", "tiếng anh", "ielts", "toeic", "toefl"],
+    "Japanese": ["japanese", "tiếng nhật", "jlpt"],
+    "Communication": ["communication", "giao tiếp"],
+    "Teamwork": ["teamwork", "làm việc nhóm"],
+    "Leadership": ["leadership", "lãnh đạo", "team lead"],
+}
+
+# Words that carry no matching signal (English + Vietnamese function words)
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "the", "to", "with", "we", "you", "our", "your", "will", "can", "have", "has", "this", "that",
+    "và", "của", "các", "có", "cho", "với", "là", "được", "trong", "những", "một", "để", "khi", "theo",
+    "từ", "về", "tại", "như", "hoặc", "không", "này", "đã", "sẽ", "bạn", "chúng", "tôi", "ở",
+}
+
+_TOKEN_PATTERN = re.compile(r"[\w#+]+(?:[.\-/][\w#+]+)*", re.UNICODE)
+
+# Alias -> canonical skill, matched on token boundaries (longest aliases first)
+_ALIAS_TO_SKILL = {alias: skill for skill, aliases in SKILL_ALIASES.items() for alias in aliases}
+_SKILL_PATTERN = re.compile(
+    r"(?<![\w#+.])(" + "|".join(re.escape(a) for a in sorted(_ALIAS_TO_SKILL, key=len, reverse=True)) + r")(?![\w#+])",
+    re.UNICODE
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without stopwords (keeps c#, c++, node.js, ci/cd)"""
+    return [
+        token for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and not token.isdigit()
+    ]
+
+
+def extract_skills(text: str) -> Set[str]:
+    """Canonical skill names mentioned in the text"""
+    return {_ALIAS_TO_SKILL[match] for match in _SKILL_PATTERN.findall(text.lower())}
+
+
+def bm25_coverage(doc_tokens: List[str], query_tokens: List[str], k1: float = 1.2, b: float = 0.75,
+                  avg_doc_length: float = 300.0, full_credit_tf: int = 2) -> float:
+    """How well a document covers a query, 0-1.
+
+    Each query term contributes its BM25 saturation tf / (tf + K), with K from
+    k1, b and the document length; `full_credit_tf` mentions count as fully covered.
+    """
+    query_terms = set(query_tokens)
+    if not query_terms or not doc_tokens:
+        return 0.0
+
+    frequencies = Counter(doc_tokens)
+    length_norm = k1 * (1 - b + b * len(doc_tokens) / avg_doc_length)
+    full_credit = full_credit_tf / (full_credit_tf + length_norm)
+    score = 0.0
+    for term in query_terms:
+        tf = frequencies.get(term, 0)
+        if tf:
+            score += min(1.0, tf / (tf + length_norm) / full_credit)
+    return score / len(query_terms)
+
+
+def skill_overlap(cv_skills: Set[str], job_skills: Set[str]) -> Tuple[List[str], List[str], float]:
+    """(matching, missing, fraction of the job's skills the CV has)"""
+    matching = sorted(cv_skills & job_skills)
+    missing = sorted(job_skills - cv_skills)
+    fraction = len(matching) / len(job_skills) if job_skills else 0.0
+    return matching, missing, fraction
@@ -0,0 +1,62 @@
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple
+
+
+@dataclass
+class TokenUsage:
+    """Tokens billed for one Gemini call"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # Part of prompt_tokens served from a context cache
+    total_tokens: int = 0  # Includes thinking tokens on models that report them
+
+    @classmethod
+    def from_metadata(cls, usage_metadata: Any) -> Optional["TokenUsage"]:
+        """Read a response's usage_metadata (None when the API did not report it)"""
+        if usage_metadata is None:
+            return None
+        prompt_tokens = usage_metadata.prompt_token_count or 0
+        completion_tokens = usage_metadata.candidates_token_count or 0
+        return cls(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=usage_metadata.cached_content_token_count or 0,
+            total_tokens=usage_metadata.total_token_count or prompt_tokens + completion_tokens
+        )
+
+
+class TokenUsageTracker:
+    """Token totals per model and prompt mode (inline, system_instruction, context_cache)"""
+
+    def __init__(self):
+        self._totals: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, mode: str, usage: TokenUsage) -> None:
+        with self._lock:
+            totals = self._totals.get((model, mode))
+            if totals is None:
+                totals = self._totals[(model, mode)] = {
+                    "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0
+                }
+            totals["calls"] += 1
+            totals["prompt_tokens"] += usage.prompt_tokens
+            totals["completion_tokens"] += usage.completion_tokens
+            totals["cached_tokens"] += usage.cached_tokens
+
+    def get_status_info(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Totals and per-call averages, grouped by model then mode"""
+        with self._lock:
+            snapshot = {key: dict(totals) for key, totals in self._totals.items()}
+
+        info: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (model, mode), totals in snapshot.items():
+            calls = totals["calls"]
+            info.setdefault(model, {})[mode] = {
+                **totals,
+                "avg_prompt_tokens": round(totals["prompt_tokens"] / calls, 1),
+                "avg_completion_tokens": round(totals["completion_tokens"] / calls, 1),
+                "cached_ratio": round(totals["cached_tokens"] / totals["prompt_tokens"], 3) if totals["prompt_tokens"] else 0.0
+            }
+        return info
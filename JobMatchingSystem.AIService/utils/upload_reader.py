@@ -0,0 +1,111 @@
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any
+from fastapi import UploadFile
+from config.config import Config
+from utils.document_processor import DocumentProcessor
+from utils.metrics import UPLOAD_READ_SECONDS
+
+
+class UploadRejected(Exception):
+    """Upload is too large or its content is not a supported document"""
+
+
+class UploadCapacityExceeded(Exception):
+    """Too many upload bytes are held across requests; the caller should retry"""
+
+
+class InFlightBytes:
+    """Global cap on upload bytes held in memory across concurrent requests"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.in_use = 0
+        self.peak = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: int) -> None:
+        with self._lock:
+            if self.in_use + amount > self.max_bytes:
+                self.rejected += 1
+                raise UploadCapacityExceeded(
+                    f"Upload capacity exhausted ({self.max_bytes // (1024 * 1024)}MB in flight), retry shortly"
+                )
+            self.in_use += amount
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self, amount: int) -> None:
+        with self._lock:
+            self.in_use -= amount
+
+
+class UploadReader:
+    """Reads uploads in chunks, aborting once the size limit is crossed or the format is wrong"""
+
+    def __init__(self, max_file_bytes: int = None, chunk_size: int = None, max_in_flight_bytes: int = None):
+        self.max_file_bytes = DocumentProcessor.MAX_FILE_SIZE_MB * 1024 * 1024 if max_file_bytes is None else max_file_bytes
+        self.chunk_size = Config.UPLOAD_CHUNK_SIZE_KB * 1024 if chunk_size is None else chunk_size
+        self.budget = InFlightBytes(
+            Config.UPLOAD_MAX_IN_FLIGHT_MB * 1024 * 1024 if max_in_flight_bytes is None else max_in_flight_bytes
+        )
+
+    def _too_large(self) -> UploadRejected:
+        return UploadRejected(f"File size exceeds limit ({DocumentProcessor.MAX_FILE_SIZE_MB}MB)")
+
+    @asynccontextmanager
+    async def read(self, file: UploadFile):
+        """Yield the upload's bytes; they count against the in-flight cap until the block exits"""
+        if not DocumentProcessor.is_supported_file(file.filename):
+            raise UploadRejected("Unsupported file type. Supported formats: PDF, DOCX")
+        if file.size is not None and file.size > self.max_file_bytes:
+            raise self._too_large()
+
+        chunks = []
+        total = 0
+        started = time.perf_counter()
+        try:
+            while True:
+                chunk = await file.read(self.chunk_size)
+                if not chunk:
+                    break
+                if total + len(chunk) > self.max_file_bytes:
+                    raise self._too_large()
+                self.budget.reserve(len(chunk))
+                total += len(chunk)
+                chunks.append(chunk)
+
+                # Reject mismatched content after the first chunk instead of after the whole file
+                if len(chunks) == 1:
+                    error = DocumentProcessor.check_magic_bytes(chunk, file.filename)
+                    if error:
+                        raise UploadRejected(error)
+
+            content = b"".join(chunks)
+            chunks = None
+            UPLOAD_READ_SECONDS.observe(time.perf_counter() - started)
+            yield content
+        finally:
+            self.budget.release(total)
+
+    def get_status_info(self) -> Dict[str, Any]:
+        """Get upload memory usage for status endpoints"""
+        return {
+            "max_file_mb": DocumentProcessor.MAX_FILE_SIZE_MB,
+            "max_in_flight_mb": self.budget.max_bytes // (1024 * 1024),
+            "in_flight_bytes": self.budget.in_use,
+            "peak_in_flight_bytes": self.budget.peak,
+            "rejected": self.budget.rejected
+        }
+
+
+_upload_reader: Optional[UploadReader] = None
+
+
+def get_upload_reader() -> UploadReader:
+    """Get singleton upload reader instance"""
+    global _upload_reader
+    if _upload_reader is None:
+        _upload_reader = UploadReader()
+    return _upload_reader